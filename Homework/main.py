@@ -1,12 +1,22 @@
 """
 Dijkstra Algorithm Assignment - Core Classes and Helper Functions
 
-This file contains the Node and Edge classes and helper function.
+This file contains the Node, Edge, Graph and CSRGraph classes and helper functions.
 
 You shouldn't need to modify this file.
 """
 import math
-from typing import List
+import weakref
+from array import array
+from typing import Callable, Iterator, List, Tuple, Union
+
+# Node attributes read by the cost functions; changing one of them reprices
+# the cached edge weights of every graph built over the node
+COST_ATTRIBUTES = frozenset({
+    "x", "y", "region", "traffic_level", "parking_cost", "maintenance_factor",
+    "platform_cost", "fuel_cost_per_mile", "weather_condition",
+})
+
 
 # ============================================================================
 # Node and Edge Class
@@ -27,6 +37,9 @@ class Node:
         platform_cost (float): Company platform cost per ride in this city
         fuel_cost_per_mile (float): Fuel cost per mile in this region
         weather_condition (str): Current weather ('clear', 'rain', 'snow', 'storm')
+    
+    Setting any attribute in COST_ATTRIBUTES notifies the registered observers
+    (see add_observer) so cached edge weights never go stale.
     """
     
     def __init__(self, node_id: str, name: str, x: float, y: float,
@@ -46,6 +59,35 @@ class Node:
         self.fuel_cost_per_mile = fuel_cost_per_mile
         self.weather_condition = weather_condition
     
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in COST_ATTRIBUTES:
+            observers = self.__dict__.get("_observers")
+            if observers:
+                for observer in list(observers):
+                    observer.node_changed(self)
+    
+    def add_observer(self, observer) -> None:
+        """
+        Register an object to be told when a cost attribute of this node changes.
+        
+        Observers are held weakly and must provide node_changed(node).
+        
+        Args:
+            observer: Object with a node_changed(node) method
+        """
+        observers = self.__dict__.get("_observers")
+        if observers is None:
+            observers = weakref.WeakSet()
+            object.__setattr__(self, "_observers", observers)
+        observers.add(observer)
+    
+    def __getstate__(self):
+        # Observers are local to this process and cannot be pickled
+        state = self.__dict__.copy()
+        state.pop("_observers", None)
+        return state
+    
     def distance_to(self, other_node) -> float:
         """
         Calculate distance to another node.
@@ -116,20 +158,340 @@ class Edge:
 
 
 
+class Graph:
+    """
+    Represents the rideshare network as a node-indexed adjacency map.
+    
+    The adjacency map is built once from the node and edge lists, so looking
+    up the neighbors of a city costs O(degree) instead of a scan over every
+    edge. Duplicate roads between the same two cities are stored once.
+    
+    Attributes:
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge]): All road connections
+    """
+    
+    def __init__(self, nodes: List[Node], edges: List[Edge]):
+        self.nodes = []
+        self.edges = []
+        self._adjacency = {}
+        self._csr = None
+        for node in nodes:
+            self._add_node(node)
+        for edge in edges:
+            self.add_edge(edge)
+    
+    def _add_node(self, node: Node) -> None:
+        if node not in self._adjacency:
+            self._adjacency[node] = []
+            self.nodes.append(node)
+    
+    def add_edge(self, edge: Edge) -> None:
+        """
+        Add a road to the network, registering any new endpoint cities.
+        
+        Args:
+            edge (Edge): The road to add
+        """
+        self.edges.append(edge)
+        self._csr = None
+        self._add_node(edge.u)
+        self._add_node(edge.v)
+        for a, b in ((edge.u, edge.v), (edge.v, edge.u)):
+            neighbors = self._adjacency[a]
+            if b not in neighbors:
+                neighbors.append(b)
+    
+    def neighbors(self, node: Node) -> List[Node]:
+        """
+        Get all nodes that are directly connected to the given node.
+        
+        The returned list is owned by the graph and must not be modified.
+        
+        Args:
+            node (Node): The node to find neighbors for
+            
+        Returns:
+            List[Node]: List of neighboring nodes (empty for unknown nodes)
+        """
+        return self._adjacency.get(node, [])
+    
+    def csr(self) -> "CSRGraph":
+        """
+        Get the CSR form of this graph, built on first use.
+        
+        The CSR form and its cached edge weights are kept until an edge is
+        added, so repeated queries over the same Graph share them.
+        
+        Returns:
+            CSRGraph: Array-backed form of this graph
+        """
+        if self._csr is None:
+            self._csr = CSRGraph(self.nodes, self)
+        return self._csr
+    
+    def __contains__(self, node) -> bool:
+        return node in self._adjacency
+    
+    def __len__(self) -> int:
+        return len(self.nodes)
+    
+    def __repr__(self):
+        return f"Graph({len(self.nodes)} nodes, {len(self.edges)} edges)"
+
+
+class CSRGraph:
+    """
+    Represents the rideshare network in compressed sparse row (CSR) form.
+    
+    Cities are numbered 0..n-1 in node order and the neighbors of city i are
+    targets[offsets[i]:offsets[i + 1]]. Arc weights for a cost perspective are
+    kept in a flat array aligned with targets, so a search can run over plain
+    integers and floats without touching Node objects.
+    
+    Attributes:
+        nodes (List[Node]): All cities, indexed by position
+        index (Dict[str, int]): City id to position in nodes
+        offsets (array): Start of each city's arcs in targets (length n + 1)
+        targets (array): Head city index of every arc
+        reverse_arcs (array): Index of the opposite-direction arc of every arc
+        version (int): Incremented whenever a node cost attribute changes
+        extensions (dict): Per-network caches owned by other modules
+    """
+    
+    def __init__(self, nodes: List[Node], edges: Union[List[Edge], Graph]):
+        graph = as_graph(nodes, edges)
+        self.nodes = list(graph.nodes)
+        self.index = {node.id: i for i, node in enumerate(self.nodes)}
+        self.offsets = array('i', [0])
+        self.targets = array('i')
+        for node in self.nodes:
+            self.targets.extend(self.index[neighbor.id] for neighbor in graph.neighbors(node))
+            self.offsets.append(len(self.targets))
+        self.reverse_arcs = array('i', (self.arc(head, tail) for tail, head in self.arcs()))
+        self.version = 0
+        # Keyed weakly so per-call cost functions do not pin their tables
+        self._tables = weakref.WeakKeyDictionary()
+        # Derived data attached by higher-level modules (e.g. cached shortest
+        # path trees), released together with this graph
+        self.extensions = {}
+        for node in self.nodes:
+            node.add_observer(self)
+    
+    def __getstate__(self):
+        # Weight tables and extensions are rebuilt on demand after unpickling
+        state = self.__dict__.copy()
+        state["_tables"] = None
+        state["extensions"] = {}
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._tables = weakref.WeakKeyDictionary()
+        for node in self.nodes:
+            node.add_observer(self)
+    
+    def arcs(self) -> Iterator[Tuple[int, int]]:
+        """
+        Iterate over every directed arc as a (tail, head) index pair, in arc order.
+        """
+        offsets, targets = self.offsets, self.targets
+        for tail in range(len(self.nodes)):
+            for arc in range(offsets[tail], offsets[tail + 1]):
+                yield tail, targets[arc]
+    
+    def arc(self, tail: int, head: int) -> int:
+        """
+        Find the arc from tail to head.
+        
+        Returns:
+            int: Arc index, or -1 if the two cities are not connected
+        """
+        for arc in range(self.offsets[tail], self.offsets[tail + 1]):
+            if self.targets[arc] == head:
+                return arc
+        return -1
+    
+    def weight_table(self, cost_function: Callable[[Node, Node], float]) -> "WeightTable":
+        """
+        Get the cached weight table for a cost perspective, creating it on first use.
+        
+        Args:
+            cost_function: Function(from_node, to_node) -> cost
+            
+        Returns:
+            WeightTable: Arc weights of this graph under cost_function
+        """
+        table = self._tables.get(cost_function)
+        if table is None:
+            table = WeightTable(self, cost_function)
+            self._tables[cost_function] = table
+        return table
+    
+    def edge_weights(self, cost_function: Callable[[Node, Node], float]) -> array:
+        """
+        Get the weight of every arc under a cost perspective.
+        
+        The array is computed on first use and reused by later queries; arcs
+        touching a node whose cost attributes changed are repriced first.
+        
+        Args:
+            cost_function: Function(from_node, to_node) -> cost
+            
+        Returns:
+            array: Arc weights aligned with targets
+        """
+        return self.weight_table(cost_function).refresh()
+    
+    def node_changed(self, node: Node) -> None:
+        """
+        Observer hook: mark the arcs of a changed node for repricing.
+        """
+        index = self.index.get(node.id)
+        if index is None:
+            return
+        self.version += 1
+        for table in list(self._tables.values()):
+            table.invalidate(index)
+    
+    @property
+    def num_arcs(self) -> int:
+        return len(self.targets)
+    
+    def __len__(self) -> int:
+        return len(self.nodes)
+    
+    def __repr__(self):
+        return f"CSRGraph({len(self.nodes)} nodes, {len(self.targets)} arcs)"
+
+
+class WeightTable:
+    """
+    Caches the weight of every arc of a CSRGraph under one cost perspective.
+    
+    Each cost function is evaluated once per arc, in both directions since
+    costs can be asymmetric. When a node changes, only the arcs leaving and
+    entering it are repriced, on the next refresh().
+    
+    Attributes:
+        csr (CSRGraph): Network the weights belong to
+        weights (array): Arc weights aligned with csr.targets
+    """
+    
+    def __init__(self, csr: CSRGraph, cost_function: Callable[[Node, Node], float]):
+        self.csr = csr
+        # Held weakly: the CSRGraph keys its tables by this function
+        self._cost_function = weakref.ref(cost_function)
+        nodes = csr.nodes
+        self.weights = array('d', (cost_function(nodes[tail], nodes[head])
+                                   for tail, head in csr.arcs()))
+        self._dirty = set()
+    
+    def invalidate(self, index: int) -> None:
+        """
+        Mark every arc leaving or entering the node at index as stale.
+        """
+        self._dirty.add(index)
+    
+    def refresh(self) -> array:
+        """
+        Reprice stale arcs and return the up-to-date weight array.
+        """
+        if self._dirty:
+            cost_function = self._cost_function()
+            csr = self.csr
+            nodes, offsets, targets, reverse_arcs = csr.nodes, csr.offsets, csr.targets, csr.reverse_arcs
+            weights = self.weights
+            for tail in self._dirty:
+                for arc in range(offsets[tail], offsets[tail + 1]):
+                    head = targets[arc]
+                    weights[arc] = cost_function(nodes[tail], nodes[head])
+                    weights[reverse_arcs[arc]] = cost_function(nodes[head], nodes[tail])
+            self._dirty.clear()
+        return self.weights
+    
+    def assign(self, weights) -> None:
+        """
+        Overwrite every arc weight at once, e.g. from a vectorized repricing.
+        
+        Args:
+            weights: Sequence of arc weights aligned with csr.targets
+        """
+        if len(weights) != len(self.weights):
+            raise ValueError(f"Expected {len(self.weights)} arc weights, got {len(weights)}")
+        self.weights[:] = array('d', weights)
+        self._dirty.clear()
+    
+    def cost(self, from_node: Node, to_node: Node) -> float:
+        """
+        Look up the cached cost of traveling between two adjacent nodes.
+        
+        Raises:
+            ValueError: If the nodes are not connected by an edge
+        """
+        csr = self.csr
+        tail = csr.index.get(from_node.id)
+        head = csr.index.get(to_node.id)
+        arc = -1 if tail is None or head is None else csr.arc(tail, head)
+        if arc == -1:
+            raise ValueError(f"No edge between {from_node.id} and {to_node.id}")
+        return self.refresh()[arc]
+
+
+
 # ============================================================================
 # Helper Functions
 # ============================================================================
-def get_neighbors(node: Node, edges: List[Edge]) -> List[Node]:
+def as_graph(nodes: List[Node], edges: Union[List[Edge], Graph]) -> Graph:
+    """
+    Get a Graph for the given nodes and edges, building one only if needed.
+    
+    Route functions call this so they accept either a prebuilt Graph or the
+    plain edge list; passing a Graph avoids rebuilding the adjacency map on
+    every query.
+    
+    Args:
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge] or Graph): All road connections, or a prebuilt Graph
+        
+    Returns:
+        Graph: Graph over the given nodes and edges
+    """
+    if isinstance(edges, Graph):
+        return edges
+    return Graph(nodes, edges)
+
+
+def as_csr(nodes: List[Node], edges: Union[List[Edge], Graph, CSRGraph]) -> CSRGraph:
+    """
+    Get a CSRGraph for the given nodes and edges, reusing cached forms when possible.
+    
+    Args:
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections, or a prebuilt graph
+        
+    Returns:
+        CSRGraph: CSR form of the network
+    """
+    if isinstance(edges, CSRGraph):
+        return edges
+    return as_graph(nodes, edges).csr()
+
+
+def get_neighbors(node: Node, edges: Union[List[Edge], Graph]) -> List[Node]:
     """
     Get all nodes that are directly connected to the given node.
     
     Args:
         node (Node): The node to find neighbors for
-        edges (List[Edge]): All available edges in the graph
+        edges (List[Edge] or Graph): All available edges in the graph, or a
+            prebuilt Graph for an O(degree) lookup
         
     Returns:
         List[Node]: List of neighboring nodes
     """
+    if isinstance(edges, Graph):
+        return list(edges.neighbors(node))
     neighbors = []
     for edge in edges:
         try:
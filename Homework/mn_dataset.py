@@ -5,7 +5,7 @@ This file include list of Nodes of MN cities and list of Edges of simplfied Road
 
 You shouldn't need to modify this file.
 """
-from main import Node, Edge
+from main import Node, Edge, Graph
 
 # ============================================================================
 # Minnesota City Nodes (with attributes)
@@ -216,6 +216,9 @@ MN_EDGES = [
     Edge(MN_NODES_DICT["St Paul"], MN_NODES_DICT["Forest Lake"]),   # St Paul - Forest Lake 
 ]
 
+# Adjacency-indexed network, built once for fast neighbor lookups
+MN_GRAPH = Graph(MN_NODES, MN_EDGES)
+
 # ============================================================================
 # Nodes Collection for Student Implementation Feedback
 # ============================================================================
@@ -0,0 +1,234 @@
+"""
+All-Pairs Cost Matrices - Precomputed costs between every pair of cities
+
+For dispatch lookups that ask for costs between arbitrary city pairs, this
+file precomputes a dense cost matrix and a next-hop matrix per perspective.
+Costs are then looked up in O(1) and paths rebuilt in O(path length). Small
+networks use Floyd-Warshall; larger ones run one single-source Dijkstra per
+origin, optionally spread over a process pool. Matrices can be saved to and
+loaded from disk.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import struct
+from array import array
+from typing import List, Optional, Sequence, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.dijkstra_engine import dijkstra_search, first_hops
+from solutions.parallel_origins import all_origins
+from solutions.perspectives import CostFunction, get_cost_function
+
+# Networks up to this many cities use Floyd-Warshall when method="auto"
+FLOYD_WARSHALL_MAX_NODES = 32
+
+_FILE_MAGIC = b"CSTMTX01"
+
+
+class CostMatrix:
+    """
+    Dense all-pairs costs and next hops for one cost perspective.
+
+    Row-major n x n arrays: costs[i * n + j] is the cheapest cost from node i
+    to node j and next_hop[i * n + j] the node index after i on that path
+    (-1 if j is unreachable or j == i).
+
+    The matrix is a snapshot; recompute it after node cost attributes change.
+
+    Attributes:
+        nodes (List[Node]): Cities, indexed by position
+        index (Dict[str, int]): City id to position
+        costs (array): Cheapest costs, row-major
+        next_hop (array): Next node index on each cheapest path, row-major
+        perspective (str): Name of the cost perspective
+    """
+
+    def __init__(self, nodes: List[Node], costs: array, next_hop: array, perspective: str):
+        self.nodes = list(nodes)
+        self.index = {node.id: i for i, node in enumerate(self.nodes)}
+        self.costs = costs
+        self.next_hop = next_hop
+        self.perspective = perspective
+
+    def cost(self, start: Node, target: Node) -> float:
+        """
+        Look up the cheapest cost from start to target (inf if unreachable).
+        """
+        i, j = self.index.get(start.id), self.index.get(target.id)
+        if i is None or j is None:
+            return 0.0 if start == target else float('inf')
+        return self.costs[i * len(self.nodes) + j]
+
+    def path(self, start: Node, target: Node) -> List[Node]:
+        """
+        Rebuild the cheapest path from start to target ([] if unreachable).
+        """
+        if start == target:
+            return [start]
+        i, j = self.index.get(start.id), self.index.get(target.id)
+        n = len(self.nodes)
+        if i is None or j is None or self.next_hop[i * n + j] == -1:
+            return []
+        path = [self.nodes[i]]
+        while i != j:
+            i = self.next_hop[i * n + j]
+            path.append(self.nodes[i])
+        return path
+
+    def route(self, start: Node, target: Node) -> Tuple[List[Node], float]:
+        """
+        Get (path, cost) in the same form as the route functions.
+        """
+        path = self.path(start, target)
+        return (path, self.cost(start, target)) if path else ([], float('inf'))
+
+    def save(self, file_path: str) -> None:
+        """
+        Write the matrix to disk: a JSON header followed by the raw arrays.
+        """
+        header = json.dumps({
+            "perspective": self.perspective,
+            "node_ids": [node.id for node in self.nodes],
+            "byteorder": sys.byteorder,
+        }).encode("utf-8")
+        with open(file_path, "wb") as f:
+            f.write(_FILE_MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write(self.costs.tobytes())
+            f.write(self.next_hop.tobytes())
+
+    @classmethod
+    def load(cls, file_path: str, nodes: List[Node]) -> "CostMatrix":
+        """
+        Read a matrix written by save().
+
+        Args:
+            file_path (str): File to read
+            nodes (List[Node]): Cities to resolve the stored ids against
+
+        Raises:
+            ValueError: If the file is not a cost matrix or names unknown cities
+        """
+        with open(file_path, "rb") as f:
+            if f.read(len(_FILE_MAGIC)) != _FILE_MAGIC:
+                raise ValueError(f"{file_path} is not a saved cost matrix")
+            (header_size,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_size).decode("utf-8"))
+            n = len(header["node_ids"])
+            costs = array('d')
+            costs.frombytes(f.read(n * n * costs.itemsize))
+            next_hop = array('i')
+            next_hop.frombytes(f.read(n * n * next_hop.itemsize))
+        if header["byteorder"] != sys.byteorder:
+            costs.byteswap()
+            next_hop.byteswap()
+
+        by_id = {node.id: node for node in nodes}
+        missing = [node_id for node_id in header["node_ids"] if node_id not in by_id]
+        if missing:
+            raise ValueError(f"Unknown cities in saved matrix: {missing}")
+        return cls([by_id[node_id] for node_id in header["node_ids"]],
+                   costs, next_hop, header["perspective"])
+
+    def __repr__(self):
+        return f"CostMatrix({len(self.nodes)} nodes, perspective={self.perspective})"
+
+
+# ============================================================================
+# PRECOMPUTATION
+# ============================================================================
+
+def _single_source_rows(csr: CSRGraph, weights: Sequence[float], sources: Sequence[int]) -> List[Tuple[int, array, array]]:
+    rows = []
+    for source in sources:
+        distances, previous, _ = dijkstra_search(csr, source, weights)
+        rows.append((source, array('d', distances), first_hops(source, previous)))
+    return rows
+
+
+def _dijkstra_matrix(csr: CSRGraph, weights: Sequence[float], workers: Optional[int]) -> Tuple[array, array]:
+    if workers and workers > 1:
+        return all_origins(csr, weights, workers)
+    n = len(csr.nodes)
+    costs = array('d', [float('inf')]) * (n * n)
+    next_hop = array('i', [-1]) * (n * n)
+    results = _single_source_rows(csr, weights, range(n))
+    for source, distances, hops in results:
+        costs[source * n:(source + 1) * n] = distances
+        next_hop[source * n:(source + 1) * n] = hops
+    return costs, next_hop
+
+
+def _floyd_warshall_matrix(csr: CSRGraph, weights: Sequence[float]) -> Tuple[array, array]:
+    n = len(csr.nodes)
+    inf = float('inf')
+    dist = [[inf] * n for _ in range(n)]
+    hop = [[-1] * n for _ in range(n)]
+    for i in range(n):
+        dist[i][i] = 0.0
+    for arc, (tail, head) in enumerate(csr.arcs()):
+        if tail != head and weights[arc] < dist[tail][head]:
+            dist[tail][head] = weights[arc]
+            hop[tail][head] = head
+    for k in range(n):
+        dist_k = dist[k]
+        for i in range(n):
+            dist_i, hop_i = dist[i], hop[i]
+            through_k = dist_i[k]
+            if through_k == inf:
+                continue
+            hop_ik = hop_i[k]
+            for j in range(n):
+                candidate = through_k + dist_k[j]
+                if candidate < dist_i[j]:
+                    dist_i[j] = candidate
+                    hop_i[j] = hop_ik
+    costs = array('d', (d for row in dist for d in row))
+    next_hop = array('i', (h for row in hop for h in row))
+    return costs, next_hop
+
+
+def all_pairs_costs(nodes: List[Node], edges: Union[List[Edge], Graph, CSRGraph],
+                    perspective: Union[str, CostFunction] = "company",
+                    method: str = "auto", workers: Optional[int] = None) -> CostMatrix:
+    """
+    Precompute cheapest costs and next hops between every pair of cities.
+
+    Args:
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        perspective: Perspective name (see PERSPECTIVES) or edge cost function
+        method (str): 'dijkstra', 'floyd_warshall', or 'auto' to use
+            Floyd-Warshall up to FLOYD_WARSHALL_MAX_NODES cities
+        workers (int): Process count for the Dijkstra method; None or 1 runs
+            inline. Only Dijkstra runs in parallel, so 'auto' picks it
+            whenever workers is above 1.
+
+    Returns:
+        CostMatrix: Dense cost and next-hop matrices
+
+    Raises:
+        ValueError: If method is unknown, or is 'floyd_warshall' with workers above 1
+    """
+    csr = as_csr(nodes, edges)
+    cost_function = get_cost_function(perspective)
+    weights = csr.edge_weights(cost_function)
+    parallel = workers is not None and workers > 1
+    if method == "auto":
+        small = len(csr.nodes) <= FLOYD_WARSHALL_MAX_NODES
+        method = "floyd_warshall" if small and not parallel else "dijkstra"
+    if method == "floyd_warshall":
+        if parallel:
+            raise ValueError(f"Floyd-Warshall runs in one process; workers={workers} "
+                             f"needs method='dijkstra' or 'auto'")
+        costs, next_hop = _floyd_warshall_matrix(csr, weights)
+    elif method == "dijkstra":
+        costs, next_hop = _dijkstra_matrix(csr, weights, workers)
+    else:
+        raise ValueError(f"Unknown method {method!r}; expected 'auto', 'dijkstra' or 'floyd_warshall'")
+    name = perspective if isinstance(perspective, str) else cost_function.__name__
+    return CostMatrix(csr.nodes, costs, next_hop, name)
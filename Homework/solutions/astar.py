@@ -0,0 +1,139 @@
+"""
+A* Search - Goal-directed routes using city coordinates
+
+Every edge is at least as long as the straight line between its cities, and
+every per-mile rate in the cost formulas is at least the network-wide minimum
+of the attributes it is built from. Multiplying the straight-line distance to
+the target by that minimum rate (plus the fixed charge every remaining trip
+must pay) gives a lower bound on the remaining cost that never overestimates
+and never decreases by more than one edge's cost, so A* returns the same
+costs as plain Dijkstra while expanding far fewer cities.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+from typing import Callable, List, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.dijkstra_engine import astar_search, build_path
+from solutions.part_a_solution import calculate_company_cost, calculate_driver_cost
+from solutions.part_d_solution import weather_safety_cost
+from solutions.perspectives import CostFunction, get_cost_function
+
+# Key of the cached lower-bound rates in CSRGraph.extensions
+BOUNDS_CACHE_KEY = "astar_bounds"
+
+
+# ============================================================================
+# LOWER BOUNDS
+# ============================================================================
+
+def _company_bounds(nodes: List[Node]) -> Tuple[float, float]:
+    # Company cost >= platform + distance * 0.60 * traffic, each at its minimum
+    min_traffic = min(node.traffic_level for node in nodes)
+    min_platform = min(node.platform_cost for node in nodes)
+    return 0.60 * min_traffic, min_platform
+
+
+def _driver_bounds(nodes: List[Node]) -> Tuple[float, float]:
+    # Fuel and maintenance per mile at their minimums; parking is handled by
+    # the heuristic since the last trip always pays the target's parking
+    min_traffic = min(node.traffic_level for node in nodes)
+    min_fuel = min(node.fuel_cost_per_mile for node in nodes)
+    min_maintenance = min(node.maintenance_factor for node in nodes)
+    return min_fuel * min_traffic + 0.10 * min_maintenance, 0.0
+
+
+# Perspectives with a coordinate lower bound: cost function -> (per-mile rate,
+# minimum charge per trip). Weather penalties only scale costs up, so the
+# company bound holds for the weather perspective too.
+LOWER_BOUNDS = {
+    calculate_company_cost: _company_bounds,
+    calculate_driver_cost: _driver_bounds,
+    weather_safety_cost: _company_bounds,
+}
+
+
+def lower_bound_rates(csr: CSRGraph, cost_function: CostFunction) -> Tuple[float, float]:
+    """
+    Get the (per-mile rate, per-trip charge) lower bounds of a perspective.
+
+    Cached on the network until a node cost attribute changes.
+
+    Raises:
+        ValueError: If the perspective has no coordinate lower bound
+    """
+    bounds_for = LOWER_BOUNDS.get(cost_function)
+    if bounds_for is None:
+        raise ValueError(f"No coordinate lower bound for {cost_function.__name__}")
+    cache = csr.extensions.setdefault(BOUNDS_CACHE_KEY, {})
+    cached = cache.get(cost_function)
+    if cached is None or cached[0] != csr.version:
+        cached = (csr.version, bounds_for(csr.nodes))
+        cache[cost_function] = cached
+    return cached[1]
+
+
+def coordinate_heuristic(csr: CSRGraph, target: int, cost_function: CostFunction) -> Callable[[int], float]:
+    """
+    Build an admissible, consistent heuristic towards target for A*.
+
+    Args:
+        csr (CSRGraph): Network in CSR form
+        target (int): Index of the destination node
+        cost_function: Perspective with an entry in LOWER_BOUNDS
+
+    Returns:
+        Function(node index) -> lower bound on the cost from that node to target
+    """
+    per_mile, per_trip = lower_bound_rates(csr, cost_function)
+    goal = csr.nodes[target]
+    goal_x, goal_y = goal.x, goal.y
+    if cost_function is calculate_driver_cost:
+        # The trip into the target always pays the target's parking
+        per_trip = goal.parking_cost
+    nodes = csr.nodes
+
+    def heuristic(index: int) -> float:
+        if index == target:
+            return 0.0
+        node = nodes[index]
+        return math.sqrt((node.x - goal_x) ** 2 + (node.y - goal_y) ** 2) * per_mile + per_trip
+
+    return heuristic
+
+
+# ============================================================================
+# ROUTE QUERIES
+# ============================================================================
+
+def astar_route(start: Node, target: Node, nodes: List[Node],
+                edges: Union[List[Edge], Graph, CSRGraph],
+                perspective: Union[str, CostFunction] = "company") -> Tuple[List[Node], float]:
+    """
+    Find the cheapest route with A* and the coordinate lower bound.
+
+    Args:
+        start (Node): Starting city
+        target (Node): Destination city
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        perspective: 'company', 'driver' or 'weather', or their cost function
+
+    Returns:
+        Tuple[List[Node], float]: (shortest path as list of nodes, total cost)
+    """
+    if start == target:
+        return [start], 0.0
+    csr = as_csr(nodes, edges)
+    source, goal = csr.index.get(start.id), csr.index.get(target.id)
+    if source is None or goal is None:
+        return [], float('inf')
+    cost_function = get_cost_function(perspective)
+    heuristic = coordinate_heuristic(csr, goal, cost_function)
+    distances, previous, _ = astar_search(csr, source, goal, csr.edge_weights(cost_function), heuristic)
+    if distances[goal] == float('inf'):
+        return [], float('inf')
+    return build_path(csr, previous, goal), distances[goal]
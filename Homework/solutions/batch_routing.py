@@ -0,0 +1,216 @@
+"""
+Batch Routing - Many (start, target) queries answered with shared searches
+
+A dispatch tick asks for hundreds of routes, and many of them share a start
+city (drivers waiting at a hub) or a target city (riders heading to the
+airport). Instead of one search per query, queries are grouped: each group
+shares one Dijkstra run, either forward from the common start or backward
+from the common target over the reverse graph, stopping once every city
+the group needs is settled. Groups can be spread over a process pool.
+"""
+
+import heapq
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.dijkstra_engine import dijkstra_search, reverse_weights
+from solutions.perspectives import CostFunction, get_cost_function
+
+FORWARD, BACKWARD = 0, 1
+
+# A group: (direction, shared root index, [(query position, other end index)])
+QueryGroup = Tuple[int, int, List[Tuple[int, int]]]
+
+
+# ============================================================================
+# GROUPING
+# ============================================================================
+
+def group_queries(pairs: Sequence[Tuple[int, int]]) -> List[QueryGroup]:
+    """
+    Cover a list of (source, target) index pairs with as few searches as possible.
+
+    Groups are picked greedily: the start or target city shared by the most
+    unanswered queries becomes the next search, forward from a start or
+    backward from a target.
+
+    Args:
+        pairs: (source index, target index) per query
+
+    Returns:
+        List[QueryGroup]: Searches to run; every query is in exactly one group
+    """
+    by_end = ({}, {})
+    for position, (source, target) in enumerate(pairs):
+        by_end[FORWARD].setdefault(source, []).append(position)
+        by_end[BACKWARD].setdefault(target, []).append(position)
+
+    answered = bytearray(len(pairs))
+    # Max-heap of candidate searches by size; sizes only shrink, so a popped
+    # candidate is re-counted and pushed back if it is no longer the largest
+    candidates = [(-len(positions), direction, root)
+                  for direction in (FORWARD, BACKWARD)
+                  for root, positions in by_end[direction].items()]
+    heapq.heapify(candidates)
+    groups = []
+    while candidates:
+        size, direction, root = heapq.heappop(candidates)
+        positions = [p for p in by_end[direction][root] if not answered[p]]
+        if not positions:
+            continue
+        if len(positions) < -size and candidates and len(positions) < -candidates[0][0]:
+            by_end[direction][root] = positions
+            heapq.heappush(candidates, (-len(positions), direction, root))
+            continue
+        for p in positions:
+            answered[p] = 1
+        other = 1 if direction == FORWARD else 0
+        groups.append((direction, root, [(p, pairs[p][other]) for p in positions]))
+    return groups
+
+
+# ============================================================================
+# SEARCH
+# ============================================================================
+
+def run_group(csr: CSRGraph, weights: Sequence[float], backward_weights: Sequence[float],
+              group: QueryGroup) -> List[Tuple[int, List[int], float]]:
+    """
+    Answer every query of one group with a single search.
+
+    Costs are summed along each path in travel order, so they match what
+    a separate forward search per query would return.
+
+    Returns:
+        List of (query position, path as node indices, cost); ([], inf) if unreachable
+    """
+    direction, root, members = group
+    search_weights = weights if direction == FORWARD else backward_weights
+    distances, previous, _ = dijkstra_search(csr, root, search_weights,
+                                             targets=[other for _, other in members])
+    results = []
+    for position, other in members:
+        if distances[other] == float('inf'):
+            results.append((position, [], float('inf')))
+            continue
+        path = []
+        current = other
+        while current != -1:
+            path.append(current)
+            current = previous[current]
+        if direction == FORWARD:
+            path.reverse()
+        cost = 0.0
+        for tail, head in zip(path, path[1:]):
+            cost += weights[csr.arc(tail, head)]
+        results.append((position, path, cost))
+    return results
+
+
+# Graph and weights handed to each pool worker once, by the initializer
+_worker_state = {}
+
+
+def _init_worker(csr: CSRGraph, weights: array) -> None:
+    _worker_state["csr"] = csr
+    _worker_state["weights"] = weights
+    _worker_state["backward"] = reverse_weights(csr, weights)
+
+
+def _worker_groups(groups: Sequence[QueryGroup]) -> List[Tuple[int, List[int], float]]:
+    state = _worker_state
+    return [result for group in groups
+            for result in run_group(state["csr"], state["weights"], state["backward"], group)]
+
+
+# ============================================================================
+# BATCH QUERIES
+# ============================================================================
+
+def batch_routes(queries: Sequence[Tuple[Node, Node]], nodes: List[Node],
+                 edges: Union[List[Edge], Graph, CSRGraph],
+                 perspective: Union[str, CostFunction] = "company",
+                 workers: Optional[int] = None) -> List[Tuple[List[Node], float]]:
+    """
+    Find the cheapest route for every (start, target) query at once.
+
+    Args:
+        queries: (start, target) city pairs
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        perspective: Perspective name (see PERSPECTIVES) or edge cost function
+        workers (int): Process count to spread the groups over; None or 1 runs inline
+
+    Returns:
+        List[Tuple[List[Node], float]]: (path, cost) per query, in input order,
+        in the same form as the single-query route functions
+    """
+    csr = as_csr(nodes, edges)
+    weights = csr.edge_weights(get_cost_function(perspective))
+    inf = float('inf')
+    results = [([], inf)] * len(queries)
+    pairs, positions = [], []
+    for position, (start, target) in enumerate(queries):
+        source, goal = csr.index.get(start.id), csr.index.get(target.id)
+        if start == target:
+            results[position] = ([start], 0.0)
+        elif source is not None and goal is not None:
+            pairs.append((source, goal))
+            positions.append(position)
+
+    groups = group_queries(pairs)
+    if workers and workers > 1 and len(groups) > 1:
+        batches = [groups[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(csr, array('d', weights))) as pool:
+            answers = [answer for batch in pool.map(_worker_groups, batches) for answer in batch]
+    else:
+        backward = reverse_weights(csr, weights) if any(g[0] == BACKWARD for g in groups) else None
+        answers = [answer for group in groups for answer in run_group(csr, weights, backward, group)]
+
+    for pair_position, path, cost in answers:
+        if path:
+            results[positions[pair_position]] = ([csr.nodes[i] for i in path], cost)
+    return results
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_benchmark():
+    """
+    Time one dispatch tick of 300 queries, one call each versus batched.
+    """
+    from solutions.part_a_solution import dijkstra_company_route
+    from solutions.synthetic_network import grid_network
+
+    graph = grid_network(50, 50)
+    rng = random.Random(3)
+    hubs = rng.sample(graph.nodes, 10)
+    airports = rng.sample(graph.nodes, 5)
+    queries = ([(rng.choice(hubs), rng.choice(graph.nodes)) for _ in range(150)]
+               + [(rng.choice(graph.nodes), rng.choice(airports)) for _ in range(150)])
+    print("=" * 80)
+    print(f"BATCH ROUTING: {len(queries)} queries on a 2,500-city grid")
+    print("=" * 80)
+    began = time.perf_counter()
+    single = [dijkstra_company_route(start, target, graph.nodes, graph) for start, target in queries]
+    print(f"one call per query   {time.perf_counter() - began:6.2f}s")
+    csr = graph.csr()
+    groups = group_queries([(csr.index[start.id], csr.index[target.id]) for start, target in queries])
+    began = time.perf_counter()
+    batched = batch_routes(queries, graph.nodes, graph)
+    print(f"batched              {time.perf_counter() - began:6.2f}s  ({len(groups)} searches)")
+    assert [cost for _, cost in single] == [cost for _, cost in batched]
+
+
+if __name__ == "__main__":
+    run_benchmark()
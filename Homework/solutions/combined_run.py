@@ -17,7 +17,7 @@ def main():
     Run both Parts A and D with user-specified cities.
     """
     try:
-        from mn_dataset import MN_NODES_DICT, MN_EDGES
+        from mn_dataset import MN_NODES_DICT, MN_GRAPH
         from part_a_solution import dijkstra_company_route, dijkstra_driver_route
         from part_d_solution import dijkstra_with_fatigue_consideration, dijkstra_with_fairness_consideration, dijkstra_with_weather_safety
 
@@ -61,7 +61,7 @@ def main():
         
         # Company Route
         try:
-            company_path, company_cost = dijkstra_company_route(start_city, destination, list(MN_NODES_DICT.values()), MN_EDGES)
+            company_path, company_cost = dijkstra_company_route(start_city, destination, MN_GRAPH.nodes, MN_GRAPH)
             print(f"Company Route: {' -> '.join([node.name for node in company_path])}")
             print(f"Company Cost: ${company_cost:.2f}")
         except NotImplementedError:
@@ -71,7 +71,7 @@ def main():
             
         # Driver Route
         try:
-            driver_path, driver_cost = dijkstra_driver_route(start_city, destination, list(MN_NODES_DICT.values()), MN_EDGES)
+            driver_path, driver_cost = dijkstra_driver_route(start_city, destination, MN_GRAPH.nodes, MN_GRAPH)
             print(f"Driver Route: {' -> '.join([node.name for node in driver_path])}")
             print(f"Driver Cost: ${driver_cost:.2f}")
             print()
@@ -88,7 +88,7 @@ def main():
         # Run Fatigue Consideration
         print(f"\nFATIGUE CONSIDERATION (Option 1):")
         try:
-            fatigue_path, fatigue_cost = dijkstra_with_fatigue_consideration(start_city, destination, list(MN_NODES_DICT.values()), MN_EDGES)
+            fatigue_path, fatigue_cost = dijkstra_with_fatigue_consideration(start_city, destination, MN_GRAPH.nodes, MN_GRAPH)
             print(f"MODIFIED Route: {' -> '.join([node.name for node in fatigue_path])}")
             print(f"MODIFIED Cost: ${fatigue_cost:.2f}")
         except NotImplementedError:
@@ -99,7 +99,7 @@ def main():
         # Run Fairness Consideration
         print(f"\nFAIRNESS CONSIDERATION (Option 2):")
         try:
-            fairness_path, fairness_cost = dijkstra_with_fairness_consideration(start_city, destination, list(MN_NODES_DICT.values()), MN_EDGES)
+            fairness_path, fairness_cost = dijkstra_with_fairness_consideration(start_city, destination, MN_GRAPH.nodes, MN_GRAPH)
             print(f"MODIFIED Route: {' -> '.join([node.name for node in fairness_path])}")
             print(f"MODIFIED Cost: ${fairness_cost:.2f}")
         except NotImplementedError:
@@ -110,7 +110,7 @@ def main():
         # Run Weather Safety
         print(f"\nWEATHER SAFETY CONSIDERATION (Option 3):")
         try:
-            weather_path, weather_cost = dijkstra_with_weather_safety(start_city, destination, list(MN_NODES_DICT.values()), MN_EDGES)
+            weather_path, weather_cost = dijkstra_with_weather_safety(start_city, destination, MN_GRAPH.nodes, MN_GRAPH)
             print(f"MODIFIED Route: {' -> '.join([node.name for node in weather_path])}")
             print(f"MODIFIED Cost: ${weather_cost:.2f}")
         except NotImplementedError:
@@ -0,0 +1,402 @@
+"""
+Contraction Hierarchies - Preprocessed networks for very fast route queries
+
+Cities are contracted one at a time from least to most important. Removing a
+city v adds a shortcut u -> w for every trip u -> v -> w that no other road
+path (a "witness") can match, so costs between the remaining cities stay
+exact. A query then runs a bidirectional Dijkstra that only ever climbs to
+more important cities, which settles a few dozen cities even on networks with
+thousands of them. Shortcuts remember the city they skip, so routes unpack
+back into the List[Node] form the other route functions return.
+
+Each cost perspective gets its own hierarchy because contraction depends on
+the edge costs. Edge costs must be non-negative (so not the Part B subsidy).
+"""
+
+import heapq
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from array import array
+from typing import Dict, List, Sequence, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.dijkstra_engine import dijkstra_search
+from solutions.perspectives import CostFunction, get_cost_function
+
+# Key of the cached hierarchies in CSRGraph.extensions
+HIERARCHY_CACHE_KEY = "contraction_hierarchies"
+
+# Witness searches give up after settling this many cities; a missed witness
+# only costs an unnecessary shortcut, never a wrong answer
+WITNESS_SETTLE_LIMIT = 60
+
+FORWARD, BACKWARD = 0, 1
+
+
+# ============================================================================
+# CONTRACTION
+# ============================================================================
+
+def _witness_costs(outgoing: List[Dict[int, Tuple[float, int]]], source: int, skip: int,
+                   limit: float) -> Dict[int, float]:
+    """
+    Dijkstra from source over the remaining network, avoiding skip and
+    stopping once costs exceed limit or the settle limit is reached.
+    """
+    distances = {source: 0.0}
+    settled = set()
+    pq = [(0.0, source)]
+    while pq and len(settled) < WITNESS_SETTLE_LIMIT:
+        current_dist, current = heapq.heappop(pq)
+        if current in settled:
+            continue
+        if current_dist > limit:
+            break
+        settled.add(current)
+        for neighbor, (weight, _) in outgoing[current].items():
+            if neighbor == skip:
+                continue
+            new_distance = current_dist + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                heapq.heappush(pq, (new_distance, neighbor))
+    return distances
+
+
+def _needed_shortcuts(outgoing: List[Dict[int, Tuple[float, int]]],
+                      incoming: List[Dict[int, Tuple[float, int]]],
+                      v: int) -> List[Tuple[int, int, float]]:
+    """
+    List the shortcuts (u, w, cost) that contracting v would require.
+    """
+    shortcuts = []
+    heads = outgoing[v]
+    if not heads:
+        return shortcuts
+    max_out = max(weight for weight, _ in heads.values())
+    for u, (in_weight, _) in incoming[v].items():
+        witness = _witness_costs(outgoing, u, v, in_weight + max_out)
+        for w, (out_weight, _) in heads.items():
+            if w == u:
+                continue
+            via = in_weight + out_weight
+            if witness.get(w, float('inf')) > via:
+                shortcuts.append((u, w, via))
+    return shortcuts
+
+
+def _priority(outgoing, incoming, v: int, shortcuts: int, deleted_neighbors: List[int]) -> int:
+    # Edge difference (shortcuts added minus arcs removed), plus a term that
+    # spreads contraction evenly over the network
+    return 2 * (shortcuts - len(outgoing[v]) - len(incoming[v])) + deleted_neighbors[v]
+
+
+def _flatten(arc_lists: List[List[Tuple[int, float, int]]]) -> Tuple[array, array, array, array]:
+    # Per-node arc lists -> (offsets, heads, weights, middles) flat arrays
+    offsets, heads, weights, middles = array('i', [0]), array('i'), array('d'), array('i')
+    for arcs in arc_lists:
+        for head, weight, middle in arcs:
+            heads.append(head)
+            weights.append(weight)
+            middles.append(middle)
+        offsets.append(len(heads))
+    return offsets, heads, weights, middles
+
+
+class ContractionHierarchy:
+    """
+    Upward search graphs of a contracted network for one cost perspective.
+
+    Arcs are stored in two CSR-style layouts indexed by their less important
+    end: forward arcs v -> w and backward arcs u -> v (stored at v with head u),
+    where w and u rank above v. middle is the skipped city of a shortcut, or -1
+    for an original road.
+
+    Attributes:
+        csr (CSRGraph): Network the hierarchy was built from
+        weights (Sequence[float]): Arc weights of the perspective
+        rank (array): Contraction order of each node (higher = more important)
+        forward (Tuple[array, array, array, array]): (offsets, heads, weights, middles)
+        backward (Tuple[array, array, array, array]): Same layout for backward arcs
+        shortcut_count (int): Number of shortcuts added during contraction
+        version (int): csr.version when the hierarchy was built
+    """
+
+    def __init__(self, csr: CSRGraph, weights: Sequence[float]):
+        self.csr = csr
+        self.weights = weights
+        self.version = csr.version
+        self.shortcut_count = 0
+        self._contract()
+
+    def _contract(self):
+        csr, weights = self.csr, self.weights
+        n = len(csr.nodes)
+        outgoing = [{} for _ in range(n)]
+        incoming = [{} for _ in range(n)]
+        for arc, (tail, head) in enumerate(csr.arcs()):
+            if weights[arc] < 0:
+                raise ValueError("Contraction hierarchies need non-negative edge costs")
+            if tail != head and weights[arc] < outgoing[tail].get(head, (float('inf'),))[0]:
+                outgoing[tail][head] = incoming[head][tail] = (weights[arc], -1)
+
+        deleted_neighbors = [0] * n
+        pq = [(_priority(outgoing, incoming, v, len(_needed_shortcuts(outgoing, incoming, v)),
+                         deleted_neighbors), v) for v in range(n)]
+        heapq.heapify(pq)
+        self.rank = array('i', [0] * n)
+        forward_arcs = [[] for _ in range(n)]
+        backward_arcs = [[] for _ in range(n)]
+        contracted = bytearray(n)
+        order = 0
+
+        while pq:
+            _, v = heapq.heappop(pq)
+            if contracted[v]:
+                continue
+            # Lazy update: priorities of the remaining cities go stale as
+            # their neighbors are contracted
+            shortcuts = _needed_shortcuts(outgoing, incoming, v)
+            priority = _priority(outgoing, incoming, v, len(shortcuts), deleted_neighbors)
+            if pq and priority > pq[0][0]:
+                heapq.heappush(pq, (priority, v))
+                continue
+
+            for u, w, cost in shortcuts:
+                if cost < outgoing[u].get(w, (float('inf'),))[0]:
+                    outgoing[u][w] = incoming[w][u] = (cost, v)
+                    self.shortcut_count += 1
+            forward_arcs[v] = [(w, weight, middle) for w, (weight, middle) in outgoing[v].items()]
+            backward_arcs[v] = [(u, weight, middle) for u, (weight, middle) in incoming[v].items()]
+            for w in outgoing[v]:
+                del incoming[w][v]
+                deleted_neighbors[w] += 1
+            for u in incoming[v]:
+                del outgoing[u][v]
+                deleted_neighbors[u] += 1
+            outgoing[v], incoming[v] = {}, {}
+            contracted[v] = 1
+            self.rank[v] = order
+            order += 1
+
+        self.forward = _flatten(forward_arcs)
+        self.backward = _flatten(backward_arcs)
+
+    @property
+    def is_current(self) -> bool:
+        """Whether no node cost attribute has changed since contraction."""
+        return self.version == self.csr.version
+
+    def _middle(self, tail: int, head: int) -> int:
+        # The arc between tail and head is stored at the less important end
+        if self.rank[tail] < self.rank[head]:
+            offsets, heads, _, middles = self.forward
+            low, high = tail, head
+        else:
+            offsets, heads, _, middles = self.backward
+            low, high = head, tail
+        for arc in range(offsets[low], offsets[low + 1]):
+            if heads[arc] == high:
+                return middles[arc]
+        raise KeyError((tail, head))
+
+    def _unpack(self, tail: int, head: int, middle: int, path: List[int]):
+        # Append the original cities after tail on the arc tail -> head
+        stack = [(tail, head, middle)]
+        while stack:
+            tail, head, middle = stack.pop()
+            if middle == -1:
+                path.append(head)
+            else:
+                stack.append((middle, head, self._middle(middle, head)))
+                stack.append((tail, middle, self._middle(tail, middle)))
+
+    def search(self, source: int, target: int) -> Tuple[float, List[int], int]:
+        """
+        Run the bidirectional upward query between two node indices.
+
+        Returns:
+            Tuple[float, List[int], int]: (cost, path as node indices,
+            settled nodes over both directions); (inf, []) if unreachable
+        """
+        if source == target:
+            return 0.0, [source], 1
+        inf = float('inf')
+        graphs = (self.forward, self.backward)
+        distances = ({source: 0.0}, {target: 0.0})
+        # node -> (previous node, arc index in that direction's arrays)
+        previous = ({source: (-1, -1)}, {target: (-1, -1)})
+        settled = (set(), set())
+        queues = ([(0.0, source)], [(0.0, target)])
+        best, meeting = inf, -1
+
+        while queues[FORWARD] or queues[BACKWARD]:
+            side = FORWARD if not queues[BACKWARD] or (
+                queues[FORWARD] and queues[FORWARD][0][0] <= queues[BACKWARD][0][0]) else BACKWARD
+            current_dist, current = heapq.heappop(queues[side])
+            if current_dist >= best:
+                queues[side].clear()  # Nothing more on this side can improve best
+                continue
+            if current in settled[side]:
+                continue
+            settled[side].add(current)
+            dist = distances[side]
+            if current in distances[1 - side] and current_dist + distances[1 - side][current] < best:
+                best, meeting = current_dist + distances[1 - side][current], current
+
+            # Stall-on-demand: skip relaxing if a more important city reaches
+            # current more cheaply than this search did
+            offsets, heads, weights, _ = graphs[1 - side]
+            if any(dist.get(heads[arc], inf) + weights[arc] < current_dist
+                   for arc in range(offsets[current], offsets[current + 1])):
+                continue
+
+            offsets, heads, weights, _ = graphs[side]
+            for arc in range(offsets[current], offsets[current + 1]):
+                neighbor = heads[arc]
+                new_distance = current_dist + weights[arc]
+                if new_distance < dist.get(neighbor, inf):
+                    dist[neighbor] = new_distance
+                    previous[side][neighbor] = (current, arc)
+                    heapq.heappush(queues[side], (new_distance, neighbor))
+
+        settled_count = len(settled[FORWARD]) + len(settled[BACKWARD])
+        if meeting == -1:
+            return inf, [], settled_count
+
+        # Upward arcs from source to the meeting city, then down to target
+        ups = []
+        current = meeting
+        while previous[FORWARD][current][0] != -1:
+            tail, arc = previous[FORWARD][current]
+            ups.append((tail, current, self.forward[3][arc]))
+            current = tail
+        path = [source]
+        for tail, head, middle in reversed(ups):
+            self._unpack(tail, head, middle, path)
+        current = meeting
+        while previous[BACKWARD][current][0] != -1:
+            head, arc = previous[BACKWARD][current]
+            self._unpack(current, head, self.backward[3][arc], path)
+            current = head
+        return best, path, settled_count
+
+    def route(self, start: Node, target: Node) -> Tuple[List[Node], float]:
+        """
+        Find the cheapest route between two cities using the hierarchy.
+
+        The returned cost is summed along the unpacked route in travel order,
+        so it matches the plain Dijkstra functions exactly.
+        """
+        if start == target:
+            return [start], 0.0
+        csr = self.csr
+        source, goal = csr.index.get(start.id), csr.index.get(target.id)
+        if source is None or goal is None:
+            return [], float('inf')
+        _, path, _ = self.search(source, goal)
+        if not path:
+            return [], float('inf')
+        cost = 0.0
+        for tail, head in zip(path, path[1:]):
+            cost += self.weights[csr.arc(tail, head)]
+        return [csr.nodes[i] for i in path], cost
+
+
+# ============================================================================
+# ROUTE QUERIES
+# ============================================================================
+
+def contraction_hierarchy(nodes: List[Node], edges: Union[List[Edge], Graph, CSRGraph],
+                          perspective: Union[str, CostFunction] = "company") -> ContractionHierarchy:
+    """
+    Get the contraction hierarchy of a network for a perspective.
+
+    Built on first use and cached on the network until a node cost attribute
+    changes.
+
+    Args:
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        perspective: 'company', 'driver', 'weather' (or another perspective
+            name), or an edge cost function with non-negative costs
+
+    Returns:
+        ContractionHierarchy: The preprocessed network
+
+    Raises:
+        ValueError: If the perspective is unknown or has negative edge costs
+    """
+    csr = as_csr(nodes, edges)
+    cost_function = get_cost_function(perspective)
+    cache = csr.extensions.setdefault(HIERARCHY_CACHE_KEY, {})
+    hierarchy = cache.get(cost_function)
+    if hierarchy is None or not hierarchy.is_current:
+        hierarchy = cache[cost_function] = ContractionHierarchy(csr, csr.edge_weights(cost_function))
+    return hierarchy
+
+
+def ch_route(start: Node, target: Node, nodes: List[Node],
+             edges: Union[List[Edge], Graph, CSRGraph],
+             perspective: Union[str, CostFunction] = "company") -> Tuple[List[Node], float]:
+    """
+    Find the cheapest route with a contraction hierarchy.
+
+    Args:
+        start (Node): Starting city
+        target (Node): Destination city
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        perspective: 'company', 'driver' or 'weather', or a cost function
+
+    Returns:
+        Tuple[List[Node], float]: (shortest path as list of nodes, total cost)
+    """
+    return contraction_hierarchy(nodes, edges, perspective).route(start, target)
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_benchmark():
+    """
+    Print preprocessing and query times against plain Dijkstra.
+    """
+    from mn_dataset import MN_GRAPH
+    from solutions.synthetic_network import grid_network
+
+    rng = random.Random(11)
+    print("=" * 80)
+    print("CONTRACTION HIERARCHY BENCHMARK")
+    print("=" * 80)
+    for label, graph in [("Minnesota (25 cities)", MN_GRAPH), ("Synthetic grid (2,500 cities)", grid_network(50, 50))]:
+        csr = graph.csr()
+        n = len(csr.nodes)
+        pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(200)]
+        for perspective in ("company", "driver", "weather"):
+            began = time.perf_counter()
+            hierarchy = contraction_hierarchy(graph.nodes, graph, perspective)
+            build_seconds = time.perf_counter() - began
+
+            plain_settled = ch_settled = 0
+            began = time.perf_counter()
+            for source, target in pairs:
+                plain_settled += dijkstra_search(csr, source, hierarchy.weights, target)[2]
+            plain_seconds = time.perf_counter() - began
+            began = time.perf_counter()
+            for source, target in pairs:
+                ch_settled += hierarchy.search(source, target)[2]
+            ch_seconds = time.perf_counter() - began
+
+            print(f"{label:30} {perspective:8} build {build_seconds:6.2f}s  "
+                  f"shortcuts {hierarchy.shortcut_count:6d}  per query: Dijkstra "
+                  f"{plain_seconds / len(pairs) * 1000:6.2f}ms ({plain_settled // len(pairs)} settled), "
+                  f"CH {ch_seconds / len(pairs) * 1000:5.2f}ms ({ch_settled // len(pairs)} settled)")
+
+
+if __name__ == "__main__":
+    run_benchmark()
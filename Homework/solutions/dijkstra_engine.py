@@ -0,0 +1,251 @@
+"""
+Dijkstra Engine - One shortest-path search shared by every cost perspective
+
+The route functions in Parts A, B and D only differ in how an edge is priced.
+This file holds the single Dijkstra implementation they all wrap: it runs over
+the CSR form of the network with integer node ids, stops as soon as the target
+is settled, and skips stale heap entries instead of decreasing keys. Its
+goal-directed A* form takes a lower-bound heuristic on the remaining cost.
+"""
+
+import heapq
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from array import array
+from typing import Callable, Collection, List, Optional, Sequence, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+
+EdgeCost = Union[Callable[[Node, Node], float], Sequence[float]]
+
+
+# ============================================================================
+# CORE SEARCH
+# ============================================================================
+
+def dijkstra_search(csr: CSRGraph, source: int, weights: Sequence[float],
+                    target: int = -1,
+                    targets: Optional[Collection[int]] = None) -> Tuple[List[float], List[int], int]:
+    """
+    Run Dijkstra's algorithm from one node index over a CSRGraph.
+
+    Every node is settled at most once, even if a negative weight would
+    later lower its distance; this keeps Dijkstra's greedy behaviour that
+    Part B demonstrates.
+
+    Args:
+        csr (CSRGraph): Network in CSR form
+        source (int): Index of the start node
+        weights: Arc weights aligned with csr.targets
+        target (int): Index at which to stop early, or -1 to settle every reachable node
+        targets: Indices to stop after once all of them are settled (in
+            addition to target)
+
+    Returns:
+        Tuple[List[float], List[int], int]: (distances, previous node index or -1,
+        number of settled nodes)
+    """
+    n = len(csr.nodes)
+    distances = [float('inf')] * n
+    distances[source] = 0.0
+    previous = [-1] * n
+    settled = bytearray(n)
+    settled_count = 0
+    goals, pending = None, 0
+    if targets:
+        goals = bytearray(n)
+        for goal in targets:
+            if not goals[goal]:
+                goals[goal] = 1
+                pending += 1
+    offsets, heads = csr.offsets, csr.targets
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    # Heap entries are (distance, node index); ints compare cheaply, so no
+    # tie-breaking counter is needed
+    pq = [(0.0, source)]
+    while pq:
+        current_dist, current = heappop(pq)
+        if settled[current]:
+            continue  # Stale entry left behind by a later improvement
+        settled[current] = 1
+        settled_count += 1
+        if current == target:
+            break
+        if pending and goals[current]:
+            pending -= 1
+            if not pending:
+                break
+        for arc in range(offsets[current], offsets[current + 1]):
+            neighbor = heads[arc]
+            if settled[neighbor]:
+                continue
+            new_distance = current_dist + weights[arc]
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                previous[neighbor] = current
+                heappush(pq, (new_distance, neighbor))
+    return distances, previous, settled_count
+
+
+def astar_search(csr: CSRGraph, source: int, target: int, weights: Sequence[float],
+                 heuristic: Callable[[int], float]) -> Tuple[List[float], List[int], int]:
+    """
+    Run A* from one node index to another over a CSRGraph.
+
+    Nodes are popped in order of distance + heuristic, so a heuristic that
+    never overestimates the remaining cost and satisfies
+    h(u) <= weight(u, v) + h(v) finds the same cost as dijkstra_search while
+    settling fewer nodes.
+
+    Args:
+        csr (CSRGraph): Network in CSR form
+        source (int): Index of the start node
+        target (int): Index of the destination node
+        weights: Non-negative arc weights aligned with csr.targets
+        heuristic: Function(node index) -> lower bound on the cost to target
+
+    Returns:
+        Tuple[List[float], List[int], int]: (distances, previous node index or -1,
+        number of settled nodes)
+    """
+    n = len(csr.nodes)
+    distances = [float('inf')] * n
+    distances[source] = 0.0
+    previous = [-1] * n
+    settled = bytearray(n)
+    settled_count = 0
+    offsets, targets = csr.offsets, csr.targets
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    pq = [(heuristic(source), source)]
+    while pq:
+        _, current = heappop(pq)
+        if settled[current]:
+            continue
+        settled[current] = 1
+        settled_count += 1
+        if current == target:
+            break
+        current_dist = distances[current]
+        for arc in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[arc]
+            if settled[neighbor]:
+                continue
+            new_distance = current_dist + weights[arc]
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                previous[neighbor] = current
+                heappush(pq, (new_distance + heuristic(neighbor), neighbor))
+    return distances, previous, settled_count
+
+
+def reverse_weights(csr: CSRGraph, weights: Sequence[float]) -> array:
+    """
+    Weights of the reverse graph: arc u -> v costs what the forward trip v -> u does.
+
+    A search with these weights from t finds every node's cost to reach t.
+    """
+    return array('d', (weights[arc] for arc in csr.reverse_arcs))
+
+
+def build_path(csr: CSRGraph, previous: Sequence[int], goal: int) -> List[Node]:
+    """
+    Follow predecessor indices back from goal and return the path as Nodes.
+    """
+    path = []
+    current = goal
+    while current != -1:
+        path.append(csr.nodes[current])
+        current = previous[current]
+    path.reverse()
+    return path
+
+
+def first_hops(source: int, previous: Sequence[int]) -> array:
+    """
+    Turn a predecessor array into the first hop from source towards every node.
+
+    Each predecessor chain is walked once and memoized, so this is O(n).
+    """
+    n = len(previous)
+    hops = array('i', [-1]) * n
+    for node in range(n):
+        if node == source or previous[node] == -1 or hops[node] != -1:
+            continue
+        chain = []
+        current = node
+        while hops[current] == -1 and previous[current] != source:
+            chain.append(current)
+            current = previous[current]
+        hop = current if hops[current] == -1 else hops[current]
+        hops[current] = hop
+        for visited in chain:
+            hops[visited] = hop
+    return hops
+
+
+# ============================================================================
+# ROUTE QUERIES
+# ============================================================================
+
+def csr_route(start: Node, target: Node, csr: CSRGraph, weights: Sequence[float]) -> Tuple[List[Node], float]:
+    """
+    Find the cheapest route between two cities given precomputed arc weights.
+
+    Args:
+        start (Node): Starting city
+        target (Node): Destination city
+        csr (CSRGraph): Network in CSR form
+        weights: Arc weights aligned with csr.targets
+
+    Returns:
+        Tuple[List[Node], float]: (shortest path as list of nodes, total cost)
+    """
+    if start == target:
+        return [start], 0.0
+    source = csr.index.get(start.id)
+    goal = csr.index.get(target.id)
+    if source is None or goal is None:
+        return [], float('inf')
+
+    distances, previous, _ = dijkstra_search(csr, source, weights, goal)
+    if distances[goal] == float('inf'):
+        return [], float('inf')
+    return build_path(csr, previous, goal), distances[goal]
+
+
+def resolve_weights(csr: CSRGraph, edge_cost: EdgeCost) -> Sequence[float]:
+    """
+    Turn an edge cost callable into the network's cached arc weights.
+
+    Precomputed weight arrays are passed through after a length check.
+    """
+    if callable(edge_cost):
+        return csr.edge_weights(edge_cost)
+    if len(edge_cost) != csr.num_arcs:
+        raise ValueError(f"Expected {csr.num_arcs} arc weights, got {len(edge_cost)}")
+    return edge_cost
+
+
+def dijkstra_route(start: Node, target: Node, nodes: List[Node],
+                   edges: Union[List[Edge], Graph, CSRGraph],
+                   edge_cost: EdgeCost) -> Tuple[List[Node], float]:
+    """
+    Find the cheapest route under any cost perspective.
+
+    Args:
+        start (Node): Starting city
+        target (Node): Destination city
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections; pass a
+            Graph or CSRGraph to reuse cached weights across queries
+        edge_cost: Function(from_node, to_node) -> cost, or arc weights
+            aligned with the CSR form of the network
+
+    Returns:
+        Tuple[List[Node], float]: (shortest path as list of nodes, total cost)
+    """
+    csr = as_csr(nodes, edges)
+    return csr_route(start, target, csr, resolve_weights(csr, edge_cost))
@@ -0,0 +1,220 @@
+"""
+Dynamic Shortest Paths - Repairing trees after city conditions change
+
+When a city's traffic or weather changes, only the roads into and out of it
+are repriced, and most of a shortest path tree is still correct. Instead of
+searching again from scratch, a tree is repaired in the style of
+Ramalingam and Reps:
+
+1. Tree roads that became more expensive invalidate the subtree below them;
+   those cities are reset and reconnected through their cheapest neighbor
+   outside the subtree.
+2. Roads that became cheaper seed improvements at their head city.
+3. A Dijkstra pass spreads both kinds of changes, touching only the cities
+   whose cost or predecessor actually moves.
+
+Requires non-negative edge costs, like every exact Dijkstra variant.
+"""
+
+import heapq
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from typing import Iterable, List, Optional, Sequence, Set
+from main import Node, CSRGraph
+
+# Key of the change log in CSRGraph.extensions
+CHANGE_LOG_KEY = "node_change_log"
+
+# Changes remembered per network; trees older than the log are recomputed
+MAX_LOGGED_CHANGES = 4096
+
+
+class NodeChangeLog:
+    """
+    Records which cities changed, so stale trees know what to repair.
+
+    Every recorded change matches one increment of csr.version, so the
+    changes since any version are a slice of the log.
+
+    Attributes:
+        csr (CSRGraph): Network being watched
+        base_version (int): csr.version at the first logged change
+        changes (List[int]): Node index of every change, oldest first
+    """
+
+    def __init__(self, csr: CSRGraph):
+        self.csr = csr
+        self.base_version = csr.version
+        self.changes = []
+        for node in csr.nodes:
+            node.add_observer(self)
+
+    def node_changed(self, node: Node) -> None:
+        """
+        Observer hook: append the changed city, forgetting the oldest half
+        of the log once it is full.
+        """
+        index = self.csr.index.get(node.id)
+        if index is None:
+            return
+        self.changes.append(index)
+        if len(self.changes) > MAX_LOGGED_CHANGES:
+            dropped = len(self.changes) - MAX_LOGGED_CHANGES // 2
+            del self.changes[:dropped]
+            self.base_version += dropped
+
+    def changed_since(self, version: int) -> Optional[Set[int]]:
+        """
+        Get the indices of cities changed after a given csr.version.
+
+        Returns:
+            Set[int] of node indices, or None if the log no longer reaches back that far
+        """
+        if version < self.base_version:
+            return None
+        return set(self.changes[version - self.base_version:])
+
+
+def change_log(csr: CSRGraph) -> NodeChangeLog:
+    """
+    Get the change log of a network, starting it on first use.
+    """
+    log = csr.extensions.get(CHANGE_LOG_KEY)
+    if log is None:
+        log = csr.extensions[CHANGE_LOG_KEY] = NodeChangeLog(csr)
+    return log
+
+
+def repair_tree(csr: CSRGraph, source: int, distances: List[float], previous: List[int],
+                changed: Iterable[int], weights: Sequence[float]) -> int:
+    """
+    Repair single-source distances and predecessors in place after node changes.
+
+    Args:
+        csr (CSRGraph): Network in CSR form
+        source (int): Index of the tree's root
+        distances (List[float]): Distances computed before the change
+        previous (List[int]): Predecessors computed before the change
+        changed: Indices of the cities whose cost attributes changed
+        weights: Current non-negative arc weights aligned with csr.targets
+
+    Returns:
+        int: Number of cities reset or settled by the repair (0 if the
+        changes did not touch the tree)
+    """
+    inf = float('inf')
+    n = len(csr.nodes)
+    offsets, targets, reverse_arcs = csr.offsets, csr.targets, csr.reverse_arcs
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    # Repriced arcs: every arc leaving or entering a changed city that the
+    # old tree reached (unreachable cities cannot affect the tree)
+    repriced = []
+    for city in changed:
+        if distances[city] == inf:
+            continue
+        for arc in range(offsets[city], offsets[city + 1]):
+            repriced.append((city, targets[arc], arc))
+            repriced.append((targets[arc], city, reverse_arcs[arc]))
+    if not repriced:
+        return 0
+
+    # 1. Tree arcs that got more expensive invalidate their subtrees
+    invalid_roots = [head for tail, head, arc in repriced
+                     if previous[head] == tail and distances[tail] + weights[arc] > distances[head]]
+    affected = bytearray(n)
+    invalidated = []
+    if invalid_roots:
+        children = [[] for _ in range(n)]
+        for v, parent in enumerate(previous):
+            if parent != -1:
+                children[parent].append(v)
+        stack = [root for root in invalid_roots if root != source]
+        while stack:
+            v = stack.pop()
+            if affected[v]:
+                continue
+            affected[v] = 1
+            invalidated.append(v)
+            distances[v] = inf
+            previous[v] = -1
+            stack.extend(children[v])
+
+    # Reconnect each invalidated city through its cheapest valid neighbor
+    pq = []
+    for v in invalidated:
+        for arc in range(offsets[v], offsets[v + 1]):
+            u = targets[arc]
+            if affected[u]:
+                continue
+            candidate = distances[u] + weights[reverse_arcs[arc]]
+            if candidate < distances[v]:
+                distances[v] = candidate
+                previous[v] = u
+        if distances[v] != inf:
+            heappush(pq, (distances[v], v))
+
+    # 2. Cheaper arcs (or tree arcs whose new price still fits) seed updates
+    for tail, head, arc in repriced:
+        if affected[tail] or distances[tail] == inf:
+            continue
+        candidate = distances[tail] + weights[arc]
+        if candidate < distances[head]:
+            distances[head] = candidate
+            previous[head] = tail
+            heappush(pq, (candidate, head))
+
+    # 3. Spread the changes in distance order
+    touched = len(invalidated)
+    while pq:
+        current_dist, current = heappop(pq)
+        if current_dist > distances[current]:
+            continue  # Stale entry
+        touched += 1
+        for arc in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[arc]
+            new_distance = current_dist + weights[arc]
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                previous[neighbor] = current
+                heappush(pq, (new_distance, neighbor))
+    return touched
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_benchmark():
+    """
+    Replay a live weather feed against cached weather-perspective trees,
+    repairing them versus recomputing them from scratch.
+    """
+    from solutions.shortest_path_tree import shortest_path_tree
+    from solutions.synthetic_network import WEATHER_CHOICES, grid_network
+
+    print("=" * 80)
+    print("DYNAMIC SHORTEST PATHS: 100 single-city weather updates, 20 cached trees")
+    print("=" * 80)
+    for incremental in (False, True):
+        graph = grid_network(50, 50)
+        starts = random.Random(1).sample(graph.nodes, 20)
+        for start in starts:
+            shortest_path_tree(start, graph.nodes, graph, "weather")
+        rng = random.Random(13)
+        feed = [(rng.choice(graph.nodes), rng.choice(WEATHER_CHOICES)) for _ in range(100)]
+        began = time.perf_counter()
+        for city, condition in feed:
+            city.weather_condition = condition
+            for start in starts:
+                shortest_path_tree(start, graph.nodes, graph, "weather", incremental=incremental)
+        label = "repair" if incremental else "recompute"
+        print(f"{label:10} {time.perf_counter() - began:6.2f}s")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,186 @@
+"""
+Fatigue Search - Product-state Dijkstra for the fatigue rule
+
+The fatigue penalty of a drive depends on the drives before it, so a city
+alone is not a search state: the search runs over (city, fatigue level)
+pairs, where the level counts the consecutive long drives so far, capped at
+len(penalties) - 1. A long drive at level c costs penalties[c] on top of
+its regular cost and moves to level c + 1; a short drive resets the level.
+Part D's rule ($15 for a long drive, $50 when the previous drive was also
+long) is penalties = (15, 50).
+
+Each pair is packed into one integer, city * levels + level, so distances,
+predecessors and settled flags are flat arrays of n * levels entries and
+k fatigue levels only cost k times the states of a plain search. Drive
+lengths come from a cached weight table like any other cost. Heap entries
+pop in cost order, so the first state of the target city to be settled is
+the cheapest one and the search stops there.
+"""
+
+import heapq
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from array import array
+from typing import Callable, List, Sequence, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.part_a_solution import calculate_company_cost
+
+# Drives at least this many miles long are tiring
+LONG_DRIVE_MILES = 10.0
+
+# Part D's rule: $15 for a long drive, $50 if the previous drive was long too
+FATIGUE_PENALTIES = (15.0, 50.0)
+
+
+def drive_distance(from_node: Node, to_node: Node) -> float:
+    """
+    Length of a drive in miles, usable as an edge cost for a weight table.
+    """
+    return from_node.distance_to(to_node)
+
+
+def fatigue_search(csr: CSRGraph, source: int, target: int, weights: Sequence[float],
+                   lengths: Sequence[float], penalties: Sequence[float] = FATIGUE_PENALTIES,
+                   long_drive: float = LONG_DRIVE_MILES) -> Tuple[float, List[int], int]:
+    """
+    Find the cheapest route under a multi-level fatigue rule.
+
+    Args:
+        csr (CSRGraph): Network in CSR form
+        source (int): Index of the start node
+        target (int): Index of the destination node
+        weights: Non-negative arc weights aligned with csr.targets
+        lengths: Drive length of every arc, aligned with csr.targets
+        penalties: Surcharge for a long drive after 0, 1, ... consecutive long
+            drives; the last entry applies to every longer streak
+        long_drive (float): Minimum length of a long drive
+
+    Returns:
+        Tuple[float, List[int], int]: (cost, path as node indices, number of
+        settled states); (inf, [], settled) if the target is unreachable
+    """
+    levels = len(penalties)
+    top = levels - 1
+    inf = float('inf')
+    size = len(csr.nodes) * levels
+    distances = [inf] * size
+    previous = array('i', [-1]) * size
+    settled = bytearray(size)
+    settled_count = 0
+    offsets, targets = csr.offsets, csr.targets
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    start_state = source * levels
+    distances[start_state] = 0.0
+    pq = [(0.0, start_state)]
+    goal_state = -1
+    while pq:
+        current_dist, state = heappop(pq)
+        if settled[state]:
+            continue
+        settled[state] = 1
+        settled_count += 1
+        current, level = divmod(state, levels)
+        if current == target:
+            goal_state = state
+            break
+        penalty = penalties[level]
+        tired_level = level + 1 if level < top else top
+        for arc in range(offsets[current], offsets[current + 1]):
+            if lengths[arc] >= long_drive:
+                next_state = targets[arc] * levels + tired_level
+                new_distance = current_dist + (weights[arc] + penalty)
+            else:
+                next_state = targets[arc] * levels
+                new_distance = current_dist + weights[arc]
+            if new_distance < distances[next_state]:
+                distances[next_state] = new_distance
+                previous[next_state] = state
+                heappush(pq, (new_distance, next_state))
+
+    if goal_state == -1:
+        return inf, [], settled_count
+    path = []
+    state = goal_state
+    while state != -1:
+        path.append(state // levels)
+        state = previous[state]
+    path.reverse()
+    return distances[goal_state], path, settled_count
+
+
+def fatigue_route(start: Node, target: Node, nodes: List[Node],
+                  edges: Union[List[Edge], Graph, CSRGraph],
+                  penalties: Sequence[float] = FATIGUE_PENALTIES,
+                  edge_cost: Callable[[Node, Node], float] = calculate_company_cost,
+                  long_drive: float = LONG_DRIVE_MILES) -> Tuple[List[Node], float]:
+    """
+    Find the cheapest route when consecutive long drives get more expensive.
+
+    Args:
+        start (Node): Starting city
+        target (Node): Destination city
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        penalties: Surcharge for a long drive after 0, 1, ... consecutive long
+            drives (default: Part D's $15 / $50 rule)
+        edge_cost: Function(from_node, to_node) -> non-negative regular cost
+        long_drive (float): Minimum length of a long drive in miles
+
+    Returns:
+        Tuple[List[Node], float]: (cheapest path as list of nodes, total cost)
+
+    Raises:
+        ValueError: If penalties is empty or has a negative entry
+    """
+    if not penalties or min(penalties) < 0:
+        raise ValueError(f"penalties must be non-empty and non-negative, got {penalties!r}")
+    csr = as_csr(nodes, edges)
+    source, goal = csr.index.get(start.id), csr.index.get(target.id)
+    if source is None or goal is None:
+        return ([start], 0.0) if start == target else ([], float('inf'))
+    cost, path, _ = fatigue_search(csr, source, goal, csr.edge_weights(edge_cost),
+                                   csr.edge_weights(drive_distance), penalties, long_drive)
+    return [csr.nodes[i] for i in path], cost
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_benchmark():
+    """
+    Time fatigue queries on a 2,500-city grid with long roads, from Part D's
+    two-level rule up to eight levels, next to a plain company search.
+    """
+    from solutions.dijkstra_engine import dijkstra_search
+    from solutions.synthetic_network import grid_network
+
+    graph = grid_network(50, 50, spacing=9.0)
+    csr = graph.csr()
+    weights = csr.edge_weights(calculate_company_cost)
+    lengths = csr.edge_weights(drive_distance)
+    rng = random.Random(4)
+    queries = [(csr.index[s.id], csr.index[t.id])
+               for s, t in ((rng.choice(graph.nodes), rng.choice(graph.nodes)) for _ in range(50))]
+    print("=" * 80)
+    print(f"FATIGUE SEARCH: {len(queries)} queries, 2,500-city grid")
+    print("=" * 80)
+    began = time.perf_counter()
+    for source, goal in queries:
+        dijkstra_search(csr, source, weights, goal)
+    print(f"no fatigue rule    {(time.perf_counter() - began) / len(queries) * 1000:7.2f}ms per query")
+    for penalties in ((15.0, 50.0), (15.0, 50.0, 90.0, 140.0), tuple(15.0 + 25.0 * i for i in range(8))):
+        began = time.perf_counter()
+        states = sum(fatigue_search(csr, s, t, weights, lengths, penalties)[2] for s, t in queries)
+        elapsed = (time.perf_counter() - began) / len(queries) * 1000
+        print(f"{len(penalties)} fatigue levels  {elapsed:7.2f}ms per query, "
+              f"{states / len(queries):7.0f} states settled")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,256 @@
+"""
+Johnson Reweighting - Dijkstra-speed queries on networks with subsidies
+
+SPFA answers subsidized queries exactly but needs many rounds per search.
+Johnson's method pays for one SPFA pass per network instead: starting every
+city at cost 0 (as if a virtual city reached each of them for free) gives a
+potential h(v) with h(v) <= h(u) + w(u, v) on every road, so the reduced
+weights
+
+    w'(u, v) = w(u, v) + h(u) - h(v)
+
+are never negative. Every route from s to t changes by exactly h(s) - h(t),
+so the cheapest routes stay the same and Dijkstra can find them again.
+
+Potentials are cached per network and perspective. When subsidies or city
+conditions change, the old potentials are kept if they still make every
+reduced weight non-negative, and a new SPFA pass runs only if they do not.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from array import array
+from typing import List, Optional, Sequence, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.dijkstra_engine import dijkstra_search
+from solutions.perspectives import CostFunction, get_cost_function
+from solutions.spfa import Subsidies, spfa_search, subsidized_weights
+
+# Key of the cached reweightings in CSRGraph.extensions
+JOHNSON_CACHE_KEY = "johnson_reweightings"
+
+
+class JohnsonReweighting:
+    """
+    Potentials and non-negative reduced weights for one set of arc weights.
+
+    Attributes:
+        csr (CSRGraph): Network in CSR form
+        weights (array): Arc weights the potentials were fitted to (any sign)
+        potentials (List[float]): h(v) per node index
+        reduced (array): w(u, v) + h(u) - h(v) per arc, all >= 0
+        subsidies (Subsidies): Subsidies folded into weights
+        version (int): csr.version when weights were taken
+        potential_passes (int): SPFA passes run so far (1 after construction)
+    """
+
+    def __init__(self, csr: CSRGraph, weights: Sequence[float],
+                 subsidies: Optional[Subsidies] = None):
+        self.csr = csr
+        self.potentials = []
+        self.potential_passes = 0
+        self.update(weights, subsidies)
+
+    def update(self, weights: Sequence[float], subsidies: Optional[Subsidies] = None) -> bool:
+        """
+        Switch to new arc weights, keeping the potentials if they still fit.
+
+        Args:
+            weights: New arc weights aligned with csr.targets, subsidies included
+            subsidies: The subsidies included in weights, for later comparison
+
+        Returns:
+            bool: True if the potentials had to be recomputed
+
+        Raises:
+            NegativeCycleError: If the new weights contain a negative cycle
+        """
+        weights = array('d', weights)
+        reduced = self._reduce(weights, self.potentials) if self.potentials else None
+        recomputed = reduced is None
+        if recomputed:
+            # -1 starts every city at cost 0, like Johnson's virtual source
+            potentials = spfa_search(self.csr, -1, weights)[0]
+            reduced = self._reduce(weights, potentials, tolerance=float('inf'))
+            self.potentials = potentials
+            self.potential_passes += 1
+        self.weights = weights
+        self.reduced = reduced
+        self.subsidies = dict(subsidies or {})
+        self.version = self.csr.version
+        return recomputed
+
+    def _reduce(self, weights: array, potentials: Sequence[float],
+                tolerance: float = 1e-9) -> Optional[array]:
+        # Reduced weights, or None if one is negative beyond rounding error;
+        # rounding leftovers are clamped so Dijkstra sees no negative arc
+        reduced = array('d', weights)
+        for arc, (tail, head) in enumerate(self.csr.arcs()):
+            value = reduced[arc] + potentials[tail] - potentials[head]
+            if value < 0.0:
+                if value < -tolerance:
+                    return None
+                value = 0.0
+            reduced[arc] = value
+        return reduced
+
+    def is_current_for(self, subsidies: Optional[Subsidies]) -> bool:
+        """Whether neither city conditions nor the subsidies changed since the last update."""
+        return self.version == self.csr.version and self.subsidies == dict(subsidies or {})
+
+    def search(self, source: int, goal: int) -> Tuple[List[int], float]:
+        """
+        Find the cheapest route between two node indices.
+
+        Returns:
+            Tuple[List[int], float]: (path as node indices, cost under the
+            original weights); ([], inf) if unreachable
+        """
+        distances, previous, _ = dijkstra_search(self.csr, source, self.reduced, goal)
+        if distances[goal] == float('inf'):
+            return [], float('inf')
+        path = []
+        current = goal
+        while current != -1:
+            path.append(current)
+            current = previous[current]
+        path.reverse()
+        # Summed in travel order under the original weights, as spfa_route does
+        cost = 0.0
+        for tail, head in zip(path, path[1:]):
+            cost += self.weights[self.csr.arc(tail, head)]
+        return path, cost
+
+    def route(self, start: Node, target: Node) -> Tuple[List[Node], float]:
+        """
+        Find the cheapest route between two cities.
+
+        Returns:
+            Tuple[List[Node], float]: (cheapest path as list of nodes, total cost)
+        """
+        if start == target:
+            return [start], 0.0
+        source, goal = self.csr.index.get(start.id), self.csr.index.get(target.id)
+        if source is None or goal is None:
+            return [], float('inf')
+        path, cost = self.search(source, goal)
+        return [self.csr.nodes[i] for i in path], cost
+
+    def __repr__(self):
+        return f"JohnsonReweighting({len(self.csr.nodes)} nodes, {self.potential_passes} potential passes)"
+
+
+def johnson_reweighting(nodes: List[Node], edges: Union[List[Edge], Graph, CSRGraph],
+                        perspective: Union[str, CostFunction] = "driver",
+                        subsidies: Optional[Subsidies] = None) -> JohnsonReweighting:
+    """
+    Get the reweighting of a network for a perspective and set of subsidies.
+
+    Cached on the network per perspective. A later call with different
+    subsidies, or after a node cost attribute changed, updates the cached
+    reweighting; the SPFA pass is only repeated if the old potentials no
+    longer make every reduced weight non-negative.
+
+    Args:
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        perspective: Perspective name or edge cost function (may be negative)
+        subsidies: (from city id, to city id) -> trip cost overriding the perspective
+
+    Returns:
+        JohnsonReweighting: Potentials and reduced weights
+
+    Raises:
+        NegativeCycleError: If the subsidized costs contain a negative cycle
+        ValueError: If the perspective is unknown or a subsidized trip is not a road
+    """
+    csr = as_csr(nodes, edges)
+    cost_function = get_cost_function(perspective)
+    cache = csr.extensions.setdefault(JOHNSON_CACHE_KEY, {})
+    reweighting = cache.get(cost_function)
+    if reweighting is not None and reweighting.is_current_for(subsidies):
+        return reweighting
+    weights = csr.edge_weights(cost_function)
+    if subsidies:
+        weights = subsidized_weights(csr, weights, subsidies)
+    if reweighting is None:
+        reweighting = cache[cost_function] = JohnsonReweighting(csr, weights, subsidies)
+    else:
+        reweighting.update(weights, subsidies)
+    return reweighting
+
+
+def johnson_route(start: Node, target: Node, nodes: List[Node],
+                  edges: Union[List[Edge], Graph, CSRGraph],
+                  perspective: Union[str, CostFunction] = "driver",
+                  subsidies: Optional[Subsidies] = None) -> Tuple[List[Node], float]:
+    """
+    Find the cheapest route on a subsidized network with a cached reweighting.
+
+    Args:
+        start (Node): Starting city
+        target (Node): Destination city
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        perspective: Perspective name or edge cost function (may be negative)
+        subsidies: (from city id, to city id) -> trip cost overriding the perspective
+
+    Returns:
+        Tuple[List[Node], float]: (cheapest path as list of nodes, total cost)
+
+    Raises:
+        NegativeCycleError: If the subsidized costs contain a negative cycle
+    """
+    return johnson_reweighting(nodes, edges, perspective, subsidies).route(start, target)
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_benchmark():
+    """
+    Time 200 subsidized driver queries on a 3,600-city grid with SPFA per
+    query versus one Johnson reweighting, then change the subsidies.
+    """
+    from solutions.spfa import spfa_route
+    from solutions.part_a_solution import calculate_driver_cost
+    from solutions.synthetic_network import grid_network
+
+    graph = grid_network(60, 60)
+    csr = graph.csr()
+    weights = csr.edge_weights(calculate_driver_cost)
+    rng = random.Random(19)
+    # Subsidize scattered trips down to less than their return trip costs
+    subsidies = {}
+    for tail, head in rng.sample(list(csr.arcs()), 40):
+        subsidies[(csr.nodes[tail].id, csr.nodes[head].id)] = -0.4 * weights[csr.arc(head, tail)]
+    queries = [(rng.choice(graph.nodes), rng.choice(graph.nodes)) for _ in range(200)]
+
+    print("=" * 80)
+    print(f"JOHNSON REWEIGHTING: {len(queries)} queries, {len(subsidies)} subsidized trips, 3,600-city grid")
+    print("=" * 80)
+    began = time.perf_counter()
+    expected = [spfa_route(s, t, graph.nodes, graph, calculate_driver_cost, subsidies) for s, t in queries[:20]]
+    per_query = (time.perf_counter() - began) / 20
+    print(f"SPFA per query        {per_query * len(queries):6.2f}s (extrapolated from 20)")
+    began = time.perf_counter()
+    reweighting = johnson_reweighting(graph.nodes, graph, "driver", subsidies)
+    setup = time.perf_counter() - began
+    answers = [johnson_route(s, t, graph.nodes, graph, "driver", subsidies) for s, t in queries]
+    print(f"Johnson               {time.perf_counter() - began:6.2f}s ({setup:.2f}s for potentials)")
+    assert all(abs(a[1] - e[1]) < 1e-9 for a, e in zip(answers, expected))
+
+    smaller = {trip: cost / 2 for trip, cost in subsidies.items()}
+    began = time.perf_counter()
+    johnson_reweighting(graph.nodes, graph, "driver", smaller)
+    print(f"Halve every subsidy   {time.perf_counter() - began:6.2f}s "
+          f"(potential passes so far: {reweighting.potential_passes})")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,244 @@
+"""
+K-Shortest Paths - Cheapest loopless alternatives with Yen's algorithm
+
+When the best route runs through a city hit by a storm, dispatchers want the
+next best routes too. Yen's algorithm finds the k cheapest loopless paths:
+every path after the first deviates from an earlier one at a spur city,
+keeping that path's prefix (the root) and taking the cheapest spur path
+that avoids the root's cities and the roads already used from there.
+
+Three things keep the spur searches cheap:
+
+- One backward search from the target gives every city's exact cost to the
+  target on the full network. Blocking cities and roads only raises those
+  costs, so they are a consistent A* heuristic for every spur search.
+- The same search is a shortest path tree into the target. The cheapest
+  allowed first step off the spur city, plus that city's cost to the
+  target, bounds every spur path from below; if the tree path after that
+  step avoids everything blocked, it meets the bound and no search runs.
+- root cost + that bound is a lower bound on every path through the spur.
+  Once enough cheaper candidates are waiting, the spur is skipped, and
+  spur searches stop as soon as they cannot beat that threshold.
+"""
+
+import heapq
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.dijkstra_engine import dijkstra_search, reverse_weights
+from solutions.perspectives import CostFunction, get_cost_function
+
+
+def _spur_search(csr: CSRGraph, spur: int, goal: int, weights: Sequence[float],
+                 to_target: Sequence[float], blocked_nodes: bytearray, blocked_arcs: Set[int],
+                 limit: float) -> Optional[List[int]]:
+    # A* from spur to goal avoiding blocked cities and roads; gives up once
+    # no remaining path can cost less than limit
+    offsets, targets = csr.offsets, csr.targets
+    heappush, heappop = heapq.heappush, heapq.heappop
+    distances = {spur: 0.0}
+    previous = {spur: -1}
+    settled = set()
+    pq = [(to_target[spur], spur)]
+    while pq:
+        estimate, current = heappop(pq)
+        if estimate >= limit:
+            return None
+        if current in settled:
+            continue
+        settled.add(current)
+        if current == goal:
+            path = []
+            while current != -1:
+                path.append(current)
+                current = previous[current]
+            path.reverse()
+            return path
+        current_dist = distances[current]
+        for arc in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[arc]
+            if blocked_nodes[neighbor] or arc in blocked_arcs or neighbor in settled:
+                continue
+            new_distance = current_dist + weights[arc]
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                previous[neighbor] = current
+                heappush(pq, (new_distance + to_target[neighbor], neighbor))
+    return None
+
+
+def _tree_path(csr: CSRGraph, spur: int, toward: Sequence[int], blocked_nodes: bytearray,
+               blocked_arcs: Set[int]) -> Optional[List[int]]:
+    # Follow the shortest path tree into the target, or None if it is blocked
+    path = [spur]
+    current = spur
+    while toward[current] != -1:
+        following = toward[current]
+        if blocked_nodes[following] or csr.arc(current, following) in blocked_arcs:
+            return None
+        path.append(following)
+        current = following
+    return path
+
+
+def _path_cost(csr: CSRGraph, path: Sequence[int], weights: Sequence[float]) -> float:
+    cost = 0.0
+    for tail, head in zip(path, path[1:]):
+        cost += weights[csr.arc(tail, head)]
+    return cost
+
+
+def yen_search(csr: CSRGraph, source: int, goal: int, weights: Sequence[float],
+               k: int) -> Tuple[List[Tuple[List[int], float]], Dict[str, int]]:
+    """
+    Find the k cheapest loopless paths between two node indices.
+
+    Args:
+        csr (CSRGraph): Network in CSR form
+        source (int): Index of the start node
+        goal (int): Index of the destination node (different from source)
+        weights: Non-negative arc weights aligned with csr.targets
+        k (int): Number of paths wanted
+
+    Returns:
+        Tuple: ([(path as node indices, cost)] cheapest first, at most k of
+        them; statistics with 'spur_searches', 'tree_paths' and 'pruned' counts)
+    """
+    stats = {"spur_searches": 0, "tree_paths": 0, "pruned": 0}
+    to_target, toward, _ = dijkstra_search(csr, goal, reverse_weights(csr, weights))
+    if k < 1 or to_target[source] == float('inf'):
+        return [], stats
+
+    first = _tree_path(csr, source, toward, bytearray(len(csr.nodes)), set())
+    paths = [(first, _path_cost(csr, first, weights))]
+    candidates = []  # Heap of (cost, path)
+    seen = {tuple(first)}
+    blocked_nodes = bytearray(len(csr.nodes))
+    while len(paths) < k:
+        last = paths[-1][0]
+        root_cost = 0.0
+        # Cost a new candidate must beat to be among the paths still needed
+        needed = k - len(paths)
+        limit = heapq.nsmallest(needed, candidates)[-1][0] if len(candidates) >= needed else float('inf')
+        for i, spur in enumerate(last[:-1]):
+            # Root cities (the spur included, since spur paths start there) are off limits
+            blocked_nodes[spur] = 1
+            root = last[:i + 1]
+            blocked_arcs = {csr.arc(spur, path[i + 1]) for path, _ in paths
+                            if len(path) > i + 1 and path[:i + 1] == root}
+            # Cheapest first step off the spur, and the bound it gives
+            bound, step = float('inf'), -1
+            for arc in range(csr.offsets[spur], csr.offsets[spur + 1]):
+                head = csr.targets[arc]
+                if not blocked_nodes[head] and arc not in blocked_arcs and weights[arc] + to_target[head] < bound:
+                    bound, step = weights[arc] + to_target[head], head
+            if step == -1 or root_cost + bound >= limit:
+                stats["pruned"] += 1
+            else:
+                tail = _tree_path(csr, step, toward, blocked_nodes, blocked_arcs)
+                if tail is not None:
+                    stats["tree_paths"] += 1
+                    spur_path = [spur] + tail
+                else:
+                    stats["spur_searches"] += 1
+                    spur_path = _spur_search(csr, spur, goal, weights, to_target, blocked_nodes,
+                                             blocked_arcs, limit - root_cost)
+                if spur_path is not None:
+                    path = root[:-1] + spur_path
+                    if tuple(path) not in seen:
+                        seen.add(tuple(path))
+                        heapq.heappush(candidates, (_path_cost(csr, path, weights), path))
+                        if len(candidates) >= needed:
+                            limit = heapq.nsmallest(needed, candidates)[-1][0]
+            root_cost += weights[csr.arc(spur, last[i + 1])]
+        for city in last:
+            blocked_nodes[city] = 0
+        if not candidates:
+            break
+        cost, path = heapq.heappop(candidates)
+        paths.append((path, cost))
+    return paths, stats
+
+
+def k_shortest_paths(start: Node, target: Node, nodes: List[Node],
+                     edges: Union[List[Edge], Graph, CSRGraph], k: int,
+                     perspective: Union[str, CostFunction] = "company") -> List[Tuple[List[Node], float]]:
+    """
+    Find the k cheapest loopless routes between two cities.
+
+    Args:
+        start (Node): Starting city
+        target (Node): Destination city
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        k (int): Number of routes wanted
+        perspective: 'company', 'driver', 'weather' (or another perspective
+            name), or an edge cost function with non-negative costs
+
+    Returns:
+        List[Tuple[List[Node], float]]: Up to k (path, cost) pairs, cheapest
+        first; fewer if the network has fewer loopless routes
+    """
+    if start == target:
+        return [([start], 0.0)] if k >= 1 else []
+    csr = as_csr(nodes, edges)
+    source, goal = csr.index.get(start.id), csr.index.get(target.id)
+    if source is None or goal is None:
+        return []
+    paths, _ = yen_search(csr, source, goal, csr.edge_weights(get_cost_function(perspective)), k)
+    return [([csr.nodes[i] for i in path], cost) for path, cost in paths]
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_benchmark():
+    """
+    Show storm-free alternatives for an MN trip, then time k = 10 on a
+    2,500-city grid against ten plain searches.
+    """
+    from mn_dataset import MN_NODES_DICT, MN_GRAPH
+    from solutions.part_a_solution import calculate_company_cost
+    from solutions.synthetic_network import grid_network
+
+    print("=" * 80)
+    print("K-SHORTEST PATHS")
+    print("=" * 80)
+    start, target = MN_NODES_DICT["Monticello"], MN_NODES_DICT["Hastings"]
+    routes = k_shortest_paths(start, target, MN_GRAPH.nodes, MN_GRAPH, 5, "weather")
+    for path, cost in routes:
+        storms = [node.name for node in path if node.weather_condition == "storm"]
+        note = f"  (storm: {', '.join(storms)})" if storms else ""
+        print(f"${cost:7.2f}  {' -> '.join(node.name for node in path)}{note}")
+
+    graph = grid_network(50, 50)
+    csr = graph.csr()
+    weights = csr.edge_weights(calculate_company_cost)
+    rng = random.Random(22)
+    queries = [(rng.randrange(len(csr.nodes)), rng.randrange(len(csr.nodes))) for _ in range(10)]
+    began = time.perf_counter()
+    for source, goal in queries:
+        for _ in range(10):
+            dijkstra_search(csr, source, weights, goal)
+    plain = (time.perf_counter() - began) / len(queries) * 1000
+    began = time.perf_counter()
+    totals = {"spur_searches": 0, "tree_paths": 0, "pruned": 0}
+    for source, goal in queries:
+        _, stats = yen_search(csr, source, goal, weights, 10)
+        for key in totals:
+            totals[key] += stats[key]
+    yen = (time.perf_counter() - began) / len(queries) * 1000
+    print(f"2,500-city grid: 10 plain searches {plain:7.2f}ms, k = 10 paths {yen:7.2f}ms per query")
+    print(f"  per query: {totals['spur_searches'] / len(queries):.0f} spur searches, "
+          f"{totals['tree_paths'] / len(queries):.0f} spurs taken from the tree, "
+          f"{totals['pruned'] / len(queries):.0f} pruned by the lower bound")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,293 @@
+"""
+ALT Search - A*, Landmarks and the Triangle inequality
+
+Coordinate bounds get weak once traffic and weather multipliers dominate the
+costs. ALT instead precomputes exact costs to and from a few landmark cities
+per perspective. For any landmark L the triangle inequality gives
+    cost(v, t) >= cost(L, t) - cost(L, v)   and   cost(v, t) >= cost(v, L) - cost(t, L),
+and the largest of these bounds drives A*. Landmarks are picked either by
+farthest-point selection or from the coordinate extremes of the network.
+
+Run this file to compare settled nodes against plain Dijkstra.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.dijkstra_engine import astar_search, build_path, dijkstra_search, reverse_weights
+from solutions.perspectives import CostFunction, get_cost_function
+
+# Key of the cached landmark indexes in CSRGraph.extensions
+LANDMARK_CACHE_KEY = "alt_landmarks"
+
+
+# ============================================================================
+# LANDMARK SELECTION
+# ============================================================================
+
+def farthest_landmarks(csr: CSRGraph, weights: Sequence[float], count: int) -> List[int]:
+    """
+    Pick landmarks one at a time, each as far as possible from those already chosen.
+
+    The first landmark is the city farthest from city 0.
+    """
+    inf = float('inf')
+    distances, _, _ = dijkstra_search(csr, 0, weights)
+    landmarks = []
+    nearest = [inf] * len(csr.nodes)
+    candidate = max(range(len(distances)), key=lambda i: distances[i] if distances[i] != inf else -1.0)
+    while len(landmarks) < min(count, len(csr.nodes)):
+        landmarks.append(candidate)
+        distances, _, _ = dijkstra_search(csr, candidate, weights)
+        for i, d in enumerate(distances):
+            if d < nearest[i]:
+                nearest[i] = d
+        # Unreached cities make good landmarks for their own component
+        candidate = max((i for i in range(len(nearest)) if i not in landmarks),
+                        key=lambda i: nearest[i], default=None)
+        if candidate is None:
+            break
+    return landmarks
+
+
+def extreme_landmarks(csr: CSRGraph, count: int) -> List[int]:
+    """
+    Pick landmarks at the coordinate extremes of the network.
+
+    Cities are ranked by how far they lie along evenly spaced compass
+    directions, which in practice picks the rural cities on the network's rim.
+    """
+    nodes = csr.nodes
+    center_x = sum(node.x for node in nodes) / len(nodes)
+    center_y = sum(node.y for node in nodes) / len(nodes)
+    directions = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]
+    landmarks = []
+    for dx, dy in directions * (count // len(directions) + 1):
+        if len(landmarks) >= min(count, len(nodes)):
+            break
+        ranked = sorted(range(len(nodes)), reverse=True,
+                        key=lambda i: (nodes[i].x - center_x) * dx + (nodes[i].y - center_y) * dy)
+        pick = next((i for i in ranked if i not in landmarks), None)
+        if pick is not None:
+            landmarks.append(pick)
+    return landmarks
+
+
+# ============================================================================
+# LANDMARK INDEX
+# ============================================================================
+
+class LandmarkIndex:
+    """
+    Precomputed costs between landmarks and every city for one perspective.
+
+    Costs are kept in two flat arrays with one row of n entries per landmark:
+    from_landmark[k * n + v] = cost(L_k, v) and to_landmark[k * n + v] = cost(v, L_k).
+
+    Attributes:
+        csr (CSRGraph): Network the index was built on
+        weights (Sequence[float]): Arc weights of the perspective
+        landmarks (List[int]): Node index of each landmark
+        from_landmark (array): Costs from each landmark, row per landmark
+        to_landmark (array): Costs to each landmark, row per landmark
+        cost_function (CostFunction): Perspective the weights come from, or
+            None if the index was built from raw weights
+        version (int): csr.version when the landmark costs were computed
+    """
+
+    def __init__(self, csr: CSRGraph, weights: Sequence[float], landmarks: List[int],
+                 cost_function: Optional[CostFunction] = None):
+        self.csr = csr
+        self.landmarks = list(landmarks)
+        self.cost_function = cost_function
+        self._compute(weights)
+
+    def _compute(self, weights: Sequence[float]) -> None:
+        self.weights = weights
+        self.version = self.csr.version
+        # Searching the reverse graph from L gives every node's cost to reach L
+        backward = reverse_weights(self.csr, weights)
+        self.from_landmark = array('d')
+        self.to_landmark = array('d')
+        for landmark in self.landmarks:
+            self.from_landmark.extend(dijkstra_search(self.csr, landmark, weights)[0])
+            self.to_landmark.extend(dijkstra_search(self.csr, landmark, backward)[0])
+
+    def refresh(self) -> None:
+        """
+        Reprice the arcs and recompute the landmark costs, keeping the landmarks.
+
+        Raises:
+            RuntimeError: If the index was built without a cost function
+        """
+        if self.cost_function is None:
+            raise RuntimeError("Landmark index is out of date and has no cost function to reprice with; "
+                               "build a new one with build_landmark_index()")
+        self._compute(self.csr.edge_weights(self.cost_function))
+
+    @property
+    def is_current(self) -> bool:
+        """Whether no node cost attribute has changed since the index was built."""
+        return self.version == self.csr.version
+
+    def heuristic(self, target: int) -> Callable[[int], float]:
+        """
+        Build the ALT lower bound on the cost from any node to target.
+        """
+        n = len(self.csr.nodes)
+        inf = float('inf')
+        # (row offset, cost(L, t), cost(t, L)) per landmark, skipping bounds
+        # that would involve an unreachable city
+        rows = [(k * n, self.from_landmark[k * n + target], self.to_landmark[k * n + target])
+                for k in range(len(self.landmarks))]
+        from_landmark, to_landmark = self.from_landmark, self.to_landmark
+
+        def bound(index: int) -> float:
+            best = 0.0
+            for offset, landmark_to_target, target_to_landmark in rows:
+                landmark_to_node = from_landmark[offset + index]
+                if landmark_to_target != inf and landmark_to_node != inf:
+                    if landmark_to_target - landmark_to_node > best:
+                        best = landmark_to_target - landmark_to_node
+                node_to_landmark = to_landmark[offset + index]
+                if node_to_landmark != inf and target_to_landmark != inf:
+                    if node_to_landmark - target_to_landmark > best:
+                        best = node_to_landmark - target_to_landmark
+            return best
+
+        return bound
+
+    def search(self, source: int, target: int) -> Tuple[List[float], List[int], int]:
+        """
+        Run ALT from source to target; same result tuple as astar_search.
+
+        Stale landmark costs could overestimate, so the index is refreshed
+        first if a node cost attribute changed since it was built.
+
+        Raises:
+            RuntimeError: If the index is out of date and has no cost function
+        """
+        if not self.is_current:
+            self.refresh()
+        return astar_search(self.csr, source, target, self.weights, self.heuristic(target))
+
+    def route(self, start: Node, target: Node) -> Tuple[List[Node], float]:
+        """
+        Find the cheapest route from start to target with ALT.
+        """
+        if start == target:
+            return [start], 0.0
+        source, goal = self.csr.index.get(start.id), self.csr.index.get(target.id)
+        if source is None or goal is None:
+            return [], float('inf')
+        distances, previous, _ = self.search(source, goal)
+        if distances[goal] == float('inf'):
+            return [], float('inf')
+        return build_path(self.csr, previous, goal), distances[goal]
+
+
+def build_landmark_index(nodes: List[Node], edges: Union[List[Edge], Graph, CSRGraph],
+                         perspective: Union[str, CostFunction] = "company",
+                         count: int = 8, method: str = "farthest") -> LandmarkIndex:
+    """
+    Get a landmark index for a perspective, reusing a cached one when still current.
+
+    Args:
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        perspective: Perspective name or edge cost function (non-negative costs)
+        count (int): Number of landmarks
+        method (str): 'farthest' for farthest-point selection or 'extremes'
+            for coordinate extremes
+
+    Returns:
+        LandmarkIndex: Precomputed landmark costs
+    """
+    csr = as_csr(nodes, edges)
+    cost_function = get_cost_function(perspective)
+    cache = csr.extensions.setdefault(LANDMARK_CACHE_KEY, {})
+    key = (cost_function, count, method)
+    index = cache.get(key)
+    if index is not None and index.is_current:
+        return index
+
+    weights = csr.edge_weights(cost_function)
+    if method == "farthest":
+        landmarks = farthest_landmarks(csr, weights, count)
+    elif method == "extremes":
+        landmarks = extreme_landmarks(csr, count)
+    else:
+        raise ValueError(f"Unknown landmark method {method!r}; expected 'farthest' or 'extremes'")
+    index = cache[key] = LandmarkIndex(csr, weights, landmarks, cost_function)
+    return index
+
+
+def alt_route(start: Node, target: Node, nodes: List[Node],
+              edges: Union[List[Edge], Graph, CSRGraph],
+              perspective: Union[str, CostFunction] = "company") -> Tuple[List[Node], float]:
+    """
+    Find the cheapest route with ALT, building the landmark index on first use.
+    """
+    return build_landmark_index(nodes, edges, perspective).route(start, target)
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def compare_settled_nodes(index: LandmarkIndex, pairs: Sequence[Tuple[int, int]]) -> Dict[str, float]:
+    """
+    Count settled nodes and time for plain Dijkstra and ALT over the same queries.
+
+    Returns:
+        Dict[str, float]: Totals for 'dijkstra_settled', 'alt_settled',
+        'dijkstra_seconds' and 'alt_seconds'
+    """
+    result = {"dijkstra_settled": 0, "alt_settled": 0, "dijkstra_seconds": 0.0, "alt_seconds": 0.0}
+    for source, target in pairs:
+        began = time.perf_counter()
+        plain_distances, _, settled = dijkstra_search(index.csr, source, index.weights, target)
+        result["dijkstra_seconds"] += time.perf_counter() - began
+        result["dijkstra_settled"] += settled
+
+        began = time.perf_counter()
+        alt_distances, _, settled = index.search(source, target)
+        result["alt_seconds"] += time.perf_counter() - began
+        result["alt_settled"] += settled
+        assert abs(plain_distances[target] - alt_distances[target]) < 1e-6
+    return result
+
+
+def run_benchmark():
+    """
+    Print settled-node counts of plain company Dijkstra versus ALT.
+    """
+    from mn_dataset import MN_GRAPH
+    from solutions.synthetic_network import grid_network
+
+    rng = random.Random(7)
+    networks = [("Minnesota (25 cities)", MN_GRAPH), ("Synthetic grid (2,500 cities)", grid_network(50, 50))]
+    print("=" * 80)
+    print("ALT BENCHMARK: settled nodes, company perspective")
+    print("=" * 80)
+    for label, graph in networks:
+        csr = graph.csr()
+        n = len(csr.nodes)
+        pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(200)]
+        for method in ("farthest", "extremes"):
+            index = build_landmark_index(graph.nodes, graph, "company", count=8, method=method)
+            result = compare_settled_nodes(index, pairs)
+            ratio = result["alt_settled"] / max(1, result["dijkstra_settled"])
+            print(f"{label:32} {method:9} Dijkstra {result['dijkstra_settled']:8d}  "
+                  f"ALT {result['alt_settled']:8d}  ({ratio:.0%})  "
+                  f"time {result['dijkstra_seconds']:.3f}s vs {result['alt_seconds']:.3f}s")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,200 @@
+"""
+Parallel All-Origins - Per-origin searches spread over worker processes
+
+Single-source searches from different origins are independent, so they can
+run in separate processes. Pickling the network for every task (or even
+once per worker) copies it each time; here the CSR arrays and arc weights
+are placed in shared memory instead. Each worker attaches to the blocks by
+name once, a task is just a range of origins, and the rows are written
+straight into shared cost and next-hop matrices, so neither the graph nor
+the results travel through pickles.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+from main import CSRGraph
+from solutions.dijkstra_engine import dijkstra_search, first_hops
+
+
+class SharedNetwork:
+    """
+    Flat arrays of a network and its result matrices in shared memory.
+
+    Owned by the parent process, which unlinks the blocks on close().
+    Workers only attach to them through attach_shared().
+
+    Attributes:
+        size (int): Number of cities n
+        blocks (Dict[str, SharedMemory]): 'offsets', 'targets', 'weights',
+            'costs' (n * n doubles) and 'next_hop' (n * n ints)
+    """
+
+    LAYOUT = (("offsets", 'i'), ("targets", 'i'), ("weights", 'd'), ("costs", 'd'), ("next_hop", 'i'))
+
+    def __init__(self, csr: CSRGraph, weights: Sequence[float]):
+        self.size = n = len(csr.nodes)
+        contents = {"offsets": csr.offsets, "targets": csr.targets, "weights": array('d', weights),
+                    "costs": array('d', [float('inf')]) * (n * n), "next_hop": array('i', [-1]) * (n * n)}
+        self.blocks = {}
+        try:
+            for name, _ in self.LAYOUT:
+                data = contents[name]
+                block = shared_memory.SharedMemory(create=True, size=max(1, len(data) * data.itemsize))
+                block.buf[:len(data) * data.itemsize] = data.tobytes()
+                self.blocks[name] = block
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def names(self) -> Dict[str, str]:
+        """Block names handed to workers."""
+        return {name: block.name for name, block in self.blocks.items()}
+
+    def result(self) -> Tuple[array, array]:
+        """
+        Copy the cost and next-hop matrices out of shared memory.
+        """
+        count = self.size * self.size
+        costs, next_hop = array('d'), array('i')
+        costs.frombytes(self.blocks["costs"].buf[:count * costs.itemsize])
+        next_hop.frombytes(self.blocks["next_hop"].buf[:count * next_hop.itemsize])
+        return costs, next_hop
+
+    def close(self) -> None:
+        """Release and delete every block."""
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+
+class _SharedCSR:
+    # The parts of CSRGraph that dijkstra_search reads, backed by shared memory
+    def __init__(self, size: int, offsets: memoryview, targets: memoryview):
+        self.nodes = range(size)
+        self.offsets = offsets
+        self.targets = targets
+
+
+# Attached blocks and views of the current worker process
+_worker_state = {}
+
+
+def attach_shared(names: Dict[str, str], size: int) -> None:
+    """
+    Pool initializer: attach to the parent's blocks once per worker.
+    """
+    views = {}
+    for name, typecode in SharedNetwork.LAYOUT:
+        block = shared_memory.SharedMemory(name=names[name])
+        _worker_state.setdefault("blocks", []).append(block)
+        views[name] = block.buf.cast(typecode)
+    _worker_state["csr"] = _SharedCSR(size, views["offsets"], views["targets"])
+    _worker_state.update(views)
+
+
+def solve_origins(start: int, stop: int) -> int:
+    """
+    Pool task: run the searches of origins start..stop-1 into the shared matrices.
+
+    Returns:
+        int: Number of origins solved
+    """
+    csr, weights = _worker_state["csr"], _worker_state["weights"]
+    costs, next_hop = _worker_state["costs"], _worker_state["next_hop"]
+    n = len(csr.nodes)
+    for source in range(start, stop):
+        distances, previous, _ = dijkstra_search(csr, source, weights)
+        costs[source * n:(source + 1) * n] = array('d', distances)
+        next_hop[source * n:(source + 1) * n] = first_hops(source, previous)
+    return stop - start
+
+
+def all_origins(csr: CSRGraph, weights: Sequence[float], workers: Optional[int] = None,
+                chunk_size: Optional[int] = None) -> Tuple[array, array]:
+    """
+    Run one single-source search per origin across a process pool.
+
+    Args:
+        csr (CSRGraph): Network in CSR form
+        weights: Arc weights aligned with csr.targets
+        workers (int): Process count (default: one per CPU)
+        chunk_size (int): Origins per task (default: about four tasks per worker)
+
+    Returns:
+        Tuple[array, array]: Row-major n x n costs and next hops, as in CostMatrix
+    """
+    n = len(csr.nodes)
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, n // (workers * 4))
+    starts = range(0, n, chunk_size)
+    stops = [min(n, start + chunk_size) for start in starts]
+    shared = SharedNetwork(csr, weights)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_shared,
+                                 initargs=(shared.names, n)) as pool:
+            solved = sum(pool.map(solve_origins, starts, stops))
+        if solved != n:
+            raise RuntimeError(f"Solved {solved} of {n} origins")
+        return shared.result()
+    finally:
+        shared.close()
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def measure_scaling(csr: CSRGraph, weights: Sequence[float],
+                    worker_counts: Sequence[int]) -> List[Tuple[int, float]]:
+    """
+    Time all_origins for several worker counts.
+
+    Returns:
+        List of (workers, origins per second)
+    """
+    n = len(csr.nodes)
+    throughput = []
+    for workers in worker_counts:
+        began = time.perf_counter()
+        all_origins(csr, weights, workers)
+        throughput.append((workers, n / (time.perf_counter() - began)))
+    return throughput
+
+
+def run_benchmark():
+    """
+    Print all-origins throughput from one worker up to one per CPU.
+    """
+    from solutions.all_pairs import all_pairs_costs
+    from solutions.part_a_solution import calculate_company_cost
+    from solutions.synthetic_network import grid_network
+
+    graph = grid_network(30, 30)
+    csr = graph.csr()
+    weights = csr.edge_weights(calculate_company_cost)
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, 16, cpus} & set(range(1, cpus + 1)))
+    print("=" * 80)
+    print(f"PARALLEL ALL-ORIGINS: {len(csr.nodes)} origins, {cpus} CPUs")
+    print("=" * 80)
+    began = time.perf_counter()
+    all_pairs_costs(graph.nodes, graph, "company", method="dijkstra")
+    serial = len(csr.nodes) / (time.perf_counter() - began)
+    print(f"in-process   {serial:8.0f} origins/s")
+    for workers, rate in measure_scaling(csr, weights, counts):
+        print(f"{workers:3d} workers  {rate:8.0f} origins/s  (x{rate / serial:.2f})")
+    if cpus == 1:
+        print("Only one CPU available: run on a multi-core machine to see scaling.")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,179 @@
+"""
+Pareto Routing - Every best trade-off between two cost perspectives
+
+combined_run.py shows the cheapest company route and the cheapest driver
+route as two unrelated answers. Those two and every route in between that
+no other route beats on both costs at once form the Pareto frontier.
+This file finds the whole frontier in one label-setting search (Martins'
+algorithm):
+
+- A label is one partial route: (company cost, driver cost, city, parent label).
+  Labels live in flat arrays, a pool indexed by label id.
+- Labels are popped in lexicographic cost order. Every label already
+  settled at a city is then no more expensive on the first cost, so a
+  popped label is dominated exactly when its second cost is not below the
+  lowest second cost settled there. One float per city replaces per-city
+  label lists.
+- New labels already dominated by a label settled at their city, or at
+  the target, are dropped before they reach the heap.
+- max_labels caps the labels settled per city. With a cap every returned
+  route is real and none dominates another, but frontier points whose
+  routes needed a capped city can be missed.
+
+Both perspectives must have non-negative costs.
+"""
+
+import heapq
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from array import array
+from typing import List, Optional, Sequence, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.perspectives import CostFunction, get_cost_function
+
+# A frontier point: (path, (first cost, second cost))
+ParetoRoute = Tuple[List[Node], Tuple[float, float]]
+
+
+def pareto_search(csr: CSRGraph, source: int, target: int, weights: Sequence[float],
+                  second_weights: Sequence[float],
+                  max_labels: Optional[int] = None) -> Tuple[List[Tuple[List[int], float, float]], int]:
+    """
+    Find the Pareto-optimal routes between two node indices under two arc weightings.
+
+    Args:
+        csr (CSRGraph): Network in CSR form
+        source (int): Index of the start node
+        target (int): Index of the destination node
+        weights: First non-negative arc weights aligned with csr.targets
+        second_weights: Second non-negative arc weights aligned with csr.targets
+        max_labels (int): Labels settled per node before further ones are
+            dropped, or None for the exact frontier
+
+    Returns:
+        Tuple: ([(path as node indices, first cost, second cost)] ordered by
+        increasing first cost, number of labels settled)
+    """
+    inf = float('inf')
+    n = len(csr.nodes)
+    best_second = [inf] * n
+    settled_at = [0] * n
+    offsets, targets = csr.offsets, csr.targets
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    # Label pool; label ids are unique, so heap entries never tie
+    label_node = array('i', [source])
+    label_parent = array('i', [-1])
+    pq = [(0.0, 0.0, 0)]
+    frontier = []
+    settled = 0
+    while pq:
+        first, second, label = heappop(pq)
+        node = label_node[label]
+        if second >= best_second[node] or second >= best_second[target]:
+            continue  # Dominated by a label settled since it was queued
+        if max_labels is not None:
+            if settled_at[node] >= max_labels:
+                continue
+            settled_at[node] += 1
+        best_second[node] = second
+        settled += 1
+        if node == target:
+            frontier.append((label, first, second))
+            continue
+        for arc in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[arc]
+            new_second = second + second_weights[arc]
+            if new_second >= best_second[neighbor] or new_second >= best_second[target]:
+                continue
+            label_node.append(neighbor)
+            label_parent.append(label)
+            heappush(pq, (first + weights[arc], new_second, len(label_node) - 1))
+
+    routes = []
+    for label, first, second in frontier:
+        path = []
+        while label != -1:
+            path.append(label_node[label])
+            label = label_parent[label]
+        path.reverse()
+        routes.append((path, first, second))
+    return routes, settled
+
+
+def pareto_routes(start: Node, target: Node, nodes: List[Node],
+                  edges: Union[List[Edge], Graph, CSRGraph],
+                  perspectives: Tuple[Union[str, CostFunction], Union[str, CostFunction]] = ("company", "driver"),
+                  max_labels: Optional[int] = None) -> List[ParetoRoute]:
+    """
+    Find every route that no other route beats on both perspectives at once.
+
+    Args:
+        start (Node): Starting city
+        target (Node): Destination city
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        perspectives: The two perspectives to trade off (names or cost functions)
+        max_labels (int): Cap on labels per city, trading completeness for speed
+
+    Returns:
+        List[ParetoRoute]: (path, (first cost, second cost)) per frontier point,
+        by increasing first cost; the first and last points are the cheapest
+        routes of each perspective. Empty if the target is unreachable.
+    """
+    if start == target:
+        return [([start], (0.0, 0.0))]
+    csr = as_csr(nodes, edges)
+    source, goal = csr.index.get(start.id), csr.index.get(target.id)
+    if source is None or goal is None:
+        return []
+    first, second = (csr.edge_weights(get_cost_function(p)) for p in perspectives)
+    routes, _ = pareto_search(csr, source, goal, first, second, max_labels)
+    return [([csr.nodes[i] for i in path], (cost, second_cost)) for path, cost, second_cost in routes]
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_benchmark():
+    """
+    Print the company/driver frontier of an MN trip, then time frontier
+    searches on a 2,500-city grid with and without a label cap.
+    """
+    from mn_dataset import MN_NODES_DICT, MN_GRAPH
+    from solutions.part_a_solution import calculate_company_cost, calculate_driver_cost
+    from solutions.synthetic_network import grid_network
+
+    print("=" * 80)
+    print("PARETO ROUTES: company cost versus driver cost")
+    print("=" * 80)
+    for path, (company, driver) in pareto_routes(MN_NODES_DICT["New Prague"], MN_NODES_DICT["Forest Lake"],
+                                                 MN_GRAPH.nodes, MN_GRAPH):
+        print(f"${company:7.2f} company  ${driver:7.2f} driver  {' -> '.join(node.name for node in path)}")
+
+    graph = grid_network(50, 50)
+    csr = graph.csr()
+    company = csr.edge_weights(calculate_company_cost)
+    driver = csr.edge_weights(calculate_driver_cost)
+    rng = random.Random(21)
+    queries = [(rng.randrange(len(csr.nodes)), rng.randrange(len(csr.nodes))) for _ in range(10)]
+    for cap in (None, 8, 3):
+        began = time.perf_counter()
+        points = labels = 0
+        for source, goal in queries:
+            routes, settled = pareto_search(csr, source, goal, company, driver, cap)
+            points += len(routes)
+            labels += settled
+        elapsed = (time.perf_counter() - began) / len(queries) * 1000
+        label = "no cap" if cap is None else f"cap {cap}"
+        print(f"2,500-city grid, {label:7} {elapsed:8.2f}ms per query, "
+              f"{points / len(queries):5.1f} frontier points, {labels / len(queries):7.0f} labels settled")
+
+
+if __name__ == "__main__":
+    run_benchmark()
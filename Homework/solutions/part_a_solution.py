@@ -6,13 +6,13 @@ This file focuses on implementing Dijkstra's algorithm from company and driver's
 Complete implementation for Instructors
 """
 
-import heapq
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import List, Tuple
-from main import Node, Edge, get_neighbors
+from typing import List, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph
+from solutions.dijkstra_engine import dijkstra_route
 
 
 # ============================================================================
@@ -82,122 +82,23 @@ def calculate_driver_cost(from_node: Node, to_node: Node) -> float:
 # PART A: DIJKSTRA ALGORITHM COMPLETE IMPLEMENTATIONS
 # ============================================================================
 
-def dijkstra_company_route(start: Node, target: Node, nodes: List[Node], edges: List[Edge]) -> Tuple[List[Node], float]:
+def dijkstra_company_route(start: Node, target: Node, nodes: List[Node], edges: Union[List[Edge], Graph, CSRGraph]) -> Tuple[List[Node], float]:
     """
     Part A1: Complete implementation of Dijkstra's algorithm from company's perspective.
-    """
-    # Initialize distances and previous pointers
-    distances = {node: float('inf') for node in nodes}
-    distances[start] = 0.0
-    previous = {node: None for node in nodes}
-    
-    # Priority queue: (distance, counter, node) - counter prevents Node comparison
-    pq = [(0.0, 0, start)]
-    visited = set()
-    counter = 1  # For tie-breaking in heapq
-    
-    while pq:
-        current_dist, _, current_node = heapq.heappop(pq)
-        
-        # Skip if already visited (handles duplicate entries in pq)
-        if current_node in visited:
-            continue
-            
-        visited.add(current_node)
-        
-        # Found target - we can stop early
-        if current_node == target:
-            break
-            
-        # Check all neighbors
-        neighbors = get_neighbors(current_node, edges)
-        for neighbor in neighbors:
-            if neighbor in visited:
-                continue
-                
-            # Calculate cost using company perspective
-            edge_cost = calculate_company_cost(current_node, neighbor)
-            new_distance = current_dist + edge_cost
-            
-            # Update if shorter path found
-            if new_distance < distances[neighbor]:
-                distances[neighbor] = new_distance
-                previous[neighbor] = current_node
-                heapq.heappush(pq, (new_distance, counter, neighbor))
-                counter += 1
     
-    # Reconstruct path
-    path = []
-    current = target
-    
-    # Check if target is reachable
-    if distances[target] == float('inf'):
-        return [], float('inf')
-    
-    while current is not None:
-        path.append(current)
-        current = previous[current]
-    
-    path.reverse()
-    return path, distances[target]
+    Edge costs come from the network's cached company weight table, so each
+    edge is priced once rather than on every relaxation. Pass a Graph or
+    CSRGraph as edges to reuse that table across queries.
+    """
+    return dijkstra_route(start, target, nodes, edges, calculate_company_cost)
 
 
-def dijkstra_driver_route(start: Node, target: Node, nodes: List[Node], edges: List[Edge]) -> Tuple[List[Node], float]:
+def dijkstra_driver_route(start: Node, target: Node, nodes: List[Node], edges: Union[List[Edge], Graph, CSRGraph]) -> Tuple[List[Node], float]:
     """
     Part A2: Complete implementation of Dijkstra's algorithm from driver's perspective.
-    """
-    # Initialize distances and previous pointers
-    distances = {node: float('inf') for node in nodes}
-    distances[start] = 0.0
-    previous = {node: None for node in nodes}
     
-    # Priority queue: (distance, counter, node) - counter prevents Node comparison
-    pq = [(0.0, 0, start)]
-    visited = set()
-    counter = 1  # For tie-breaking in heapq
-    
-    while pq:
-        current_dist, _, current_node = heapq.heappop(pq)
-        
-        # Skip if already visited
-        if current_node in visited:
-            continue
-            
-        visited.add(current_node)
-        
-        # Found target - we can stop early
-        if current_node == target:
-            break
-            
-        # Check all neighbors
-        neighbors = get_neighbors(current_node, edges)
-        for neighbor in neighbors:
-            if neighbor in visited:
-                continue
-                
-            # Calculate cost using driver perspective
-            edge_cost = calculate_driver_cost(current_node, neighbor)
-            new_distance = current_dist + edge_cost
-            
-            # Update if shorter path found
-            if new_distance < distances[neighbor]:
-                distances[neighbor] = new_distance
-                previous[neighbor] = current_node
-                heapq.heappush(pq, (new_distance, counter, neighbor))
-                counter += 1
-    
-    # Reconstruct path
-    path = []
-    current = target
-    
-    # Check if target is reachable
-    if distances[target] == float('inf'):
-        return [], float('inf')
-    
-    while current is not None:
-        path.append(current)
-        current = previous[current]
-    
-    path.reverse()
-    return path, distances[target]
-
+    Edge costs come from the network's cached driver weight table, priced in
+    both directions since parking makes the driver cost asymmetric. Pass a
+    Graph or CSRGraph as edges to reuse that table across queries.
+    """
+    return dijkstra_route(start, target, nodes, edges, calculate_driver_cost)
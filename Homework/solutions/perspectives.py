@@ -0,0 +1,67 @@
+"""
+Cost Perspectives - Named edge cost functions shared by the routing tools
+
+Maps a perspective name to the edge cost function from Parts A and D, so
+caches and batch APIs can refer to "company" or "weather" instead of a
+function object. The fatigue rule is not an edge cost (it depends on the
+previous drive) and so is not listed here.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Callable, Sequence, Union
+from main import Node, CSRGraph
+from solutions.dijkstra_engine import resolve_weights
+from solutions.part_a_solution import calculate_company_cost, calculate_driver_cost
+from solutions.part_d_solution import fairness_cost, weather_safety_cost
+
+CostFunction = Callable[[Node, Node], float]
+Perspective = Union[str, CostFunction, Sequence[float]]
+
+PERSPECTIVES = {
+    "company": calculate_company_cost,
+    "driver": calculate_driver_cost,
+    "fairness": fairness_cost,
+    "weather": weather_safety_cost,
+}
+
+
+def get_cost_function(perspective: Union[str, CostFunction]) -> CostFunction:
+    """
+    Resolve a perspective name to its edge cost function.
+
+    Args:
+        perspective: A key of PERSPECTIVES, or a cost function which is returned as is
+
+    Returns:
+        Function(from_node, to_node) -> cost
+
+    Raises:
+        ValueError: If the name is not a known perspective
+    """
+    if callable(perspective):
+        return perspective
+    try:
+        return PERSPECTIVES[perspective]
+    except KeyError:
+        raise ValueError(f"Unknown perspective {perspective!r}; "
+                         f"expected one of {sorted(PERSPECTIVES)}") from None
+
+
+def perspective_weights(csr: CSRGraph, perspective: Perspective) -> Sequence[float]:
+    """
+    Get the arc weights of a network under a perspective.
+
+    Args:
+        csr (CSRGraph): Network in CSR form
+        perspective: Perspective name, edge cost function, or arc weights
+            aligned with csr.targets (returned after a length check)
+
+    Returns:
+        Arc weights aligned with csr.targets
+    """
+    if isinstance(perspective, str):
+        perspective = get_cost_function(perspective)
+    return resolve_weights(csr, perspective)
@@ -0,0 +1,483 @@
+"""
+Profile Search - Cheapest cost curves over a whole departure window
+
+"What does Edina -> Northfield cost for every departure between 6am and
+10am?" could be answered by a time-dependent search per minute. A profile
+search answers it in one pass by searching with functions instead of
+numbers: every city's label gives, for each departure time from the start,
+the cheapest cost of reaching the city, the clock time it is reached and
+the route taken, as linear segments over the window.
+
+- Traffic profiles are piecewise linear, so a road's travel time, and any
+  cost that is linear in traffic (company and driver), are piecewise
+  linear in the time the road is entered, with a breakpoint at each shape
+  point of its two cities and wherever their traffic curves cross.
+- Following a road maps every segment of its tail's label through those
+  functions. Arrival times rise along a segment (FIFO), so a segment only
+  needs splitting at the departures that reach a road breakpoint.
+- Where a label already exists at the head, the cheaper of the two wins at
+  every departure; they are compared on the cut points of both, splitting
+  where their costs cross.
+- Labels are scanned in order of their lowest cost, and a city is scanned
+  again whenever its label gets cheaper somewhere. The search stops once
+  the lowest pending cost is above the target's highest one.
+
+At every departure this keeps the same cheapest label per city as
+time_dependent_route() does, so both agree, and both are exact while
+traffic holds steady over a trip. Without a perspective the cost is the
+hours on the road, which gives exact fastest-route curves. Cost curves
+jump where the cheapest route changes.
+"""
+
+import heapq
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Sequence, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.fatigue_search import drive_distance
+from solutions.perspectives import CostFunction, get_cost_function
+from solutions.time_dependent import FREE_FLOW_MPH, HOURS_PER_DAY, TrafficProfiles, _TrafficAt, traffic_profiles
+
+# Costs and times closer than this are equal
+TOLERANCE = 1e-9
+
+# A label segment: (first departure, last departure, cost at each end,
+# arrival time at each end, route as a (node index, previous) chain)
+Segment = Tuple[float, float, float, float, float, float, tuple]
+
+
+class PiecewiseLinear:
+    """
+    A function of departure time, linear between breakpoints.
+
+    A repeated x is a jump; the function takes the later value there.
+    Outside [xs[0], xs[-1]] it stays at its end values.
+
+    Attributes:
+        xs (array): Breakpoint times, non-decreasing
+        ys (array): Function values at the breakpoints
+    """
+
+    def __init__(self, xs: Sequence[float], ys: Sequence[float]):
+        if not xs or len(xs) != len(ys):
+            raise ValueError("A piecewise linear function needs as many values as breakpoints, at least one")
+        self.xs = array('d', xs)
+        self.ys = array('d', ys)
+
+    def __call__(self, x: float) -> float:
+        xs, ys = self.xs, self.ys
+        i = bisect_right(xs, x)
+        if i == 0:
+            return ys[0]
+        if i == len(xs):
+            return ys[-1]
+        y0, y1 = ys[i - 1], ys[i]
+        if y0 == y1:
+            return y0
+        return y0 + (y1 - y0) * (x - xs[i - 1]) / (xs[i] - xs[i - 1])
+
+    @property
+    def domain(self) -> Tuple[float, float]:
+        """First and last breakpoint."""
+        return self.xs[0], self.xs[-1]
+
+    def breakpoints(self) -> List[Tuple[float, float]]:
+        """The (x, y) breakpoints in order."""
+        return list(zip(self.xs, self.ys))
+
+    def minimum(self) -> Tuple[float, float]:
+        """
+        The lowest value and the first x where it is taken.
+        """
+        best = min(range(len(self.ys)), key=self.ys.__getitem__)
+        return self.xs[best], self.ys[best]
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __repr__(self):
+        return f"PiecewiseLinear({len(self.xs)} breakpoints on [{self.xs[0]:g}, {self.xs[-1]:g}])"
+
+
+def _curve(points: List[Tuple[float, float]]) -> PiecewiseLinear:
+    # Breakpoints to a function, dropping those on the line through their
+    # neighbors; repeated x (jumps) are kept
+    keep = [points[0]]
+    for i in range(1, len(points) - 1):
+        (x0, y0), (x1, y1), (x2, y2) = keep[-1], points[i], points[i + 1]
+        if x0 == x1 or x1 == x2 or abs((y1 - y0) * (x2 - x0) - (y2 - y0) * (x1 - x0)) > TOLERANCE * (x2 - x0):
+            keep.append(points[i])
+    if len(points) > 1:
+        keep.append(points[-1])
+    return PiecewiseLinear([x for x, _ in keep], [y for _, y in keep])
+
+
+def _at(segment: Segment, x: float) -> Tuple[float, float]:
+    # (cost, arrival) of a segment's line at departure x
+    x0, x1, c0, c1, a0, a1, _ = segment
+    if x1 == x0:
+        return c0, a0
+    share = (x - x0) / (x1 - x0)
+    return c0 + (c1 - c0) * share, a0 + (a1 - a0) * share
+
+
+def _cut(segment: Segment, begin: float, end: float) -> Segment:
+    # The part of a segment between two departures
+    if begin == segment[0] and end == segment[1]:
+        return segment
+    c0, a0 = _at(segment, begin)
+    c1, a1 = _at(segment, end)
+    return begin, end, c0, c1, a0, a1, segment[6]
+
+
+def _lowest(label: List[Segment]) -> float:
+    return min(min(segment[2], segment[3]) for segment in label)
+
+
+def _highest(label: List[Segment]) -> float:
+    return max(max(segment[2], segment[3]) for segment in label)
+
+
+def _cheaper(label: Optional[List[Segment]],
+             candidate: List[Segment]) -> Tuple[List[Segment], bool]:
+    # The cheaper of two labels at every departure, and whether the
+    # candidate is cheaper anywhere; ties keep the existing label
+    if label is None:
+        return candidate, True
+    cuts = sorted({x for segment in label for x in segment[:2]} | {x for segment in candidate for x in segment[:2]})
+    if len(cuts) == 1:
+        pieces = [(cuts[0], cuts[0])]
+    else:
+        pieces = list(zip(cuts, cuts[1:]))
+    chosen = []  # (begin, end, segment)
+    improved = False
+    i = j = 0
+    for begin, end in pieces:
+        while label[i][1] < end:
+            i += 1
+        while candidate[j][1] < end:
+            j += 1
+        old, new = label[i], candidate[j]
+        before = _at(new, begin)[0] - _at(old, begin)[0]
+        after = _at(new, end)[0] - _at(old, end)[0]
+        if before >= -TOLERANCE and after >= -TOLERANCE:
+            chosen.append((begin, end, old))
+        elif before <= TOLERANCE and after <= TOLERANCE:
+            chosen.append((begin, end, new))
+            improved = True
+        else:  # The costs cross in between
+            x = begin + (end - begin) * before / (before - after)
+            first, second = (new, old) if before < 0 else (old, new)
+            chosen.append((begin, x, first))
+            chosen.append((x, end, second))
+            improved = True
+    if not improved:
+        return label, False
+    merged = []
+    for begin, end, segment in chosen:
+        if merged and merged[-1][2] is segment:
+            merged[-1] = (merged[-1][0], end, segment)
+        else:
+            merged.append((begin, end, segment))
+    return [_cut(segment, begin, end) for begin, end, segment in merged], True
+
+
+class _RoadTimes:
+    # Travel time of one road as a function of the time it is entered:
+    # length / FREE_FLOW_MPH * max(tail traffic, head traffic)
+    __slots__ = ("profiles", "tail", "head", "hours_per_factor")
+
+    def __init__(self, profiles: TrafficProfiles, tail: int, head: int, length: float):
+        self.profiles = profiles
+        self.tail = tail
+        self.head = head
+        self.hours_per_factor = length / FREE_FLOW_MPH
+
+    def __call__(self, entered: float) -> float:
+        traffic = self.profiles.traffic
+        return self.hours_per_factor * max(traffic(self.tail, entered), traffic(self.head, entered))
+
+    def breakpoints(self, begin: float, end: float) -> List[float]:
+        # Entry times in (begin, end) where the travel time changes slope
+        profiles = self.profiles
+        times = set()
+        for city in (self.tail, self.head):
+            shape = profiles.node_shape[city]
+            start, stop = profiles.shape_offsets[shape], profiles.shape_offsets[shape + 1]
+            if stop - start < 2:
+                continue  # A flat shape has no corners
+            day = (begin // HOURS_PER_DAY) * HOURS_PER_DAY
+            while day < end:
+                for k in range(start, stop):
+                    hour = day + profiles.shape_hours[k]
+                    if begin < hour < end:
+                        times.add(hour)
+                day += HOURS_PER_DAY
+        times = sorted(times)
+        # Where the two cities' traffic curves cross, the max switches sides
+        traffic = profiles.traffic
+        crossings = []
+        edges = [begin] + times + [end]
+        for a, b in zip(edges, edges[1:]):
+            da = traffic(self.tail, a) - traffic(self.head, a)
+            db = traffic(self.tail, b) - traffic(self.head, b)
+            if da * db < 0:
+                crossings.append(a + (b - a) * da / (da - db))
+        return sorted(times + crossings)
+
+
+def _follow(label: List[Segment], road: _RoadTimes, nodes: Sequence[Node],
+            cost_function: Optional[CostFunction]) -> List[Segment]:
+    # Cost, arrival and route at the end of a road for every departure
+    profiles, tail, head = road.profiles, road.tail, road.head
+    followed = []
+    for segment in label:
+        x0, x1, _, _, a0, a1, route = segment
+        xs = [x0]
+        if a1 > a0:
+            xs.extend(x0 + (x1 - x0) * (entered - a0) / (a1 - a0) for entered in road.breakpoints(a0, a1))
+        if x1 > x0:
+            xs.append(x1)
+        route = (head, route)
+        ends = []
+        for x in xs:
+            cost, entered = _at(segment, x)
+            hours = road(entered)
+            if cost_function is None:
+                cost += hours
+            else:
+                cost += cost_function(_TrafficAt(nodes[tail], profiles.traffic(tail, entered)),
+                                      _TrafficAt(nodes[head], profiles.traffic(head, entered)))
+            ends.append((x, cost, entered + hours))
+        if len(ends) == 1:
+            x, cost, arrival = ends[0]
+            followed.append((x, x, cost, cost, arrival, arrival, route))
+        for (x0, c0, a0), (x1, c1, a1) in zip(ends, ends[1:]):
+            followed.append((x0, x1, c0, c1, a0, a1, route))
+    return followed
+
+
+# ============================================================================
+# CORE SEARCH
+# ============================================================================
+
+def profile_search(csr: CSRGraph, source: int, first: float, last: float, profiles: TrafficProfiles,
+                   cost_function: Optional[CostFunction] = None,
+                   target: int = -1) -> Tuple[List[Optional[List[Segment]]], int]:
+    """
+    Find every city's cheapest cost, arrival and route for each departure in a window.
+
+    Args:
+        csr (CSRGraph): Network in CSR form
+        source (int): Index of the start node
+        first (float): Earliest departure in hours since midnight
+        last (float): Latest departure, not before first
+        profiles (TrafficProfiles): Traffic profiles of the network (FIFO)
+        cost_function: Function(from_node, to_node) -> non-negative cost, called
+            with the cities' traffic at the time the road is entered; None
+            makes the cost the hours on the road
+        target (int): Index at which to stop once its label is final, or -1
+
+    Returns:
+        Tuple[List[Optional[List[Segment]]], int]: (label per node index as
+        segments covering [first, last] in order, None if unreached; number
+        of label scans)
+    """
+    n = len(csr.nodes)
+    nodes, offsets, targets = csr.nodes, csr.offsets, csr.targets
+    lengths = csr.edge_weights(drive_distance)
+    labels: List[Optional[List[Segment]]] = [None] * n
+    labels[source] = [(first, last, 0.0, 0.0, first, last, (source, None))]
+    lowest = [float('inf')] * n
+    lowest[source] = 0.0
+    pending = bytearray(n)
+    pending[source] = 1
+    scans = 0
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    pq = [(0.0, source)]
+    while pq:
+        cost, current = heappop(pq)
+        if not pending[current] or cost != lowest[current]:
+            continue  # Scanned since, or improved and queued again
+        if target != -1 and labels[target] is not None and cost > _highest(labels[target]):
+            break  # Every cost from here on is too high to help
+        pending[current] = 0
+        scans += 1
+        label = labels[current]
+        for arc in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[arc]
+            if neighbor == source:
+                continue
+            followed = _follow(label, _RoadTimes(profiles, current, neighbor, lengths[arc]), nodes, cost_function)
+            labels[neighbor], improved = _cheaper(labels[neighbor], followed)
+            if improved:
+                pending[neighbor] = 1
+                lowest[neighbor] = _lowest(labels[neighbor])
+                heappush(pq, (lowest[neighbor], neighbor))
+    return labels, scans
+
+
+# ============================================================================
+# ROUTE QUERIES
+# ============================================================================
+
+class DepartureProfile:
+    """
+    Cheapest cost, arrival time and route for every departure in a window.
+
+    Attributes:
+        perspective (str): Name of the cost perspective ('travel_time' when
+            the cost is the hours on the road)
+        cost (PiecewiseLinear): Cheapest cost by departure time
+        arrival (PiecewiseLinear): Arrival time of the cheapest route by departure time
+        routes (List[Tuple[float, float, List[Node]]]): (from, to, path) for
+            each stretch of departures sharing a cheapest route
+    """
+
+    def __init__(self, perspective: str, cost: PiecewiseLinear, arrival: PiecewiseLinear,
+                 routes: List[Tuple[float, float, List[Node]]]):
+        self.perspective = perspective
+        self.cost = cost
+        self.arrival = arrival
+        self.routes = routes
+
+    def travel_time(self, departure: float) -> float:
+        """Hours on the road on the cheapest route when leaving at departure."""
+        return self.arrival(departure) - departure
+
+    def cheapest(self) -> Tuple[float, float]:
+        """
+        The departure time with the lowest cost in the window, and that cost.
+        """
+        return self.cost.minimum()
+
+    def route_at(self, departure: float) -> List[Node]:
+        """The cheapest route when leaving at departure."""
+        for begin, _, path in reversed(self.routes):
+            if begin <= departure:
+                return path
+        return self.routes[0][2] if self.routes else []
+
+    def __repr__(self):
+        first, last = self.cost.domain
+        return f"DepartureProfile({self.perspective}, [{first:g}, {last:g}], {len(self.routes)} routes)"
+
+
+def departure_profile(start: Node, target: Node, nodes: List[Node],
+                      edges: Union[List[Edge], Graph, CSRGraph], first_departure: float,
+                      last_departure: float, perspective: Optional[Union[str, CostFunction]] = "company",
+                      profiles: Optional[TrafficProfiles] = None) -> DepartureProfile:
+    """
+    Find the cheapest cost of a perspective for every departure in a window.
+
+    Args:
+        start (Node): Starting city
+        target (Node): Destination city
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        first_departure (float): Earliest departure in hours since midnight (e.g. 6.0)
+        last_departure (float): Latest departure (e.g. 10.0)
+        perspective: 'company', 'driver' (or another perspective name), an
+            edge cost function with non-negative costs, or None for the
+            fastest route (cost = hours on the road)
+        profiles (TrafficProfiles): Traffic profiles (default: traffic_profiles())
+
+    Returns:
+        DepartureProfile: Curves over [first_departure, last_departure]; cost
+        and arrival are infinite and routes is empty if the target is unreachable
+
+    Raises:
+        ValueError: If last_departure is before first_departure
+    """
+    if last_departure < first_departure:
+        raise ValueError(f"Departure window [{first_departure}, {last_departure}] is empty")
+    if perspective is None:
+        name, cost_function = "travel_time", None
+    else:
+        cost_function = get_cost_function(perspective)
+        name = perspective if isinstance(perspective, str) else cost_function.__name__
+    window = [first_departure, last_departure]
+    if start == target:
+        return DepartureProfile(name, PiecewiseLinear(window, [0.0, 0.0]), PiecewiseLinear(window, window),
+                                [(first_departure, last_departure, [start])])
+    csr = as_csr(nodes, edges)
+    source, goal = csr.index.get(start.id), csr.index.get(target.id)
+    label = None
+    if source is not None and goal is not None:
+        profiles = profiles or traffic_profiles(nodes, csr)
+        label = profile_search(csr, source, first_departure, last_departure, profiles, cost_function, goal)[0][goal]
+    if label is None:
+        unreachable = PiecewiseLinear(window, [float('inf')] * 2)
+        return DepartureProfile(name, unreachable, unreachable, [])
+
+    costs, arrivals, routes = [], [], []
+    for x0, x1, c0, c1, a0, a1, chain in label:
+        for points, y0, y1 in ((costs, c0, c1), (arrivals, a0, a1)):
+            if not points or points[-1][0] != x0 or abs(points[-1][1] - y0) > TOLERANCE:
+                points.append((x0, y0))  # A jump, or the first segment
+            points.append((x1, y1))
+        path = []
+        while chain is not None:
+            path.append(chain[0])
+            chain = chain[1]
+        path = [csr.nodes[i] for i in reversed(path)]
+        if routes and routes[-1][2] == path:
+            routes[-1] = (routes[-1][0], x1, path)
+        else:
+            routes.append((x0, x1, path))
+    return DepartureProfile(name, _curve(costs), _curve(arrivals), routes)
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_benchmark():
+    """
+    Print the 6am-10am company profile of Edina -> Northfield, then time a
+    profile search against one time-dependent search per minute of the window.
+    """
+    from mn_dataset import MN_NODES_DICT, MN_GRAPH
+    from solutions.synthetic_network import grid_network
+    from solutions.time_dependent import time_dependent_route
+
+    start, target = MN_NODES_DICT["Edina"], MN_NODES_DICT["Northfield"]
+    print("=" * 80)
+    print("PROFILE SEARCH: Edina -> Northfield, departures 6:00-10:00")
+    print("=" * 80)
+    began = time.perf_counter()
+    profile = departure_profile(start, target, MN_GRAPH.nodes, MN_GRAPH, 6.0, 10.0, "company")
+    elapsed = (time.perf_counter() - began) * 1000
+    for begin, end, path in profile.routes:
+        print(f"{begin:5.2f}h-{end:5.2f}h  {' -> '.join(node.name for node in path)}")
+    for departure in (6.0, 7.0, 7.5, 8.0, 9.0, 10.0):
+        print(f"leave {departure:5.2f}h  company ${profile.cost(departure):6.2f}  "
+              f"{profile.travel_time(departure) * 60:5.1f} min")
+    when, cost = profile.cheapest()
+    print(f"cheapest company departure {when:5.2f}h at ${cost:.2f}; {len(profile.cost)} cost breakpoints")
+
+    began = time.perf_counter()
+    minutes = [6.0 + m / 60 for m in range(241)]
+    for departure in minutes:
+        time_dependent_route(start, target, MN_GRAPH.nodes, MN_GRAPH, departure, "company")
+    per_minute = (time.perf_counter() - began) * 1000
+    print(f"one profile search {elapsed:7.2f}ms, {len(minutes)} minute-by-minute searches {per_minute:7.2f}ms")
+
+    graph = grid_network(20, 20)
+    rng = random.Random(24)
+    pairs = [(rng.choice(graph.nodes), rng.choice(graph.nodes)) for _ in range(5)]
+    began = time.perf_counter()
+    for s, t in pairs:
+        departure_profile(s, t, graph.nodes, graph, 6.0, 10.0, "company")
+    print(f"400-city grid: {(time.perf_counter() - began) / len(pairs) * 1000:7.2f}ms per 6am-10am company profile")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,223 @@
+"""
+Route Cache - Bounded LRU/TTL cache in front of the route functions
+
+Dispatch asks for the same popular trips (Minneapolis to St Paul, Edina to
+Bloomington) over and over. Answers are cached per network, keyed by
+(start id, target id, perspective, graph version):
+
+- csr.version bumps whenever a node cost attribute changes, so an answer is
+  never served after the conditions it was computed under have changed;
+  stale entries are dropped as soon as the cache notices the new version.
+- Adding a road rebuilds the network's CSR form, which starts with an
+  empty cache of its own.
+- The least recently used entry is evicted once the cache is full, and
+  entries older than the optional time-to-live are treated as misses.
+
+Pass a prebuilt Graph (as combined_run.py does); a plain edge list builds a
+new network on every call and so never hits.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import functools
+import random
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.part_a_solution import dijkstra_company_route, dijkstra_driver_route
+from solutions.part_b_solution import dijkstra_with_northfield_subsidy
+from solutions.part_d_solution import (
+    dijkstra_with_fatigue_consideration, dijkstra_with_fairness_consideration, dijkstra_with_weather_safety,
+)
+
+Route = Tuple[List[Node], float]
+RouteFunction = Callable[[Node, Node, List[Node], Union[List[Edge], Graph, CSRGraph]], Route]
+
+# Key of the per-network route cache in CSRGraph.extensions
+ROUTE_CACHE_KEY = "route_cache"
+
+# Routes kept per network before the least recently used one is evicted
+DEFAULT_ROUTE_CACHE_SIZE = 1024
+
+
+class RouteCache:
+    """
+    LRU cache of finished routes for one network.
+
+    Attributes:
+        csr (CSRGraph): Network the routes were computed on
+        max_size (int): Entries kept before the least recently used is evicted
+        ttl (float): Seconds an entry stays valid, or None for no expiry
+        entries (OrderedDict): (start id, target id, perspective, version) ->
+            (expiry time, route), least recently used first
+        hits (int): Lookups answered from the cache
+        misses (int): Lookups that had to compute the route
+        evictions (int): Entries dropped because the cache was full
+        expirations (int): Entries dropped because their time-to-live ran out
+        invalidations (int): Entries dropped because a node cost attribute changed
+    """
+
+    def __init__(self, csr: CSRGraph, max_size: int = DEFAULT_ROUTE_CACHE_SIZE,
+                 ttl: Optional[float] = None):
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+        self.csr = csr
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+        self._version = csr.version
+
+    def lookup(self, start: Node, target: Node, perspective: str,
+               compute: Callable[[], Route]) -> Route:
+        """
+        Get a route from the cache, computing and storing it on a miss.
+
+        Args:
+            start (Node): Starting city
+            target (Node): Destination city
+            perspective (str): Name of the route function or cost perspective
+            compute: Called with no arguments to find the route on a miss
+
+        Returns:
+            Tuple[List[Node], float]: (path, cost); the path is a fresh list
+        """
+        if self._version != self.csr.version:
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+            self._version = self.csr.version
+        key = (start.id, target.id, perspective, self.csr.version)
+        now = time.monotonic()
+        entry = self.entries.get(key)
+        if entry is not None:
+            if entry[0] is None or entry[0] > now:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return list(entry[1][0]), entry[1][1]
+            self.expirations += 1
+            del self.entries[key]
+
+        self.misses += 1
+        path, cost = compute()
+        expires = None if self.ttl is None else now + self.ttl
+        self.entries[key] = (expires, (list(path), cost))
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return path, cost
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Counters plus the current number of entries."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "expirations": self.expirations, "invalidations": self.invalidations,
+                "size": len(self.entries)}
+
+    def clear(self) -> None:
+        """Drop every entry, keeping the counters."""
+        self.entries.clear()
+
+    def __repr__(self):
+        return f"RouteCache({len(self.entries)}/{self.max_size} routes, {self.hits} hits, {self.misses} misses)"
+
+
+def route_cache(csr: CSRGraph, max_size: int = DEFAULT_ROUTE_CACHE_SIZE,
+                ttl: Optional[float] = None) -> RouteCache:
+    """
+    Get the route cache of a network, creating it on first use.
+
+    max_size and ttl only apply when the cache is created.
+    """
+    cache = csr.extensions.get(ROUTE_CACHE_KEY)
+    if cache is None:
+        cache = csr.extensions[ROUTE_CACHE_KEY] = RouteCache(csr, max_size, ttl)
+    return cache
+
+
+def cached_route(route_function: RouteFunction, perspective: Optional[str] = None,
+                 max_size: Optional[int] = None, ttl: Optional[float] = None) -> RouteFunction:
+    """
+    Put the network's route cache in front of a route function.
+
+    Every cached route shares one cache per network. The first one to reach
+    a network creates its cache with its max_size and ttl (or the defaults);
+    a later route that sets either to a different value raises instead of
+    being silently ignored.
+
+    Args:
+        route_function: Function(start, target, nodes, edges) -> (path, cost)
+        perspective (str): Name stored in the cache key (default: the function's name)
+        max_size (int): Entries kept before the least recently used is evicted,
+            or None for the network's setting (DEFAULT_ROUTE_CACHE_SIZE if new)
+        ttl (float): Seconds an entry stays valid, or None for the network's
+            setting (no expiry if new)
+
+    Returns:
+        A function with the same signature that answers repeated queries from
+        the cache; it raises ValueError if the network's cache was created
+        with a different max_size or ttl
+    """
+    if max_size is not None and max_size < 1:
+        raise ValueError(f"max_size must be at least 1, got {max_size}")
+    perspective = perspective or route_function.__name__
+
+    @functools.wraps(route_function)
+    def wrapper(start: Node, target: Node, nodes: List[Node],
+                edges: Union[List[Edge], Graph, CSRGraph]) -> Route:
+        cache = route_cache(as_csr(nodes, edges), max_size or DEFAULT_ROUTE_CACHE_SIZE, ttl)
+        if (max_size is not None and cache.max_size != max_size) or (ttl is not None and cache.ttl != ttl):
+            raise ValueError(f"This network's route cache already uses max_size={cache.max_size}, "
+                             f"ttl={cache.ttl}; {perspective} asks for max_size={max_size}, ttl={ttl}")
+        return cache.lookup(start, target, perspective,
+                            lambda: route_function(start, target, nodes, edges))
+
+    return wrapper
+
+
+# Cached versions of the assignment's route functions, by perspective
+CACHED_ROUTES = {
+    "company": cached_route(dijkstra_company_route, "company"),
+    "driver": cached_route(dijkstra_driver_route, "driver"),
+    "northfield": cached_route(dijkstra_with_northfield_subsidy, "northfield"),
+    "fatigue": cached_route(dijkstra_with_fatigue_consideration, "fatigue"),
+    "fairness": cached_route(dijkstra_with_fairness_consideration, "fairness"),
+    "weather": cached_route(dijkstra_with_weather_safety, "weather"),
+}
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_benchmark():
+    """
+    Replay a skewed query stream with and without the cache, with a weather
+    update every 200 queries.
+    """
+    from solutions.synthetic_network import WEATHER_CHOICES, grid_network
+
+    graph = grid_network(40, 40)
+    rng = random.Random(17)
+    popular = [(rng.choice(graph.nodes), rng.choice(graph.nodes)) for _ in range(20)]
+    stream = [rng.choice(popular) if rng.random() < 0.8 else (rng.choice(graph.nodes), rng.choice(graph.nodes))
+              for _ in range(2000)]
+    print("=" * 80)
+    print(f"ROUTE CACHE: {len(stream)} weather-perspective queries, 80% on 20 popular trips")
+    print("=" * 80)
+    for route in (dijkstra_with_weather_safety, CACHED_ROUTES["weather"]):
+        updates = random.Random(5)
+        began = time.perf_counter()
+        for i, (start, target) in enumerate(stream):
+            if i % 200 == 199:
+                updates.choice(graph.nodes).weather_condition = updates.choice(WEATHER_CHOICES)
+            route(start, target, graph.nodes, graph)
+        label = "cached" if route is CACHED_ROUTES["weather"] else "uncached"
+        print(f"{label:9} {time.perf_counter() - began:6.2f}s")
+    print(route_cache(graph.csr()))
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,228 @@
+"""
+Route Service - An asyncio front end for the route functions
+
+combined_run.py asks for two cities with input() and answers one route at a
+time. This file wraps the same searches for use inside an asyncio
+application:
+
+- CPU-bound searches run in an executor, so the event loop stays responsive.
+- Identical in-flight queries (same start, target, perspective and graph
+  version) are coalesced: the first one starts a computation and the
+  others await it.
+- Backpressure: at most max_concurrency searches run at once, and once
+  max_pending distinct computations are queued new ones are rejected with
+  ServiceOverloaded instead of piling up.
+
+Run this file for a local load test that reports latency percentiles.
+"""
+
+import asyncio
+import math
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from array import array
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.dijkstra_engine import csr_route
+from solutions.perspectives import CostFunction, get_cost_function
+
+Route = Tuple[List[Node], float]
+
+
+class ServiceOverloaded(RuntimeError):
+    """Raised when a new computation would exceed the service's pending limit."""
+
+
+class RouteService:
+    """
+    Asynchronous, coalescing route queries over one network.
+
+    Node attribute changes should be made from the event loop thread. Each
+    search gets a read-only snapshot of the arc weights taken there when the
+    query arrives, so searches already running in the executor never see a
+    later repricing; snapshots are shared until csr.version changes.
+
+    Attributes:
+        csr (CSRGraph): Network being served
+        executor (Executor): Where searches run
+        max_concurrency (int): Searches allowed to run at once
+        max_pending (int): Distinct computations allowed in flight (running or waiting)
+        coalesce (bool): Whether identical in-flight queries share one computation
+        stats (Dict[str, int]): Counts of 'requests', 'computed', 'coalesced' and 'rejected'
+    """
+
+    def __init__(self, nodes: List[Node], edges: Union[List[Edge], Graph, CSRGraph],
+                 executor: Optional[Executor] = None, max_concurrency: int = 4,
+                 max_pending: int = 256, coalesce: bool = True):
+        self.csr = as_csr(nodes, edges)
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.coalesce = coalesce
+        self.stats = {"requests": 0, "computed": 0, "coalesced": 0, "rejected": 0}
+        self._in_flight = {}
+        self._pending = 0
+        self._semaphore = None
+        self._snapshots = {}  # cost function -> (csr.version, weights)
+
+    async def route(self, start: Node, target: Node,
+                    perspective: Union[str, CostFunction] = "company") -> Route:
+        """
+        Find the cheapest route, sharing the work with identical queries in flight.
+
+        Args:
+            start (Node): Starting city
+            target (Node): Destination city
+            perspective: Perspective name (see PERSPECTIVES) or edge cost function
+
+        Returns:
+            Tuple[List[Node], float]: (shortest path as list of nodes, total cost)
+
+        Raises:
+            ServiceOverloaded: If max_pending computations are already in flight
+            ValueError: If the perspective is unknown
+        """
+        self.stats["requests"] += 1
+        cost_function = get_cost_function(perspective)
+        # Queries made after a node change never join a search on older weights
+        key = (start.id, target.id, cost_function, self.csr.version)
+        task = self._in_flight.get(key) if self.coalesce else None
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            if self._pending >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise ServiceOverloaded(f"{self._pending} route computations already pending")
+            self._pending += 1
+            task = asyncio.ensure_future(self._compute(start, target, self._weights(cost_function)))
+            task.add_done_callback(lambda _: self._finished(key, task))
+            if self.coalesce:
+                self._in_flight[key] = task
+        # Shielded, so a cancelled caller does not cancel the shared computation
+        return await asyncio.shield(task)
+
+    def _weights(self, cost_function: CostFunction) -> array:
+        # The live weight table is repriced in place, so executor jobs get a
+        # copy taken at the current version
+        version = self.csr.version
+        snapshot = self._snapshots.get(cost_function)
+        if snapshot is None or snapshot[0] != version:
+            snapshot = self._snapshots[cost_function] = (version, array('d', self.csr.edge_weights(cost_function)))
+        return snapshot[1]
+
+    async def _compute(self, start: Node, target: Node, weights: array) -> Route:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, csr_route, start, target, self.csr, weights)
+        self.stats["computed"] += 1
+        return result
+
+    def _finished(self, key: tuple, task: asyncio.Future) -> None:
+        self._pending -= 1
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # Mark as retrieved even if every caller went away
+
+    @property
+    def pending(self) -> int:
+        """Distinct computations currently running or waiting."""
+        return self._pending
+
+    def close(self) -> None:
+        """Shut down the executor if the service created it."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+
+
+# ============================================================================
+# LOAD GENERATOR
+# ============================================================================
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of an ascending list (fraction in 0..1).
+    """
+    if not sorted_values:
+        return float('nan')
+    rank = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+async def generate_load(service: RouteService, queries: Sequence[Tuple[Node, Node, str]],
+                        concurrency: int = 32) -> Dict[str, float]:
+    """
+    Replay queries against the service from a fixed number of concurrent clients.
+
+    Args:
+        service (RouteService): Service under test
+        queries: (start, target, perspective) per request
+        concurrency (int): Number of clients issuing requests back to back
+
+    Returns:
+        Dict[str, float]: 'p50', 'p90', 'p99' and 'max' latency in milliseconds,
+        'throughput' in requests per second and 'rejected' request count
+    """
+    latencies, rejected = [], 0
+    remaining = iter(queries)
+
+    async def client():
+        nonlocal rejected
+        for start, target, perspective in remaining:
+            began = time.perf_counter()
+            try:
+                await service.route(start, target, perspective)
+            except ServiceOverloaded:
+                rejected += 1
+                continue
+            latencies.append((time.perf_counter() - began) * 1000)
+
+    began = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - began
+    latencies.sort()
+    return {"p50": percentile(latencies, 0.50), "p90": percentile(latencies, 0.90),
+            "p99": percentile(latencies, 0.99), "max": latencies[-1] if latencies else float('nan'),
+            "throughput": len(latencies) / elapsed if elapsed else 0.0, "rejected": rejected}
+
+
+def run_benchmark():
+    """
+    Print latency percentiles with and without coalescing for a skewed query mix.
+    """
+    from solutions.synthetic_network import grid_network
+
+    graph = grid_network(30, 30)
+    rng = random.Random(21)
+    hot = [(rng.choice(graph.nodes), rng.choice(graph.nodes)) for _ in range(10)]
+    queries = []
+    for _ in range(1000):
+        # Most traffic repeats a few popular trips, as at rush hour
+        start, target = rng.choice(hot) if rng.random() < 0.7 else (rng.choice(graph.nodes), rng.choice(graph.nodes))
+        queries.append((start, target, rng.choice(["company", "driver"])))
+
+    print("=" * 80)
+    print(f"ROUTE SERVICE LOAD TEST: {len(queries)} requests, 32 clients, {len(graph.nodes)}-city grid")
+    print("=" * 80)
+    for coalesce in (False, True):
+        service = RouteService(graph.nodes, graph, coalesce=coalesce)
+        try:
+            result = asyncio.run(generate_load(service, queries))
+        finally:
+            service.close()
+        label = "coalescing" if coalesce else "no coalescing"
+        print(f"{label:14} p50 {result['p50']:7.2f}ms  p90 {result['p90']:7.2f}ms  "
+              f"p99 {result['p99']:7.2f}ms  max {result['max']:7.2f}ms  "
+              f"{result['throughput']:6.0f} req/s  computed {service.stats['computed']}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
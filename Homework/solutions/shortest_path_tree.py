@@ -0,0 +1,234 @@
+"""
+Shortest Path Trees - One search from a start city answers every destination
+
+A single run of the Dijkstra engine without a target settles every reachable
+city. The resulting tree keeps all distances and predecessors, so any number
+of destination lookups from the same start reuse one search. Trees are cached
+per (start, perspective) on each network; when a node cost attribute
+changes, a stale tree is repaired around the changed cities instead of being
+searched again (see dynamic_sssp).
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.dijkstra_engine import build_path, dijkstra_search
+from solutions.dynamic_sssp import change_log, repair_tree
+from solutions.perspectives import CostFunction, get_cost_function
+
+# Trees kept per network before the least recently used one is evicted
+DEFAULT_TREE_CACHE_SIZE = 256
+
+# Key of the per-network tree cache in CSRGraph.extensions; the cache is an
+# OrderedDict[(start id, cost function), ShortestPathTree] in LRU order
+TREE_CACHE_KEY = "shortest_path_trees"
+
+
+class ShortestPathTree:
+    """
+    Distances and predecessors from one start city to every city.
+
+    Paths are only rebuilt from the predecessor array when asked for.
+
+    Attributes:
+        csr (CSRGraph): Network the tree was computed on
+        start (Node): Root of the tree
+        distances (List[float]): Cost from start to each node index (inf if unreachable)
+        previous (List[int]): Predecessor node index on the cheapest path (-1 at the root)
+        version (int): csr.version when the tree was computed
+    """
+
+    def __init__(self, csr: CSRGraph, start: Node, distances: List[float],
+                 previous: List[int], version: int):
+        self.csr = csr
+        self.start = start
+        self.distances = distances
+        self.previous = previous
+        self.version = version
+
+    @property
+    def is_current(self) -> bool:
+        """Whether no node cost attribute has changed since the tree was computed."""
+        return self.version == self.csr.version
+
+    def repair(self, weights: Sequence[float]) -> bool:
+        """
+        Bring a stale tree up to date by repairing around the changed cities.
+
+        Args:
+            weights: Current arc weights of the tree's perspective
+
+        Returns:
+            bool: False if the tree cannot be repaired (the change log does
+            not reach back far enough, or some edge cost is negative)
+        """
+        changed = change_log(self.csr).changed_since(self.version)
+        if changed is None or min(weights, default=0.0) < 0:
+            return False
+        repair_tree(self.csr, self.csr.index[self.start.id], self.distances, self.previous,
+                    changed, weights)
+        self.version = self.csr.version
+        return True
+
+    def _index(self, target: Node) -> Optional[int]:
+        return self.csr.index.get(target.id)
+
+    def cost_to(self, target: Node) -> float:
+        """
+        Get the cheapest cost from the start to target (inf if unreachable).
+        """
+        index = self._index(target)
+        return float('inf') if index is None else self.distances[index]
+
+    def path_to(self, target: Node) -> List[Node]:
+        """
+        Get the cheapest path from the start to target ([] if unreachable).
+        """
+        index = self._index(target)
+        if index is None or self.distances[index] == float('inf'):
+            return []
+        return build_path(self.csr, self.previous, index)
+
+    def route_to(self, target: Node) -> Tuple[List[Node], float]:
+        """
+        Get (path, cost) to target in the same form as the route functions.
+        """
+        path = self.path_to(target)
+        return (path, self.cost_to(target)) if path else ([], float('inf'))
+
+    def __repr__(self):
+        reachable = sum(1 for d in self.distances if d != float('inf'))
+        return f"ShortestPathTree(start={self.start.id}, reachable={reachable})"
+
+
+def compute_tree(start: Node, csr: CSRGraph, weights: Sequence[float]) -> ShortestPathTree:
+    """
+    Run one full single-source search and wrap the result, without caching.
+
+    Args:
+        start (Node): Root city; must be part of csr
+        csr (CSRGraph): Network in CSR form
+        weights: Arc weights aligned with csr.targets
+
+    Returns:
+        ShortestPathTree: Tree rooted at start
+    """
+    version = csr.version
+    distances, previous, _ = dijkstra_search(csr, csr.index[start.id], weights)
+    return ShortestPathTree(csr, start, distances, previous, version)
+
+
+def shortest_path_tree(start: Node, nodes: List[Node], edges: Union[List[Edge], Graph, CSRGraph],
+                       perspective: Union[str, CostFunction] = "company",
+                       cache_size: int = DEFAULT_TREE_CACHE_SIZE,
+                       incremental: bool = True) -> ShortestPathTree:
+    """
+    Get the shortest path tree from start under a perspective, reusing a cached one.
+
+    Pass a Graph or CSRGraph as edges for the cache to survive between calls.
+
+    Args:
+        start (Node): Root city
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        perspective: Perspective name (see PERSPECTIVES) or edge cost function
+        cache_size (int): Trees kept per network
+        incremental (bool): Repair a stale cached tree instead of recomputing it
+
+    Returns:
+        ShortestPathTree: Tree rooted at start
+
+    Raises:
+        ValueError: If start is not part of the network
+    """
+    csr = as_csr(nodes, edges)
+    if start.id not in csr.index:
+        raise ValueError(f"Node {start.id} is not part of the network")
+    cost_function = get_cost_function(perspective)
+    cache = csr.extensions.setdefault(TREE_CACHE_KEY, OrderedDict())
+    change_log(csr)  # Start recording changes before the first tree exists
+
+    key = (start.id, cost_function)
+    tree = cache.get(key)
+    if tree is not None and tree.is_current:
+        cache.move_to_end(key)
+        return tree
+
+    weights = csr.edge_weights(cost_function)
+    if tree is None or not incremental or not tree.repair(weights):
+        tree = compute_tree(start, csr, weights)
+    cache[key] = tree
+    cache.move_to_end(key)
+    while len(cache) > cache_size:
+        cache.popitem(last=False)
+    return tree
+
+
+def clear_tree_cache(csr: CSRGraph) -> None:
+    """
+    Drop every cached shortest path tree of a network.
+    """
+    csr.extensions.pop(TREE_CACHE_KEY, None)
+
+
+def refresh_trees(nodes: List[Node], edges: Union[List[Edge], Graph, CSRGraph]) -> Dict[str, int]:
+    """
+    Repair every stale cached tree of a network now rather than on its next lookup.
+
+    Useful right after a batch of live condition updates, so later queries
+    find their trees current.
+
+    Args:
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+
+    Returns:
+        Dict[str, int]: Counts of 'repaired' trees (a changed city was
+        reachable), 'unaffected' trees and 'recomputed' trees
+    """
+    csr = as_csr(nodes, edges)
+    counts = {"repaired": 0, "unaffected": 0, "recomputed": 0}
+    cache = csr.extensions.get(TREE_CACHE_KEY, {})
+    for (_, cost_function), tree in list(cache.items()):
+        if tree.is_current:
+            continue
+        changed = change_log(csr).changed_since(tree.version) or ()
+        affected = any(tree.distances[index] != float('inf') for index in changed)
+        if tree.repair(csr.edge_weights(cost_function)):
+            counts["repaired" if affected else "unaffected"] += 1
+        else:
+            cache[(tree.start.id, cost_function)] = compute_tree(tree.start, csr, csr.edge_weights(cost_function))
+            counts["recomputed"] += 1
+    return counts
+
+
+def apply_condition_updates(nodes: List[Node], edges: Union[List[Edge], Graph, CSRGraph],
+                            updates: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Apply a batch of live city conditions and repair the cached trees.
+
+    Args:
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        updates: City id -> {attribute: new value}, e.g.
+            {"Northfield": {"weather_condition": "snow", "traffic_level": 1.2}}
+
+    Returns:
+        Dict[str, int]: Tree counts from refresh_trees
+
+    Raises:
+        ValueError: If a city id is not part of the network
+    """
+    csr = as_csr(nodes, edges)
+    for city_id, attributes in updates.items():
+        if city_id not in csr.index:
+            raise ValueError(f"Node {city_id} is not part of the network")
+        node = csr.nodes[csr.index[city_id]]
+        for name, value in attributes.items():
+            if getattr(node, name) != value:
+                setattr(node, name, value)
+    return refresh_trees(nodes, csr)
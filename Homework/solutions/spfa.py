@@ -0,0 +1,251 @@
+"""
+SPFA - Exact routes on networks with subsidies (negative edge costs)
+
+Part B shows Dijkstra settling a city too early once a trip can cost less
+than nothing. The Shortest Path Faster Algorithm (a queue-driven form of
+Bellman-Ford) never settles anything: it works in rounds, and each round
+only relaxes the roads leaving cities whose cost dropped in the previous
+round. It stops as soon as a round changes nothing.
+
+Without a negative cycle a cheapest route uses fewer than n roads, so every
+cost is final after n - 1 rounds. Needing more means some loop of trips
+pays out money on every lap (driving Lonsdale -> Northfield -> Lonsdale
+under Part B's -$20 subsidy earns about $18 a lap); that is reported as a
+NegativeCycleError naming the loop, since no cheapest route exists then.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.dijkstra_engine import EdgeCost, build_path, resolve_weights
+
+# Subsidized trips: (from city id, to city id) -> cost of that trip, which
+# replaces the regular cost and may be negative
+Subsidies = Dict[Tuple[str, str], float]
+
+
+class NegativeCycleError(ValueError):
+    """
+    Raised when a loop of trips with negative total cost is reachable from the start.
+
+    Attributes:
+        cycle (List[Node]): Cities of the loop in travel order (the first is
+            not repeated at the end)
+    """
+
+    def __init__(self, cycle: List[Node]):
+        self.cycle = cycle
+        names = " -> ".join(node.name for node in cycle + cycle[:1])
+        super().__init__(f"Negative cost cycle reachable from the start: {names}")
+
+
+# ============================================================================
+# CORE SEARCH
+# ============================================================================
+
+def _parent_cycle(previous: Sequence[int], start: int) -> Optional[List[int]]:
+    # Walk predecessors from start; a repeated node closes a cycle
+    position = {}
+    chain = []
+    current = start
+    while current != -1 and current not in position:
+        position[current] = len(chain)
+        chain.append(current)
+        current = previous[current]
+    if current == -1:
+        return None
+    cycle = chain[position[current]:]
+    cycle.reverse()  # Predecessor order -> travel order
+    return cycle
+
+
+def spfa_search(csr: CSRGraph, source: int, weights: Sequence[float]) -> Tuple[List[float], List[int], int]:
+    """
+    Find the cheapest cost from one node index to every node, allowing negative weights.
+
+    Args:
+        csr (CSRGraph): Network in CSR form
+        source (int): Index of the start node, or -1 to start every node at
+            cost 0 (the virtual source of Johnson's reweighting)
+        weights: Arc weights aligned with csr.targets (any sign)
+
+    Returns:
+        Tuple[List[float], List[int], int]: (distances, previous node index or -1,
+        number of rounds run)
+
+    Raises:
+        NegativeCycleError: If a negative cycle is reachable from source
+    """
+    n = len(csr.nodes)
+    previous = [-1] * n
+    queued = bytearray(n)
+    offsets, targets = csr.offsets, csr.targets
+    if source == -1:
+        distances = [0.0] * n
+        frontier = list(range(n))
+    else:
+        distances = [float('inf')] * n
+        distances[source] = 0.0
+        frontier = [source]
+
+    rounds = 0
+    while frontier:
+        rounds += 1
+        if rounds > n:
+            # Costs still dropping after n rounds: the predecessor links of
+            # a city that keeps improving lead into a negative cycle
+            for city in frontier:
+                cycle = _parent_cycle(previous, city)
+                if cycle is not None:
+                    raise NegativeCycleError([csr.nodes[i] for i in cycle])
+        for current in frontier:
+            queued[current] = 0
+        changed = []
+        for current in frontier:
+            current_dist = distances[current]
+            for arc in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[arc]
+                new_distance = current_dist + weights[arc]
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    previous[neighbor] = current
+                    if not queued[neighbor]:
+                        queued[neighbor] = 1
+                        changed.append(neighbor)
+        frontier = changed
+    return distances, previous, rounds
+
+
+def subsidized_weights(csr: CSRGraph, weights: Sequence[float], subsidies: Subsidies) -> array:
+    """
+    Copy arc weights with the cost of each subsidized trip replaced.
+
+    Args:
+        csr (CSRGraph): Network in CSR form
+        weights: Regular arc weights aligned with csr.targets
+        subsidies: (from city id, to city id) -> subsidized trip cost
+
+    Returns:
+        array: New arc weights; the regular weights are left untouched
+
+    Raises:
+        ValueError: If a subsidized trip is not a road of the network
+    """
+    result = array('d', weights)
+    for (from_id, to_id), cost in subsidies.items():
+        tail, head = csr.index.get(from_id), csr.index.get(to_id)
+        arc = -1 if tail is None or head is None else csr.arc(tail, head)
+        if arc == -1:
+            raise ValueError(f"No road from {from_id!r} to {to_id!r} to subsidize")
+        result[arc] = cost
+    return result
+
+
+# ============================================================================
+# ROUTE QUERIES
+# ============================================================================
+
+def spfa_route(start: Node, target: Node, nodes: List[Node],
+               edges: Union[List[Edge], Graph, CSRGraph], edge_cost: EdgeCost,
+               subsidies: Optional[Subsidies] = None) -> Tuple[List[Node], float]:
+    """
+    Find the cheapest route when some trips may cost less than nothing.
+
+    Args:
+        start (Node): Starting city
+        target (Node): Destination city
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        edge_cost: Function(from_node, to_node) -> cost (may be negative), or
+            arc weights aligned with the CSR form of the network
+        subsidies: (from city id, to city id) -> trip cost overriding edge_cost
+
+    Returns:
+        Tuple[List[Node], float]: (cheapest path as list of nodes, total cost)
+
+    Raises:
+        NegativeCycleError: If a negative cycle is reachable from start
+    """
+    if start == target:
+        return [start], 0.0
+    csr = as_csr(nodes, edges)
+    source = csr.index.get(start.id)
+    goal = csr.index.get(target.id)
+    if source is None or goal is None:
+        return [], float('inf')
+    weights = resolve_weights(csr, edge_cost)
+    if subsidies:
+        weights = subsidized_weights(csr, weights, subsidies)
+
+    distances, previous, _ = spfa_search(csr, source, weights)
+    if distances[goal] == float('inf'):
+        return [], float('inf')
+    return build_path(csr, previous, goal), distances[goal]
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_benchmark():
+    """
+    Compare SPFA and Dijkstra on the MN network with a Lonsdale -> Northfield
+    subsidy, and on a synthetic grid where every trip is shifted by a random
+    per-city potential (which makes many trips negative without creating
+    negative cycles, and moves each route's cost by a known amount).
+    """
+    from mn_dataset import MN_NODES_DICT, MN_GRAPH
+    from solutions.dijkstra_engine import dijkstra_search
+    from solutions.part_a_solution import calculate_driver_cost
+    from solutions.part_b_solution import northfield_subsidy_cost
+    from solutions.synthetic_network import grid_network
+
+    print("=" * 80)
+    print("SPFA VERSUS DIJKSTRA WITH SUBSIDIES")
+    print("=" * 80)
+    edina, northfield = MN_NODES_DICT["Edina"], MN_NODES_DICT["Northfield"]
+    try:
+        spfa_route(edina, northfield, MN_GRAPH.nodes, MN_GRAPH, northfield_subsidy_cost)
+    except NegativeCycleError as error:
+        print(f"Part B subsidy: {error}")
+    subsidies = {("Lonsdale", "Northfield"): -1.5}
+    csr = MN_GRAPH.csr()
+    weights = subsidized_weights(csr, csr.edge_weights(calculate_driver_cost), subsidies)
+    source = csr.index[edina.id]
+    for label, search in (("dijkstra", dijkstra_search), ("spfa", spfa_search)):
+        began = time.perf_counter()
+        for _ in range(200):
+            distances = search(csr, source, weights)[0]
+        elapsed = (time.perf_counter() - began) / 200 * 1000
+        print(f"MN, Lonsdale -> Northfield at -$1.50, {label:8} {elapsed:6.3f}ms  "
+              f"Edina -> Northfield ${distances[csr.index[northfield.id]]:.2f}")
+
+    graph = grid_network(60, 60)
+    csr = graph.csr()
+    base = csr.edge_weights(calculate_driver_cost)
+    rng = random.Random(8)
+    potential = [rng.uniform(0.0, 30.0) for _ in csr.nodes]
+    shifted = array('d', (base[arc] + potential[tail] - potential[head] for arc, (tail, head) in enumerate(csr.arcs())))
+    negative = sum(1 for weight in shifted if weight < 0)
+    sources = rng.sample(range(len(csr.nodes)), 5)
+    print(f"{len(csr.nodes)}-city grid, {negative} of {len(shifted)} trips negative after shifting:")
+    for label, search, weights in (("dijkstra (regular costs)", dijkstra_search, base),
+                                   ("spfa (regular costs)", spfa_search, base),
+                                   ("spfa (shifted costs)", spfa_search, shifted)):
+        began = time.perf_counter()
+        for source in sources:
+            distances = search(csr, source, weights)[0]
+        print(f"  {label:26} {(time.perf_counter() - began) / len(sources) * 1000:8.2f}ms per search")
+    expected = dijkstra_search(csr, sources[-1], base)[0]
+    assert all(abs(distances[v] - (expected[v] + potential[sources[-1]] - potential[v])) < 1e-6
+               for v in range(len(csr.nodes)))
+
+
+if __name__ == "__main__":
+    run_benchmark()
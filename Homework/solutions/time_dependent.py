@@ -0,0 +1,408 @@
+"""
+Time-Dependent Routing - Departure-time-aware routes with hourly traffic
+
+Node.traffic_level is one number, but Twin Cities congestion peaks around
+8am and 5pm. Here a city's traffic at time t (hours since midnight, any
+day) is its traffic_level scaled by a daily profile shape:
+
+- A shape is a piecewise-linear multiplier given at a few times of day and
+  repeating every 24 hours.
+- Shapes are stored once in flat arrays and each city only keeps the index
+  of its shape, so memory grows by one int per city however detailed the
+  shapes are.
+- A road's travel time at departure t is its length at FREE_FLOW_MPH,
+  slowed by the heavier traffic of its two cities (as in the cost formulas).
+
+time_dependent_route() finds the cheapest route of one perspective with a
+Dijkstra ordered by that perspective's cost. Each label also carries the
+clock time the city is reached, and every road is priced with the traffic
+its two cities have when it is entered. Each city keeps only its cheapest
+label, so this is exact while traffic holds steady over a trip; when it
+changes on the way, a costlier label that would meet lighter traffic
+later is not followed up.
+
+fastest_route() orders the search by arrival time instead, which is exact
+because leaving later never means arriving earlier (FIFO; profiles are
+checked for that when they are built), and prices the fastest route.
+"""
+
+import heapq
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from main import Node, Edge, Graph, CSRGraph, as_csr
+from solutions.fatigue_search import drive_distance
+from solutions.perspectives import CostFunction, get_cost_function
+
+# Speed on an uncongested road (traffic factor 1.0)
+FREE_FLOW_MPH = 45.0
+
+HOURS_PER_DAY = 24.0
+
+# Daily shapes by region: (hour, multiplier of the city's traffic_level)
+DEFAULT_SHAPES = {
+    "urban": ((0.0, 0.55), (6.0, 0.6), (8.0, 1.25), (10.0, 0.9), (15.0, 0.95), (17.5, 1.3), (19.5, 0.8)),
+    "suburban": ((0.0, 0.7), (6.0, 0.75), (7.5, 1.2), (9.5, 0.9), (16.0, 0.95), (17.5, 1.2), (19.0, 0.85)),
+    "rural": ((0.0, 1.0),),
+}
+
+# Key of the default profiles in CSRGraph.extensions
+PROFILE_CACHE_KEY = "traffic_profiles"
+
+
+class _TrafficAt:
+    # A city seen at one moment: its traffic_level replaced by the
+    # time-of-day value, everything else read through from the city
+    __slots__ = ("_node", "traffic_level")
+
+    def __init__(self, node: Node, traffic_level: float):
+        self._node = node
+        self.traffic_level = traffic_level
+
+    def __getattr__(self, name):
+        return getattr(self._node, name)
+
+
+class TrafficProfiles:
+    """
+    Daily traffic shapes of every city of a network, in flat arrays.
+
+    Attributes:
+        csr (CSRGraph): Network the profiles belong to
+        shape_names (List[str]): Name of each shape
+        shape_offsets (array): Start of each shape's points (length shapes + 1)
+        shape_hours (array): Hour of day of every point, ascending within a shape
+        shape_values (array): Multiplier at every point
+        node_shape (array): Shape index of every city
+    """
+
+    def __init__(self, csr: CSRGraph, shapes: Mapping[str, Sequence[Tuple[float, float]]],
+                 assignment: Mapping[str, str]):
+        """
+        Args:
+            csr (CSRGraph): Network in CSR form
+            shapes: Shape name -> (hour in [0, 24), multiplier) points
+            assignment: City id -> shape name, for every city
+
+        Raises:
+            ValueError: If a shape is empty, unsorted or non-positive, a city
+                has no known shape, or some road would break FIFO
+        """
+        self.csr = csr
+        self.shape_names = list(shapes)
+        self.shape_offsets = array('i', [0])
+        self.shape_hours = array('d')
+        self.shape_values = array('d')
+        for name in self.shape_names:
+            points = shapes[name]
+            hours = [hour for hour, _ in points]
+            if not points or hours != sorted(set(hours)) or not 0.0 <= hours[0] <= hours[-1] < HOURS_PER_DAY:
+                raise ValueError(f"Shape {name!r} needs distinct ascending hours in [0, 24)")
+            if min(value for _, value in points) <= 0:
+                raise ValueError(f"Shape {name!r} has a non-positive multiplier")
+            self.shape_hours.extend(hours)
+            self.shape_values.extend(value for _, value in points)
+            self.shape_offsets.append(len(self.shape_hours))
+
+        index = {name: i for i, name in enumerate(self.shape_names)}
+        try:
+            self.node_shape = array('i', (index[assignment[node.id]] for node in csr.nodes))
+        except KeyError as error:
+            raise ValueError(f"No known traffic shape for {error.args[0]!r}") from None
+        self._check_fifo()
+
+    def multiplier(self, shape: int, hour: float) -> float:
+        """
+        Multiplier of one shape at any time, interpolating across midnight.
+        """
+        start, stop = self.shape_offsets[shape], self.shape_offsets[shape + 1]
+        hours, values = self.shape_hours, self.shape_values
+        hour %= HOURS_PER_DAY
+        i = bisect_right(hours, hour, start, stop)
+        if i == start:
+            before_hour, before = hours[stop - 1] - HOURS_PER_DAY, values[stop - 1]
+        else:
+            before_hour, before = hours[i - 1], values[i - 1]
+        if i == stop:
+            after_hour, after = hours[start] + HOURS_PER_DAY, values[start]
+        else:
+            after_hour, after = hours[i], values[i]
+        if after_hour == before_hour:
+            return before  # A single-point shape is flat
+        return before + (after - before) * (hour - before_hour) / (after_hour - before_hour)
+
+    def traffic(self, city: int, hour: float) -> float:
+        """
+        Traffic factor of a city (by index) at a time.
+        """
+        return self.csr.nodes[city].traffic_level * self.multiplier(self.node_shape[city], hour)
+
+    def _steepest_drop(self, shape: int) -> float:
+        # Fastest decrease per hour of a shape's multiplier (0 if it never falls)
+        start, stop = self.shape_offsets[shape], self.shape_offsets[shape + 1]
+        hours, values = self.shape_hours, self.shape_values
+        drop = 0.0
+        for i in range(start, stop):
+            j = i + 1 if i + 1 < stop else start
+            span = (hours[j] - hours[i]) % HOURS_PER_DAY or HOURS_PER_DAY
+            drop = max(drop, (values[i] - values[j]) / span)
+        return drop
+
+    def _check_fifo(self) -> None:
+        # A road's travel time falls at most as fast as its faster-falling
+        # city's traffic; FIFO holds while that stays below one hour per hour
+        drops = [self._steepest_drop(shape) for shape in range(len(self.shape_names))]
+        lengths = self.csr.edge_weights(drive_distance)
+        nodes, shape_of = self.csr.nodes, self.node_shape
+        for arc, (tail, head) in enumerate(self.csr.arcs()):
+            fall = max(nodes[tail].traffic_level * drops[shape_of[tail]],
+                       nodes[head].traffic_level * drops[shape_of[head]])
+            if lengths[arc] / FREE_FLOW_MPH * fall >= 1.0:
+                raise ValueError(f"Traffic falls too fast on the road {nodes[tail].id} -> {nodes[head].id}: "
+                                 f"leaving later would arrive earlier")
+
+    def at(self, city: int, hour: float) -> _TrafficAt:
+        """
+        A stand-in for a city with its traffic at a time, for the cost functions.
+        """
+        return _TrafficAt(self.csr.nodes[city], self.traffic(city, hour))
+
+
+def traffic_profiles(nodes: List[Node], edges: Union[List[Edge], Graph, CSRGraph]) -> TrafficProfiles:
+    """
+    Get the default profiles of a network (DEFAULT_SHAPES by region), built on first use.
+    """
+    csr = as_csr(nodes, edges)
+    profiles = csr.extensions.get(PROFILE_CACHE_KEY)
+    if profiles is None:
+        assignment = {node.id: node.region if node.region in DEFAULT_SHAPES else "rural" for node in csr.nodes}
+        profiles = csr.extensions[PROFILE_CACHE_KEY] = TrafficProfiles(csr, DEFAULT_SHAPES, assignment)
+    return profiles
+
+
+# ============================================================================
+# CORE SEARCH
+# ============================================================================
+
+def time_dependent_search(csr: CSRGraph, source: int, departure: float, profiles: TrafficProfiles,
+                          cost_function: Optional[CostFunction] = None,
+                          target: int = -1) -> Tuple[List[float], List[float], List[int], int]:
+    """
+    Find the cheapest cost and its arrival time at every city when leaving source at departure.
+
+    Args:
+        csr (CSRGraph): Network in CSR form
+        source (int): Index of the start node
+        departure (float): Departure time in hours since midnight
+        profiles (TrafficProfiles): Traffic profiles of the network
+        cost_function: Function(from_node, to_node) -> non-negative cost, called
+            with the cities' traffic at the time the road is entered; None
+            makes the cost the hours on the road (earliest arrival)
+        target (int): Index at which to stop early, or -1 to reach every node
+
+    Returns:
+        Tuple[List[float], List[float], List[int], int]: (costs, arrival
+        times, previous node index or -1, number of settled nodes)
+    """
+    n = len(csr.nodes)
+    inf = float('inf')
+    costs = [inf] * n
+    arrival = [inf] * n
+    costs[source] = 0.0
+    arrival[source] = departure
+    previous = [-1] * n
+    settled = bytearray(n)
+    settled_count = 0
+    nodes, offsets, targets = csr.nodes, csr.offsets, csr.targets
+    lengths = csr.edge_weights(drive_distance)
+    traffic = profiles.traffic
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    pq = [(0.0, source)]
+    while pq:
+        current_cost, current = heappop(pq)
+        if settled[current]:
+            continue
+        settled[current] = 1
+        settled_count += 1
+        if current == target:
+            break
+        now = arrival[current]
+        here = traffic(current, now)
+        from_node = _TrafficAt(nodes[current], here)
+        for arc in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[arc]
+            if settled[neighbor]:
+                continue
+            there = traffic(neighbor, now)
+            hours = lengths[arc] / FREE_FLOW_MPH * max(here, there)
+            if cost_function is None:
+                new_cost = current_cost + hours
+            else:
+                new_cost = current_cost + cost_function(from_node, _TrafficAt(nodes[neighbor], there))
+            # Between equally cheap labels, the earlier arrival wins
+            if new_cost < costs[neighbor] or (new_cost == costs[neighbor] and now + hours < arrival[neighbor]):
+                costs[neighbor] = new_cost
+                arrival[neighbor] = now + hours
+                previous[neighbor] = current
+                heappush(pq, (new_cost, neighbor))
+    return costs, arrival, previous, settled_count
+
+
+def _search_path(csr: CSRGraph, profiles: TrafficProfiles, source: int, goal: int, departure: float,
+                 cost_function: Optional[CostFunction]) -> Tuple[List[int], float, List[float]]:
+    # (path as node indices, cost, arrival times per node index); [] if unreachable
+    costs, arrival, previous, _ = time_dependent_search(csr, source, departure, profiles, cost_function, goal)
+    if costs[goal] == float('inf'):
+        return [], float('inf'), arrival
+    path = []
+    current = goal
+    while current != -1:
+        path.append(current)
+        current = previous[current]
+    path.reverse()
+    return path, costs[goal], arrival
+
+
+# ============================================================================
+# ROUTE QUERIES
+# ============================================================================
+
+def time_dependent_route(start: Node, target: Node, nodes: List[Node],
+                         edges: Union[List[Edge], Graph, CSRGraph], departure: float,
+                         perspective: Union[str, CostFunction] = "company",
+                         profiles: Optional[TrafficProfiles] = None) -> Tuple[List[Node], float, float]:
+    """
+    Find the cheapest route of a perspective for a departure time.
+
+    Every road is priced with the traffic of its cities when it is entered.
+
+    Args:
+        start (Node): Starting city
+        target (Node): Destination city
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        departure (float): Departure time in hours since midnight (e.g. 17.5)
+        perspective: 'company', 'driver', 'weather' (or another perspective
+            name), or an edge cost function with non-negative costs
+        profiles (TrafficProfiles): Traffic profiles (default: traffic_profiles())
+
+    Returns:
+        Tuple[List[Node], float, float]: (path, total cost, arrival time);
+        ([], inf, inf) if unreachable
+    """
+    if start == target:
+        return [start], 0.0, departure
+    csr = as_csr(nodes, edges)
+    source, goal = csr.index.get(start.id), csr.index.get(target.id)
+    if source is None or goal is None:
+        return [], float('inf'), float('inf')
+    profiles = profiles or traffic_profiles(nodes, csr)
+    path, cost, arrival = _search_path(csr, profiles, source, goal, departure, get_cost_function(perspective))
+    if not path:
+        return [], float('inf'), float('inf')
+    return [csr.nodes[i] for i in path], cost, arrival[goal]
+
+
+def fastest_route(start: Node, target: Node, nodes: List[Node],
+                  edges: Union[List[Edge], Graph, CSRGraph], departure: float,
+                  profiles: Optional[TrafficProfiles] = None,
+                  perspectives: Sequence[Union[str, CostFunction]] = ("company", "driver"),
+                  ) -> Tuple[List[Node], float, Dict[str, float]]:
+    """
+    Find the fastest route for a departure time and price it at the traffic met on the way.
+
+    The costs are those of the fastest route, not the cheapest costs of each
+    perspective; see time_dependent_route() for those.
+
+    Args:
+        start (Node): Starting city
+        target (Node): Destination city
+        nodes (List[Node]): All cities in the network
+        edges (List[Edge], Graph or CSRGraph): All road connections
+        departure (float): Departure time in hours since midnight (e.g. 17.5)
+        profiles (TrafficProfiles): Traffic profiles (default: traffic_profiles())
+        perspectives: Cost perspectives to price the route under
+
+    Returns:
+        Tuple[List[Node], float, Dict[str, float]]: (path, arrival time,
+        cost per perspective); ([], inf, inf costs) if unreachable
+    """
+    names = [p if isinstance(p, str) else p.__name__ for p in perspectives]
+    functions = [get_cost_function(p) for p in perspectives]
+    if start == target:
+        return [start], departure, dict.fromkeys(names, 0.0)
+    csr = as_csr(nodes, edges)
+    source, goal = csr.index.get(start.id), csr.index.get(target.id)
+    if source is None or goal is None:
+        return [], float('inf'), dict.fromkeys(names, float('inf'))
+    profiles = profiles or traffic_profiles(nodes, csr)
+    path, _, arrival = _search_path(csr, profiles, source, goal, departure, None)
+    if not path:
+        return [], float('inf'), dict.fromkeys(names, float('inf'))
+
+    costs = dict.fromkeys(names, 0.0)
+    for tail, head in zip(path, path[1:]):
+        entered = arrival[tail]
+        from_node, to_node = profiles.at(tail, entered), profiles.at(head, entered)
+        for name, function in zip(names, functions):
+            costs[name] += function(from_node, to_node)
+    return [csr.nodes[i] for i in path], arrival[goal], costs
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def run_benchmark():
+    """
+    Show how one MN trip changes over the day, then time time-dependent
+    searches on a 2,500-city grid against static ones.
+    """
+    from mn_dataset import MN_NODES_DICT, MN_GRAPH
+    from solutions.dijkstra_engine import dijkstra_search
+    from solutions.part_a_solution import calculate_company_cost
+    from solutions.synthetic_network import grid_network
+
+    print("=" * 80)
+    print("TIME-DEPENDENT ROUTING: Maple Grove -> Woodbury")
+    print("=" * 80)
+    start, target = MN_NODES_DICT["Maple Grove"], MN_NODES_DICT["Woodbury"]
+    for departure in (3.0, 7.0, 8.0, 12.0, 17.5, 21.0):
+        _, arrival, _ = fastest_route(start, target, MN_GRAPH.nodes, MN_GRAPH, departure)
+        company_path, company, _ = time_dependent_route(start, target, MN_GRAPH.nodes, MN_GRAPH, departure)
+        _, driver, _ = time_dependent_route(start, target, MN_GRAPH.nodes, MN_GRAPH, departure, "driver")
+        print(f"{int(departure):02d}:{int(departure % 1 * 60):02d}  fastest {(arrival - departure) * 60:5.1f} min  "
+              f"cheapest company ${company:6.2f}  driver ${driver:6.2f}  "
+              f"company route {' -> '.join(node.name for node in company_path)}")
+
+    graph = grid_network(50, 50)
+    csr = graph.csr()
+    profiles = traffic_profiles(graph.nodes, graph)
+    lengths = csr.edge_weights(drive_distance)
+    rng = random.Random(23)
+    queries = [(rng.randrange(len(csr.nodes)), rng.randrange(len(csr.nodes)), rng.uniform(0, 24)) for _ in range(50)]
+    began = time.perf_counter()
+    for source, goal, _ in queries:
+        dijkstra_search(csr, source, lengths, goal)
+    static = (time.perf_counter() - began) / len(queries) * 1000
+    timings = []
+    for cost_function in (None, calculate_company_cost):
+        began = time.perf_counter()
+        for source, goal, departure in queries:
+            time_dependent_search(csr, source, departure, profiles, cost_function, goal)
+        timings.append((time.perf_counter() - began) / len(queries) * 1000)
+    size = sum(a.itemsize * len(a) for a in (profiles.shape_offsets, profiles.shape_hours,
+                                             profiles.shape_values, profiles.node_shape))
+    print(f"2,500-city grid: static {static:.2f}ms, fastest {timings[0]:.2f}ms, "
+          f"cheapest company {timings[1]:.2f}ms per query; profiles take {size:,} bytes")
+
+
+if __name__ == "__main__":
+    run_benchmark()
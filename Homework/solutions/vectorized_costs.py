@@ -0,0 +1,164 @@
+"""
+Vectorized Edge Costs - NumPy evaluation of the cost formulas
+
+This file evaluates the Part A and Part D cost formulas for every arc of the
+network in one vectorized pass over node attribute columns, so repricing the
+network after a traffic or weather update does not loop over edges in Python.
+
+Requires NumPy.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from main import Node, CSRGraph
+from solutions.part_a_solution import calculate_company_cost, calculate_driver_cost
+from solutions.part_d_solution import WEATHER_PENALTY_MULTIPLIERS, fairness_cost, weather_safety_cost
+
+
+# ============================================================================
+# NODE ATTRIBUTE COLUMNS
+# ============================================================================
+
+NUMERIC_COLUMNS = ("x", "y", "traffic_level", "platform_cost", "fuel_cost_per_mile",
+                   "parking_cost", "maintenance_factor")
+
+
+def node_columns(nodes: List[Node]) -> Dict[str, np.ndarray]:
+    """
+    Gather node attributes into one array per attribute, in node order.
+
+    Args:
+        nodes (List[Node]): All cities, in the order used for arc endpoints
+
+    Returns:
+        Dict[str, np.ndarray]: Float arrays for the numeric attributes and
+        string arrays for 'weather_condition' and 'region'
+    """
+    columns = {name: np.array([getattr(node, name) for node in nodes], dtype=np.float64)
+               for name in NUMERIC_COLUMNS}
+    columns["weather_condition"] = np.array([node.weather_condition for node in nodes])
+    columns["region"] = np.array([node.region for node in nodes])
+    return columns
+
+
+def arc_endpoints(csr: CSRGraph) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the tail and head node index of every arc of a CSRGraph, in arc order.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (tails, heads)
+    """
+    offsets = np.frombuffer(csr.offsets, dtype=np.int32)
+    tails = np.repeat(np.arange(len(csr.nodes), dtype=np.int32), np.diff(offsets))
+    heads = np.frombuffer(csr.targets, dtype=np.int32).copy()
+    return tails, heads
+
+
+# ============================================================================
+# VECTORIZED COST FORMULAS
+# ============================================================================
+
+def company_costs(columns: Dict[str, np.ndarray], tails: np.ndarray, heads: np.ndarray) -> np.ndarray:
+    """
+    Vectorized calculate_company_cost for the arcs tails[i] -> heads[i].
+    """
+    x, y = columns["x"], columns["y"]
+    distance = np.hypot(x[tails] - x[heads], y[tails] - y[heads])
+    platform_cost = (columns["platform_cost"][tails] + columns["platform_cost"][heads]) / 2
+    traffic = columns["traffic_level"]
+    effective_distance = distance * np.maximum(traffic[tails], traffic[heads])
+    return platform_cost + effective_distance * 0.60
+
+
+def driver_costs(columns: Dict[str, np.ndarray], tails: np.ndarray, heads: np.ndarray) -> np.ndarray:
+    """
+    Vectorized calculate_driver_cost for the arcs tails[i] -> heads[i].
+    """
+    x, y = columns["x"], columns["y"]
+    distance = np.hypot(x[tails] - x[heads], y[tails] - y[heads])
+    fuel = columns["fuel_cost_per_mile"]
+    traffic = columns["traffic_level"]
+    maintenance = columns["maintenance_factor"]
+    fuel_cost = (distance * ((fuel[tails] + fuel[heads]) / 2)
+                 * np.maximum(traffic[tails], traffic[heads]))
+    maintenance_cost = distance * 0.10 * ((maintenance[tails] + maintenance[heads]) / 2)
+    return fuel_cost + columns["parking_cost"][heads] + maintenance_cost
+
+
+def weather_penalties(base_costs: np.ndarray, columns: Dict[str, np.ndarray], heads: np.ndarray) -> np.ndarray:
+    """
+    Vectorized apply_weather_penalty: scale each arc by its destination's weather.
+    """
+    weather = columns["weather_condition"][heads]
+    multiplier = np.ones(len(heads))
+    for condition, penalty in WEATHER_PENALTY_MULTIPLIERS.items():
+        multiplier[weather == condition] = penalty
+    return base_costs * multiplier
+
+
+def rural_subsidies(base_costs: np.ndarray, columns: Dict[str, np.ndarray], heads: np.ndarray,
+                    subsidy_amount: float = 8.0) -> np.ndarray:
+    """
+    Vectorized apply_rural_subsidy: discount arcs into rural cities, never below $0.50.
+    """
+    rural = columns["region"][heads] == "rural"
+    return np.where(rural, np.maximum(0.50, base_costs - subsidy_amount), base_costs)
+
+
+def fairness_costs(columns: Dict[str, np.ndarray], tails: np.ndarray, heads: np.ndarray) -> np.ndarray:
+    """
+    Vectorized fairness_cost: 30% of company cost into rural cities, 50% out of them.
+    """
+    region = columns["region"]
+    share = np.where(region[heads] == "rural", 0.3, np.where(region[tails] == "rural", 0.5, 1.0))
+    return company_costs(columns, tails, heads) * share
+
+
+def weather_safety_costs(columns: Dict[str, np.ndarray], tails: np.ndarray, heads: np.ndarray) -> np.ndarray:
+    """
+    Vectorized weather_safety_cost: company cost scaled by destination weather.
+    """
+    return weather_penalties(company_costs(columns, tails, heads), columns, heads)
+
+
+# Vectorized equivalents of scalar cost functions, used by reprice()
+VECTORIZED_COSTS: Dict[Callable[[Node, Node], float], Callable] = {
+    calculate_company_cost: company_costs,
+    calculate_driver_cost: driver_costs,
+    fairness_cost: fairness_costs,
+    weather_safety_cost: weather_safety_costs,
+}
+
+
+def reprice(csr: CSRGraph, cost_function: Callable[[Node, Node], float],
+            columns: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+    """
+    Recompute every arc weight of a cost perspective in one vectorized pass.
+
+    The result is written into the CSRGraph's weight table for cost_function,
+    so later route queries over csr use it directly.
+
+    Args:
+        csr (CSRGraph): Network to reprice
+        cost_function: Scalar cost function with an entry in VECTORIZED_COSTS
+        columns: Node attribute columns; gathered from csr.nodes if omitted
+
+    Returns:
+        np.ndarray: New arc weights aligned with csr.targets
+    """
+    vectorized = VECTORIZED_COSTS.get(cost_function)
+    if vectorized is None:
+        raise ValueError(f"No vectorized form registered for {cost_function.__name__}")
+    if columns is None:
+        columns = node_columns(csr.nodes)
+    tails, heads = arc_endpoints(csr)
+    weights = vectorized(columns, tails, heads)
+    csr.weight_table(cost_function).assign(array('d', weights.astype(np.float64).tobytes()))
+    return weights
@@ -0,0 +1,1308 @@
+"""
+Pytest Test Suite for the Routing Infrastructure
+Tests for the graph structures and search engines behind the solution files
+
+Run with: pytest test_routing.py -v
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import Node, Edge, Graph, CSRGraph, get_neighbors
+from mn_dataset import MN_NODES, MN_NODES_DICT, MN_EDGES, MN_GRAPH
+from solutions.part_a_solution import (
+    calculate_company_cost, calculate_driver_cost, dijkstra_company_route, dijkstra_driver_route
+)
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture(scope="module")
+def city_pairs():
+    """Fixture with a spread of start/destination pairs across the network."""
+    names = [("Minneapolis", "Hastings"), ("Monticello", "New Prague"),
+             ("Edina", "Northfield"), ("Forest Lake", "Lakeville"),
+             ("St Paul", "St Paul"), ("Anoka", "Stillwater")]
+    return [(MN_NODES_DICT[a], MN_NODES_DICT[b]) for a, b in names]
+
+
+# ============================================================================
+# GRAPH TESTS
+# ============================================================================
+
+class TestGraph:
+    """Tests for the adjacency-indexed Graph."""
+
+    def test_neighbors_match_edge_scan(self):
+        """Graph neighbors are the edge-scan neighbors without duplicates."""
+        for node in MN_NODES:
+            scanned = get_neighbors(node, MN_EDGES)
+            indexed = MN_GRAPH.neighbors(node)
+            assert len(indexed) == len(set(indexed))
+            assert set(indexed) == set(scanned)
+
+    def test_unknown_node_has_no_neighbors(self):
+        isolated = Node("Isolated", "Isolated City", 1000.0, 1000.0)
+        assert MN_GRAPH.neighbors(isolated) == []
+        assert isolated not in MN_GRAPH
+
+    def test_add_edge_registers_new_nodes(self):
+        a = Node("A", "A", 0.0, 0.0)
+        b = Node("B", "B", 3.0, 4.0)
+        graph = Graph([a], [])
+        graph.add_edge(Edge(a, b))
+        assert b in graph
+        assert graph.neighbors(a) == [b]
+        assert graph.neighbors(b) == [a]
+
+    def test_routes_accept_graph(self, city_pairs):
+        """Route functions return the same answer for a Graph and an edge list."""
+        for route in (dijkstra_company_route, dijkstra_driver_route):
+            for start, target in city_pairs:
+                assert route(start, target, MN_NODES, MN_GRAPH) == \
+                    route(start, target, MN_NODES, MN_EDGES)
+
+
+# ============================================================================
+# CSR TESTS
+# ============================================================================
+
+class TestCSRGraph:
+    """Tests for the compressed sparse row network."""
+
+    def test_structure_matches_graph(self):
+        csr = CSRGraph(MN_NODES, MN_GRAPH)
+        assert len(csr.offsets) == len(csr.nodes) + 1
+        for i, node in enumerate(csr.nodes):
+            heads = csr.targets[csr.offsets[i]:csr.offsets[i + 1]]
+            assert [csr.nodes[j] for j in heads] == MN_GRAPH.neighbors(node)
+
+    def test_edge_weights_cached_per_cost_function(self):
+        csr = CSRGraph(MN_NODES, MN_EDGES)
+        weights = csr.edge_weights(calculate_company_cost)
+        assert csr.edge_weights(calculate_company_cost) is weights
+        for arc, (tail, head) in enumerate(csr.arcs()):
+            assert weights[arc] == calculate_company_cost(csr.nodes[tail], csr.nodes[head])
+
+    def test_routes_accept_csr(self, city_pairs):
+        csr = CSRGraph(MN_NODES, MN_EDGES)
+        for route in (dijkstra_company_route, dijkstra_driver_route):
+            for start, target in city_pairs:
+                path, cost = route(start, target, MN_NODES, csr)
+                expected_path, expected_cost = route(start, target, MN_NODES, MN_GRAPH)
+                assert path == expected_path
+                assert cost == pytest.approx(expected_cost)
+
+
+# ============================================================================
+# WEIGHT TABLE TESTS
+# ============================================================================
+
+@pytest.fixture
+def small_network():
+    """Fixture with a fresh four-city network that tests may modify freely."""
+    nodes = [Node("A", "A", 0.0, 0.0), Node("B", "B", 4.0, 0.0),
+             Node("C", "C", 4.0, 3.0), Node("D", "D", 0.0, 3.0, parking_cost=6.0)]
+    a, b, c, d = nodes
+    return Graph(nodes, [Edge(a, b), Edge(b, c), Edge(c, d), Edge(d, a)])
+
+
+class TestWeightTable:
+    """Tests for cached per-perspective edge weights."""
+
+    def test_both_directions_priced(self, small_network):
+        a, b, c, d = small_network.nodes
+        table = small_network.csr().weight_table(calculate_driver_cost)
+        assert table.cost(a, d) == pytest.approx(calculate_driver_cost(a, d))
+        assert table.cost(d, a) == pytest.approx(calculate_driver_cost(d, a))
+        assert table.cost(a, d) != table.cost(d, a)
+        with pytest.raises(ValueError):
+            table.cost(a, c)
+
+    def test_attribute_change_reprices_incident_arcs(self, small_network):
+        a, b, c, d = small_network.nodes
+        csr = small_network.csr()
+        before = list(csr.edge_weights(calculate_company_cost))
+        version = csr.version
+        b.traffic_level = 3.0
+        after = csr.edge_weights(calculate_company_cost)
+        assert csr.version > version
+        for arc, (tail, head) in enumerate(csr.arcs()):
+            assert after[arc] == pytest.approx(
+                calculate_company_cost(csr.nodes[tail], csr.nodes[head]))
+            if b not in (csr.nodes[tail], csr.nodes[head]):
+                assert after[arc] == before[arc]
+
+    def test_route_follows_weather_and_traffic_updates(self, small_network):
+        a, b, c, d = small_network.nodes
+        path, _ = dijkstra_company_route(a, c, small_network.nodes, small_network)
+        detour = d if path[1] == b else b
+        path[1].traffic_level = 5.0
+        new_path, new_cost = dijkstra_company_route(a, c, small_network.nodes, small_network)
+        assert new_path == [a, detour, c]
+        assert new_cost == pytest.approx(
+            calculate_company_cost(a, detour) + calculate_company_cost(detour, c))
+
+
+# ============================================================================
+# VECTORIZED COST TESTS
+# ============================================================================
+
+@pytest.fixture(scope="module")
+def vectorized():
+    """Fixture importing the NumPy cost module, skipping when NumPy is missing."""
+    pytest.importorskip("numpy")
+    from solutions import vectorized_costs
+    return vectorized_costs
+
+
+class TestVectorizedCosts:
+    """Tests that the NumPy cost formulas match the scalar ones."""
+
+    def test_matches_scalar_formulas(self, vectorized):
+        from solutions.part_d_solution import apply_rural_subsidy, apply_weather_penalty
+        csr = CSRGraph(MN_NODES, MN_GRAPH)
+        columns = vectorized.node_columns(csr.nodes)
+        tails, heads = vectorized.arc_endpoints(csr)
+        company = vectorized.company_costs(columns, tails, heads)
+        driver = vectorized.driver_costs(columns, tails, heads)
+        weather = vectorized.weather_penalties(company, columns, heads)
+        rural = vectorized.rural_subsidies(company, columns, heads)
+        for arc, (tail, head) in enumerate(csr.arcs()):
+            u, v = csr.nodes[tail], csr.nodes[head]
+            base = calculate_company_cost(u, v)
+            assert company[arc] == pytest.approx(base)
+            assert driver[arc] == pytest.approx(calculate_driver_cost(u, v))
+            assert weather[arc] == pytest.approx(apply_weather_penalty(base, u, v))
+            assert rural[arc] == pytest.approx(apply_rural_subsidy(base, v))
+
+    def test_registered_perspectives_match(self, vectorized):
+        csr = CSRGraph(MN_NODES, MN_GRAPH)
+        for cost_function in vectorized.VECTORIZED_COSTS:
+            expected = list(csr.edge_weights(cost_function))
+            assert list(vectorized.reprice(csr, cost_function)) == pytest.approx(expected)
+
+    def test_reprice_updates_weight_table(self, vectorized, small_network):
+        csr = small_network.csr()
+        small_network.nodes[1].traffic_level = 2.5
+        weights = vectorized.reprice(csr, calculate_driver_cost)
+        assert list(csr.edge_weights(calculate_driver_cost)) == pytest.approx(list(weights))
+        for arc, (tail, head) in enumerate(csr.arcs()):
+            assert weights[arc] == pytest.approx(
+                calculate_driver_cost(csr.nodes[tail], csr.nodes[head]))
+
+
+# ============================================================================
+# DIJKSTRA ENGINE TESTS
+# ============================================================================
+
+class TestDijkstraEngine:
+    """Tests for the shared Dijkstra engine."""
+
+    def test_callable_and_weight_array_agree(self, city_pairs):
+        from solutions.dijkstra_engine import dijkstra_route
+        csr = MN_GRAPH.csr()
+        weights = list(csr.edge_weights(calculate_driver_cost))
+        for start, target in city_pairs:
+            assert dijkstra_route(start, target, MN_NODES, csr, weights) == \
+                dijkstra_route(start, target, MN_NODES, MN_EDGES, calculate_driver_cost)
+
+    def test_rejects_misaligned_weights(self):
+        from solutions.dijkstra_engine import dijkstra_route
+        with pytest.raises(ValueError):
+            dijkstra_route(MN_NODES[0], MN_NODES[1], MN_NODES, MN_GRAPH, [1.0, 2.0])
+
+    def test_early_exit_settles_fewer_nodes(self):
+        from solutions.dijkstra_engine import dijkstra_search
+        csr = MN_GRAPH.csr()
+        weights = csr.edge_weights(calculate_company_cost)
+        source = csr.index["Minneapolis"]
+        _, _, settled_all = dijkstra_search(csr, source, weights)
+        _, _, settled_early = dijkstra_search(csr, source, weights, csr.index["St Paul"])
+        assert settled_all == len(csr.nodes)
+        assert settled_early < settled_all
+
+    def test_subsidy_still_shows_greedy_failure(self):
+        """Part B must keep demonstrating Dijkstra's negative-weight failure."""
+        from solutions.part_b_solution import dijkstra_with_northfield_subsidy
+        edina, northfield = MN_NODES_DICT["Edina"], MN_NODES_DICT["Northfield"]
+        assert dijkstra_with_northfield_subsidy(edina, northfield, MN_NODES, MN_GRAPH) == \
+            dijkstra_driver_route(edina, northfield, MN_NODES, MN_GRAPH)
+
+
+# ============================================================================
+# SHORTEST PATH TREE TESTS
+# ============================================================================
+
+class TestShortestPathTree:
+    """Tests for single-source trees and their cache."""
+
+    def test_tree_answers_every_destination(self):
+        from solutions.shortest_path_tree import shortest_path_tree
+        start = MN_NODES_DICT["Edina"]
+        for perspective, route in (("company", dijkstra_company_route),
+                                   ("driver", dijkstra_driver_route)):
+            tree = shortest_path_tree(start, MN_NODES, MN_GRAPH, perspective)
+            for target in MN_NODES:
+                path, cost = tree.route_to(target)
+                expected_path, expected_cost = route(start, target, MN_NODES, MN_GRAPH)
+                assert path == expected_path
+                assert cost == pytest.approx(expected_cost)
+
+    def test_tree_is_cached_until_attributes_change(self, small_network):
+        from solutions.shortest_path_tree import shortest_path_tree
+        a, b, c, d = small_network.nodes
+        tree = shortest_path_tree(a, small_network.nodes, small_network, "driver")
+        assert shortest_path_tree(a, small_network.nodes, small_network, "driver") is tree
+        assert shortest_path_tree(a, small_network.nodes, small_network, "company") is not tree
+        c.parking_cost = 50.0
+        assert not tree.is_current
+        fresh = shortest_path_tree(a, small_network.nodes, small_network, "driver", incremental=False)
+        assert fresh is not tree
+        assert fresh.cost_to(c) == pytest.approx(
+            dijkstra_driver_route(a, c, small_network.nodes, small_network)[1])
+
+    def test_stale_tree_is_repaired_in_place(self, small_network):
+        from solutions.shortest_path_tree import shortest_path_tree
+        a, b, c, d = small_network.nodes
+        tree = shortest_path_tree(a, small_network.nodes, small_network, "driver")
+        c.parking_cost = 50.0
+        assert shortest_path_tree(a, small_network.nodes, small_network, "driver") is tree
+        assert tree.is_current
+        assert tree.cost_to(c) == dijkstra_driver_route(a, c, small_network.nodes, small_network)[1]
+
+    def test_unknown_perspective_rejected(self):
+        from solutions.shortest_path_tree import shortest_path_tree
+        with pytest.raises(ValueError):
+            shortest_path_tree(MN_NODES[0], MN_NODES, MN_GRAPH, "scenic")
+
+
+# ============================================================================
+# ALL-PAIRS MATRIX TESTS
+# ============================================================================
+
+class TestAllPairs:
+    """Tests for precomputed all-pairs cost matrices."""
+
+    @pytest.mark.parametrize("method", ["dijkstra", "floyd_warshall"])
+    def test_matrix_matches_route_functions(self, method):
+        from solutions.all_pairs import all_pairs_costs
+        for perspective, route in (("company", dijkstra_company_route),
+                                   ("driver", dijkstra_driver_route)):
+            matrix = all_pairs_costs(MN_NODES, MN_GRAPH, perspective, method=method)
+            for start in MN_NODES:
+                for target in MN_NODES:
+                    _, expected_cost = route(start, target, MN_NODES, MN_GRAPH)
+                    path = matrix.path(start, target)
+                    assert matrix.cost(start, target) == pytest.approx(expected_cost)
+                    assert path[0] == start and path[-1] == target
+                    assert sum(calculate_driver_cost(u, v) if perspective == "driver"
+                               else calculate_company_cost(u, v)
+                               for u, v in zip(path, path[1:])) == pytest.approx(expected_cost)
+
+    def test_parallel_matches_inline(self):
+        from solutions.all_pairs import all_pairs_costs
+        inline = all_pairs_costs(MN_NODES, MN_GRAPH, "driver", method="dijkstra")
+        pooled = all_pairs_costs(MN_NODES, MN_GRAPH, "driver", method="dijkstra", workers=2)
+        assert list(pooled.costs) == list(inline.costs)
+        assert list(pooled.next_hop) == list(inline.next_hop)
+
+    def test_workers_with_floyd_warshall(self):
+        from solutions.all_pairs import all_pairs_costs
+        with pytest.raises(ValueError, match="workers"):
+            all_pairs_costs(MN_NODES, MN_GRAPH, "driver", method="floyd_warshall", workers=2)
+        auto = all_pairs_costs(MN_NODES, MN_GRAPH, "driver", workers=2)
+        inline = all_pairs_costs(MN_NODES, MN_GRAPH, "driver", method="dijkstra")
+        assert list(auto.costs) == list(inline.costs)
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        from solutions.all_pairs import all_pairs_costs, CostMatrix
+        matrix = all_pairs_costs(MN_NODES, MN_GRAPH, "weather")
+        file_path = str(tmp_path / "weather.matrix")
+        matrix.save(file_path)
+        loaded = CostMatrix.load(file_path, MN_NODES)
+        assert loaded.perspective == "weather"
+        assert list(loaded.costs) == list(matrix.costs)
+        start, target = MN_NODES_DICT["Monticello"], MN_NODES_DICT["Hastings"]
+        assert loaded.route(start, target) == matrix.route(start, target)
+
+    def test_unreachable_pairs(self, small_network):
+        from solutions.all_pairs import all_pairs_costs
+        isolated = Node("Z", "Z", 50.0, 50.0)
+        nodes = small_network.nodes + [isolated]
+        matrix = all_pairs_costs(nodes, small_network.edges, "company")
+        assert matrix.route(nodes[0], isolated) == ([], float('inf'))
+        assert matrix.route(isolated, isolated) == ([isolated], 0.0)
+
+
+# ============================================================================
+# BIDIRECTIONAL SEARCH TESTS
+# ============================================================================
+
+class TestBidirectional:
+    """Tests for bidirectional Dijkstra."""
+
+    @pytest.mark.parametrize("perspective,cost_function", [
+        ("company", calculate_company_cost), ("driver", calculate_driver_cost)])
+    def test_matches_unidirectional_costs(self, perspective, cost_function):
+        from solutions.bidirectional import bidirectional_route
+        from solutions.dijkstra_engine import dijkstra_route
+        for start in MN_NODES:
+            for target in MN_NODES:
+                path, cost = bidirectional_route(start, target, MN_NODES, MN_GRAPH, perspective)
+                _, expected = dijkstra_route(start, target, MN_NODES, MN_GRAPH, cost_function)
+                assert cost == pytest.approx(expected)
+                assert path[0] == start and path[-1] == target
+                assert sum(cost_function(u, v) for u, v in zip(path, path[1:])) == \
+                    pytest.approx(expected)
+
+    def test_settles_fewer_nodes_on_long_trip(self):
+        from solutions.bidirectional import bidirectional_search
+        from solutions.dijkstra_engine import dijkstra_search
+        csr = MN_GRAPH.csr()
+        weights = csr.edge_weights(calculate_company_cost)
+        source, target = csr.index["Monticello"], csr.index["New Prague"]
+        _, _, one_sided = dijkstra_search(csr, source, weights, target)
+        _, _, two_sided = bidirectional_search(csr, source, target, weights)
+        assert two_sided < one_sided
+
+    def test_unreachable(self, small_network):
+        from solutions.bidirectional import bidirectional_route
+        isolated = Node("Z", "Z", 50.0, 50.0)
+        nodes = small_network.nodes + [isolated]
+        assert bidirectional_route(nodes[0], isolated, nodes, small_network.edges) == \
+            ([], float('inf'))
+
+
+# ============================================================================
+# A* TESTS
+# ============================================================================
+
+class TestAStar:
+    """Tests for coordinate-guided A*."""
+
+    @pytest.mark.parametrize("perspective", ["company", "driver", "weather"])
+    def test_heuristic_is_consistent(self, perspective):
+        from solutions.astar import coordinate_heuristic
+        from solutions.perspectives import get_cost_function
+        csr = MN_GRAPH.csr()
+        weights = csr.edge_weights(get_cost_function(perspective))
+        for target in range(len(csr.nodes)):
+            h = coordinate_heuristic(csr, target, get_cost_function(perspective))
+            assert h(target) == 0.0
+            for arc, (tail, head) in enumerate(csr.arcs()):
+                assert h(tail) <= weights[arc] + h(head) + 1e-9
+
+    @pytest.mark.parametrize("perspective,route", [
+        ("company", dijkstra_company_route), ("driver", dijkstra_driver_route)])
+    def test_same_costs_as_dijkstra(self, perspective, route):
+        from solutions.astar import astar_route
+        for start in MN_NODES:
+            for target in MN_NODES:
+                _, cost = astar_route(start, target, MN_NODES, MN_GRAPH, perspective)
+                assert cost == pytest.approx(route(start, target, MN_NODES, MN_GRAPH)[1])
+
+    def test_expands_fewer_nodes(self):
+        from solutions.astar import coordinate_heuristic
+        from solutions.dijkstra_engine import astar_search, dijkstra_search
+        csr = MN_GRAPH.csr()
+        weights = csr.edge_weights(calculate_company_cost)
+        source, target = csr.index["Monticello"], csr.index["New Prague"]
+        heuristic = coordinate_heuristic(csr, target, calculate_company_cost)
+        _, _, plain = dijkstra_search(csr, source, weights, target)
+        _, _, guided = astar_search(csr, source, target, weights, heuristic)
+        assert guided < plain
+
+
+# ============================================================================
+# ALT TESTS
+# ============================================================================
+
+class TestALT:
+    """Tests for landmark-based A* (ALT)."""
+
+    @pytest.mark.parametrize("method", ["farthest", "extremes"])
+    def test_heuristic_is_consistent(self, method):
+        from solutions.landmarks import build_landmark_index
+        index = build_landmark_index(MN_NODES, MN_GRAPH, "driver", count=4, method=method)
+        for target in range(len(MN_NODES)):
+            h = index.heuristic(target)
+            assert h(target) == pytest.approx(0.0)
+            for arc, (tail, head) in enumerate(MN_GRAPH.csr().arcs()):
+                assert h(tail) <= index.weights[arc] + h(head) + 1e-9
+
+    @pytest.mark.parametrize("perspective,route", [
+        ("company", dijkstra_company_route), ("driver", dijkstra_driver_route)])
+    def test_same_costs_as_dijkstra(self, perspective, route):
+        from solutions.landmarks import alt_route
+        for start in MN_NODES:
+            for target in MN_NODES:
+                _, cost = alt_route(start, target, MN_NODES, MN_GRAPH, perspective)
+                assert cost == pytest.approx(route(start, target, MN_NODES, MN_GRAPH)[1])
+
+    def test_index_rebuilt_after_change(self, small_network):
+        from solutions.landmarks import build_landmark_index
+        graph = small_network
+        index = build_landmark_index(graph.nodes, graph, "company", count=2)
+        assert build_landmark_index(graph.nodes, graph, "company", count=2) is index
+        graph.nodes[1].traffic_level = 3.0
+        assert not index.is_current
+        assert build_landmark_index(graph.nodes, graph, "company", count=2) is not index
+
+    def test_index_routes_stay_exact_after_traffic_changes(self):
+        import random
+        from array import array
+        from solutions.dijkstra_engine import dijkstra_search
+        from solutions.landmarks import LandmarkIndex, build_landmark_index
+        from solutions.synthetic_network import grid_network
+        graph = grid_network(12, 12, seed=10)
+        csr = graph.csr()
+        index = build_landmark_index(graph.nodes, graph, "company", count=4)
+        rng = random.Random(10)
+        for _ in range(5):
+            for node in rng.sample(graph.nodes, 20):
+                node.traffic_level = rng.uniform(0.5, 3.0)
+            weights = csr.edge_weights(calculate_company_cost)
+            for _ in range(20):
+                start, target = rng.choice(graph.nodes), rng.choice(graph.nodes)
+                expected = dijkstra_search(csr, csr.index[start.id], weights, csr.index[target.id])[0]
+                assert index.route(start, target)[1] == pytest.approx(expected[csr.index[target.id]])
+            assert index.is_current
+        raw = LandmarkIndex(csr, array('d', weights), [0])
+        graph.nodes[0].traffic_level = 2.5
+        with pytest.raises(RuntimeError):
+            raw.search(0, 5)
+
+    def test_unknown_method(self):
+        from solutions.landmarks import build_landmark_index
+        with pytest.raises(ValueError):
+            build_landmark_index(MN_NODES, MN_GRAPH, "company", method="random")
+
+    def test_settles_fewer_nodes_on_grid(self):
+        from solutions.landmarks import build_landmark_index, compare_settled_nodes
+        from solutions.synthetic_network import grid_network
+        graph = grid_network(20, 20)
+        index = build_landmark_index(graph.nodes, graph, "company", count=6)
+        pairs = [(0, 399), (19, 380), (45, 310)]
+        result = compare_settled_nodes(index, pairs)
+        assert result["alt_settled"] < result["dijkstra_settled"]
+
+
+# ============================================================================
+# CONTRACTION HIERARCHY TESTS
+# ============================================================================
+
+class TestContractionHierarchy:
+    """Tests for contraction hierarchy preprocessing and queries."""
+
+    @pytest.mark.parametrize("perspective", ["company", "driver", "weather"])
+    def test_same_routes_as_dijkstra(self, perspective):
+        from solutions.contraction_hierarchy import ch_route
+        from solutions.dijkstra_engine import dijkstra_route
+        from solutions.perspectives import get_cost_function
+        cost_function = get_cost_function(perspective)
+        for start in MN_NODES:
+            for target in MN_NODES:
+                expected = dijkstra_route(start, target, MN_NODES, MN_GRAPH, cost_function)
+                assert ch_route(start, target, MN_NODES, MN_GRAPH, perspective) == expected
+
+    def test_matches_dijkstra_on_grid(self):
+        from solutions.contraction_hierarchy import contraction_hierarchy
+        from solutions.dijkstra_engine import dijkstra_search
+        from solutions.synthetic_network import grid_network
+        graph = grid_network(15, 15, seed=2)
+        hierarchy = contraction_hierarchy(graph.nodes, graph, "driver")
+        csr = graph.csr()
+        for source, target in [(0, 224), (14, 210), (100, 37), (222, 3)]:
+            distances, _, plain_settled = dijkstra_search(csr, source, hierarchy.weights, target)
+            cost, path, settled = hierarchy.search(source, target)
+            assert cost == pytest.approx(distances[target])
+            assert path[0] == source and path[-1] == target
+            assert all(csr.arc(a, b) != -1 for a, b in zip(path, path[1:]))
+            assert settled < plain_settled
+
+    def test_rebuilt_after_change(self, small_network):
+        from solutions.contraction_hierarchy import ch_route, contraction_hierarchy
+        graph = small_network
+        a, b, c, d = graph.nodes
+        hierarchy = contraction_hierarchy(graph.nodes, graph)
+        assert contraction_hierarchy(graph.nodes, graph) is hierarchy
+        b.traffic_level = 10.0
+        path, cost = ch_route(a, c, graph.nodes, graph)
+        assert contraction_hierarchy(graph.nodes, graph) is not hierarchy
+        assert (path, cost) == dijkstra_company_route(a, c, graph.nodes, graph)
+        assert path == [a, d, c]
+
+    def test_rejects_negative_costs(self):
+        from solutions.contraction_hierarchy import contraction_hierarchy
+        from solutions.part_b_solution import northfield_subsidy_cost
+        with pytest.raises(ValueError):
+            contraction_hierarchy(MN_NODES, MN_GRAPH, northfield_subsidy_cost)
+
+
+# ============================================================================
+# CUSTOMIZABLE ROUTE PLANNING TESTS
+# ============================================================================
+
+class TestCustomizableRouting:
+    """Tests for the partition overlay and per-metric customization."""
+
+    def test_cells_are_nested(self):
+        from solutions.customizable_routing import network_partition
+        partition = network_partition(MN_NODES, MN_GRAPH, (3, 6, 12))
+        for level in range(partition.levels - 1):
+            parents = {}
+            for v in range(len(MN_NODES)):
+                fine, coarse = partition.cell_of[level][v], partition.cell_of[level + 1][v]
+                assert parents.setdefault(fine, coarse) == coarse
+        for level, limit in enumerate(partition.cell_sizes):
+            sizes = [list(partition.cell_of[level]).count(c) for c in range(partition.cell_count(level))]
+            assert max(sizes) <= limit
+
+    @pytest.mark.parametrize("perspective", ["company", "driver", "fairness", "weather"])
+    def test_same_routes_as_dijkstra(self, perspective):
+        from solutions.customizable_routing import customized_metric
+        from solutions.dijkstra_engine import dijkstra_route
+        from solutions.perspectives import get_cost_function
+        metric = customized_metric(MN_NODES, MN_GRAPH, perspective, (4, 12))
+        for start in MN_NODES:
+            for target in MN_NODES:
+                expected = dijkstra_route(start, target, MN_NODES, MN_GRAPH, get_cost_function(perspective))
+                assert metric.route(start, target) == expected
+
+    def test_recustomizes_only_changed_cells(self):
+        from solutions.customizable_routing import customized_metric
+        from solutions.dijkstra_engine import dijkstra_route
+        from solutions.synthetic_network import grid_network
+        graph = grid_network(10, 10, seed=4)
+        metric = customized_metric(graph.nodes, graph, "weather", (8, 32))
+        partition = metric.partition
+        graph.nodes[0].weather_condition = "storm"
+        graph.nodes[0].traffic_level = 2.0
+        assert customized_metric(graph.nodes, graph, "weather", (8, 32)) is metric
+        assert metric.recustomized_cells == partition.levels
+        for start, target in [(graph.nodes[0], graph.nodes[99]), (graph.nodes[45], graph.nodes[1])]:
+            assert metric.route(start, target) == dijkstra_route(start, target, graph.nodes, graph,
+                                                                 metric.cost_function)
+
+    def test_rejects_negative_costs(self):
+        from solutions.customizable_routing import customized_metric
+        from solutions.part_b_solution import northfield_subsidy_cost
+        with pytest.raises(ValueError):
+            customized_metric(MN_NODES, MN_GRAPH, northfield_subsidy_cost, (4, 12))
+
+
+# ============================================================================
+# DYNAMIC SHORTEST PATH TESTS
+# ============================================================================
+
+class TestDynamicSSSP:
+    """Tests for repairing cached trees after node changes."""
+
+    @pytest.mark.parametrize("perspective", ["company", "driver", "weather"])
+    def test_repair_matches_recompute(self, perspective):
+        import random
+        from solutions.perspectives import get_cost_function
+        from solutions.shortest_path_tree import compute_tree, shortest_path_tree
+        from solutions.synthetic_network import grid_network
+        graph = grid_network(12, 12, seed=5)
+        csr = graph.csr()
+        rng = random.Random(0)
+        start = graph.nodes[30]
+        tree = shortest_path_tree(start, graph.nodes, graph, perspective)
+        for _ in range(15):
+            for node in rng.sample(graph.nodes, rng.choice([1, 3])):
+                node.traffic_level = round(rng.uniform(0.5, 2.5), 2)
+                node.weather_condition = rng.choice(["clear", "rain", "storm"])
+            assert shortest_path_tree(start, graph.nodes, graph, perspective) is tree
+            expected = compute_tree(start, csr, csr.edge_weights(get_cost_function(perspective)))
+            assert tree.distances == expected.distances
+            assert tree.is_current
+
+    def test_apply_condition_updates(self, small_network):
+        from solutions.shortest_path_tree import apply_condition_updates, shortest_path_tree
+        graph = small_network
+        a, b, c, d = graph.nodes
+        tree = shortest_path_tree(a, graph.nodes, graph, "weather")
+        assert tree.path_to(c) == [a, d, c]
+        counts = apply_condition_updates(graph.nodes, graph, {"D": {"weather_condition": "storm"}})
+        assert counts == {"repaired": 1, "unaffected": 0, "recomputed": 0}
+        assert tree.is_current
+        assert tree.path_to(c) == [a, b, c]
+        with pytest.raises(ValueError):
+            apply_condition_updates(graph.nodes, graph, {"Z": {"traffic_level": 1.0}})
+
+    def test_change_log(self, small_network):
+        from solutions.dynamic_sssp import change_log
+        graph = small_network
+        csr = graph.csr()
+        log = change_log(csr)
+        version = csr.version
+        graph.nodes[2].traffic_level = 1.5
+        graph.nodes[0].parking_cost = 4.0
+        assert log.changed_since(version) == {0, 2}
+        assert log.changed_since(csr.version) == set()
+        assert log.changed_since(version - 1) is None
+
+
+# ============================================================================
+# BATCH ROUTING TESTS
+# ============================================================================
+
+class TestBatchRouting:
+    """Tests for grouped multi-query routing."""
+
+    def test_grouping_covers_every_query_once(self):
+        from solutions.batch_routing import BACKWARD, FORWARD, group_queries
+        pairs = [(0, 5), (0, 6), (0, 7), (1, 9), (2, 9), (3, 9), (4, 4), (8, 2)]
+        groups = group_queries(pairs)
+        covered = sorted(position for _, _, members in groups for position, _ in members)
+        assert covered == list(range(len(pairs)))
+        assert (FORWARD, 0, [(0, 5), (1, 6), (2, 7)]) in groups
+        assert (BACKWARD, 9, [(3, 1), (4, 2), (5, 3)]) in groups
+        assert len(groups) == 4
+
+    @pytest.mark.parametrize("perspective,route", [
+        ("company", dijkstra_company_route), ("driver", dijkstra_driver_route)])
+    def test_same_results_as_single_queries(self, perspective, route):
+        from solutions.batch_routing import batch_routes
+        queries = [(start, target) for start in MN_NODES for target in MN_NODES]
+        expected = [route(start, target, MN_NODES, MN_GRAPH) for start, target in queries]
+        assert batch_routes(queries, MN_NODES, MN_GRAPH, perspective) == expected
+
+    def test_process_pool(self, city_pairs):
+        from solutions.batch_routing import batch_routes
+        queries = city_pairs * 3
+        expected = [dijkstra_company_route(start, target, MN_NODES, MN_GRAPH) for start, target in queries]
+        assert batch_routes(queries, MN_NODES, MN_GRAPH, workers=2) == expected
+
+    def test_unknown_cities_keep_their_position(self):
+        from solutions.batch_routing import batch_routes
+        outsider = Node("Z", "Z", 0.0, 0.0)
+        minneapolis, edina = MN_NODES_DICT["Minneapolis"], MN_NODES_DICT["Edina"]
+        results = batch_routes([(outsider, edina), (minneapolis, edina), (edina, edina)], MN_NODES, MN_GRAPH)
+        assert results[0] == ([], float('inf'))
+        assert results[1] == dijkstra_company_route(minneapolis, edina, MN_NODES, MN_GRAPH)
+        assert results[2] == ([edina], 0.0)
+
+
+# ============================================================================
+# PARALLEL ALL-ORIGINS TESTS
+# ============================================================================
+
+class TestParallelOrigins:
+    """Tests for the shared-memory process pool driver."""
+
+    def test_matches_in_process_matrix(self):
+        from solutions.all_pairs import all_pairs_costs
+        from solutions.parallel_origins import all_origins
+        from solutions.part_d_solution import weather_safety_cost
+        from solutions.synthetic_network import grid_network
+        graph = grid_network(8, 8, seed=1)
+        csr = graph.csr()
+        expected = all_pairs_costs(graph.nodes, graph, "weather", method="dijkstra")
+        costs, next_hop = all_origins(csr, csr.edge_weights(weather_safety_cost), workers=2, chunk_size=5)
+        assert costs == expected.costs
+        assert next_hop == expected.next_hop
+
+    def test_shared_blocks_are_released(self):
+        from multiprocessing import shared_memory
+        from solutions.parallel_origins import SharedNetwork
+        csr = MN_GRAPH.csr()
+        shared = SharedNetwork(csr, csr.edge_weights(calculate_company_cost))
+        names = list(shared.names.values())
+        shared.close()
+        for name in names:
+            with pytest.raises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+
+class TestRouteService:
+    """Tests for the asyncio route service."""
+
+    def test_matches_route_functions(self, city_pairs):
+        import asyncio
+        from solutions.route_service import RouteService
+        service = RouteService(MN_NODES, MN_GRAPH)
+
+        async def answer_all():
+            return await asyncio.gather(*(service.route(start, target) for start, target in city_pairs))
+
+        try:
+            answers = asyncio.run(answer_all())
+        finally:
+            service.close()
+        for (start, target), answer in zip(city_pairs, answers):
+            assert answer == dijkstra_company_route(start, target, MN_NODES, MN_GRAPH)
+
+    def test_identical_queries_are_coalesced(self):
+        import asyncio
+        from solutions.route_service import RouteService
+        service = RouteService(MN_NODES, MN_GRAPH)
+        start, target = MN_NODES_DICT["Monticello"], MN_NODES_DICT["Northfield"]
+
+        async def burst():
+            return await asyncio.gather(*(service.route(start, target, "driver") for _ in range(20)))
+
+        try:
+            answers = asyncio.run(burst())
+        finally:
+            service.close()
+        assert service.stats["computed"] == 1
+        assert service.stats["coalesced"] == 19
+        assert all(answer == answers[0] for answer in answers)
+        assert service.pending == 0
+
+    def test_excess_computations_are_rejected(self):
+        import asyncio
+        from solutions.route_service import RouteService, ServiceOverloaded
+        service = RouteService(MN_NODES, MN_GRAPH, max_concurrency=1, max_pending=2)
+        start = MN_NODES_DICT["Minneapolis"]
+        targets = [node for node in MN_NODES if node != start][:5]
+
+        async def burst():
+            return await asyncio.gather(*(service.route(start, target) for target in targets),
+                                        return_exceptions=True)
+
+        try:
+            answers = asyncio.run(burst())
+        finally:
+            service.close()
+        rejected = [answer for answer in answers if isinstance(answer, ServiceOverloaded)]
+        assert len(rejected) == 3
+        assert service.stats["computed"] == 2
+        assert service.pending == 0
+
+
+    def test_node_change_during_search(self, small_network):
+        import asyncio
+        from solutions.route_service import RouteService
+        graph = small_network
+        a, c, d = graph.nodes[0], graph.nodes[2], graph.nodes[3]
+        before = dijkstra_company_route(a, c, graph.nodes, graph)
+        service = RouteService(graph.nodes, graph)
+
+        async def change_midway():
+            first = asyncio.ensure_future(service.route(a, c))
+            await asyncio.sleep(0)  # First query is in flight on the old prices
+            d.platform_cost = 0.0
+            second = asyncio.ensure_future(service.route(a, c))
+            return await asyncio.gather(first, second)
+
+        try:
+            old, new = asyncio.run(change_midway())
+        finally:
+            service.close()
+        assert old == before
+        assert new == dijkstra_company_route(a, c, graph.nodes, graph)
+        assert new[1] < old[1]
+        assert service.stats["computed"] == 2 and service.stats["coalesced"] == 0
+
+    def test_percentile_is_nearest_rank(self):
+        from solutions.route_service import percentile
+        values = [float(v) for v in range(1, 11)]
+        assert percentile(values, 0.50) == 5.0
+        assert percentile(values, 0.90) == 9.0
+        assert percentile(values, 0.99) == 10.0
+        assert percentile(values, 0.0) == 1.0 and percentile(values, 1.0) == 10.0
+        assert percentile([3.0, 7.0], 0.50) == 3.0 and percentile([3.0, 7.0], 0.51) == 7.0
+        assert percentile([], 0.5) != percentile([], 0.5)  # nan
+
+
+class TestRouteCache:
+    """Tests for the per-network LRU/TTL route cache."""
+
+    def test_repeated_queries_hit(self, small_network):
+        from solutions.route_cache import cached_route, route_cache
+        graph = small_network
+        a, c = graph.nodes[0], graph.nodes[2]
+        route = cached_route(dijkstra_company_route, "company")
+        first = route(a, c, graph.nodes, graph)
+        first[0].append(a)  # Callers may modify the path they get back
+        second = route(a, c, graph.nodes, graph)
+        assert second == dijkstra_company_route(a, c, graph.nodes, graph)
+        assert route_cache(graph.csr()).stats["hits"] == 1
+        assert route_cache(graph.csr()).stats["misses"] == 1
+
+    def test_decorator_configures_the_cache(self, small_network):
+        from solutions.route_cache import cached_route, route_cache
+        graph = small_network
+        a, b, c = graph.nodes[:3]
+        route = cached_route(dijkstra_company_route, "company", max_size=1, ttl=60.0)
+        route(a, b, graph.nodes, graph)
+        route(a, c, graph.nodes, graph)
+        cache = route_cache(graph.csr())
+        assert (cache.max_size, cache.ttl) == (1, 60.0)
+        assert cache.stats["evictions"] == 1 and cache.stats["size"] == 1
+        with pytest.raises(ValueError):
+            cached_route(dijkstra_company_route, max_size=0)
+
+    def test_conflicting_cache_settings_raise(self, small_network):
+        from solutions.route_cache import CACHED_ROUTES, DEFAULT_ROUTE_CACHE_SIZE as DEFAULT_SIZE, cached_route
+        graph = small_network
+        a, c = graph.nodes[0], graph.nodes[2]
+        CACHED_ROUTES["company"](a, c, graph.nodes, graph)  # Creates the cache with the defaults
+        with pytest.raises(ValueError, match="max_size"):
+            cached_route(dijkstra_driver_route, "driver", max_size=5)(a, c, graph.nodes, graph)
+        with pytest.raises(ValueError, match="ttl"):
+            cached_route(dijkstra_driver_route, "driver", ttl=30.0)(a, c, graph.nodes, graph)
+        # Unset or matching settings share the existing cache
+        shared = cached_route(dijkstra_driver_route, "driver", max_size=DEFAULT_SIZE)
+        assert shared(a, c, graph.nodes, graph) == dijkstra_driver_route(a, c, graph.nodes, graph)
+        assert CACHED_ROUTES["driver"](a, c, graph.nodes, graph) == shared(a, c, graph.nodes, graph)
+
+    def test_attribute_change_invalidates(self, small_network):
+        from solutions.route_cache import CACHED_ROUTES, route_cache
+        graph = small_network
+        a, c, d = graph.nodes[0], graph.nodes[2], graph.nodes[3]
+        route = CACHED_ROUTES["company"]
+        before = route(a, c, graph.nodes, graph)
+        d.platform_cost = 0.0
+        after = route(a, c, graph.nodes, graph)
+        assert after == dijkstra_company_route(a, c, graph.nodes, graph)
+        assert after[1] < before[1]
+        stats = route_cache(graph.csr()).stats
+        assert stats["misses"] == 2 and stats["invalidations"] == 1
+
+    def test_new_road_starts_a_new_cache(self, small_network):
+        from main import Edge
+        from solutions.route_cache import CACHED_ROUTES
+        graph = small_network
+        a, c = graph.nodes[0], graph.nodes[2]
+        route = CACHED_ROUTES["driver"]
+        route(a, c, graph.nodes, graph)
+        graph.add_edge(Edge(a, c))
+        assert route(a, c, graph.nodes, graph) == ([a, c], calculate_driver_cost(a, c))
+
+    def test_eviction_and_expiry(self):
+        from solutions.route_cache import RouteCache
+        csr = MN_GRAPH.csr()
+        cache = RouteCache(csr, max_size=2)
+        starts = MN_NODES[:3]
+        for start in starts:
+            cache.lookup(start, MN_NODES[5], "company",
+                         lambda: dijkstra_company_route(start, MN_NODES[5], MN_NODES, MN_GRAPH))
+        assert cache.stats["evictions"] == 1 and cache.stats["size"] == 2
+        expiring = RouteCache(csr, ttl=0.0)
+        for _ in range(2):
+            expiring.lookup(starts[0], MN_NODES[5], "company", lambda: ([], 0.0))
+        assert expiring.stats["expirations"] == 1 and expiring.hits == 0
+
+
+class TestSPFA:
+    """Tests for the negative-weight SPFA engine."""
+
+    def test_matches_dijkstra_without_subsidies(self, city_pairs):
+        from solutions.spfa import spfa_route
+        for start, target in city_pairs:
+            assert spfa_route(start, target, MN_NODES, MN_GRAPH, calculate_driver_cost) == \
+                dijkstra_driver_route(start, target, MN_NODES, MN_GRAPH)
+
+    def test_subsidy_that_dijkstra_misses(self, small_network):
+        from solutions.dijkstra_engine import dijkstra_route
+        from solutions.spfa import spfa_route
+        graph = small_network
+        a, b, c, d = graph.nodes
+        # A -> B -> C ties with A -> D -> C until the B -> C trip is subsidized
+        subsidies = {("B", "C"): -calculate_company_cost(c, b) * 0.9}
+        path, cost = spfa_route(a, c, graph.nodes, graph, calculate_company_cost, subsidies)
+        assert path == [a, b, c]
+        assert cost == pytest.approx(calculate_company_cost(a, b) + subsidies[("B", "C")])
+        assert dijkstra_route(a, c, graph.nodes, graph, calculate_company_cost)[1] >= cost
+
+    def test_shifted_costs_move_routes_by_the_potential(self):
+        from array import array
+        from solutions.dijkstra_engine import dijkstra_search
+        from solutions.spfa import spfa_search
+        from solutions.synthetic_network import grid_network
+        csr = grid_network(10, 10, seed=4).csr()
+        base = csr.edge_weights(calculate_company_cost)
+        potential = [(7 * i) % 23 for i in range(len(csr.nodes))]
+        shifted = array('d', (base[arc] + potential[u] - potential[v] for arc, (u, v) in enumerate(csr.arcs())))
+        assert min(shifted) < 0
+        expected = dijkstra_search(csr, 0, base)[0]
+        distances = spfa_search(csr, 0, shifted)[0]
+        for v in range(len(csr.nodes)):
+            assert distances[v] == pytest.approx(expected[v] + potential[0] - potential[v])
+
+    def test_part_b_subsidy_is_a_negative_cycle(self):
+        from solutions.part_b_solution import northfield_subsidy_cost
+        from solutions.spfa import NegativeCycleError, spfa_route
+        with pytest.raises(NegativeCycleError) as raised:
+            spfa_route(MN_NODES_DICT["Edina"], MN_NODES_DICT["Northfield"], MN_NODES, MN_GRAPH,
+                       northfield_subsidy_cost)
+        assert {node.id for node in raised.value.cycle} == {"Lonsdale", "Northfield"}
+
+    def test_unknown_road_is_rejected(self):
+        from solutions.spfa import spfa_route
+        with pytest.raises(ValueError):
+            spfa_route(MN_NODES_DICT["Edina"], MN_NODES_DICT["Northfield"], MN_NODES, MN_GRAPH,
+                       calculate_driver_cost, {("Edina", "Duluth"): -5.0})
+
+
+class TestJohnson:
+    """Tests for Johnson reweighting on subsidized networks."""
+
+    SUBSIDIES = {("Lonsdale", "Northfield"): -1.5, ("Eagan", "Rosemount"): -2.0}
+
+    def test_matches_spfa(self):
+        from solutions.johnson import johnson_route
+        from solutions.spfa import spfa_route
+        for start in MN_NODES:
+            for target in MN_NODES:
+                assert johnson_route(start, target, MN_NODES, MN_GRAPH, "driver", self.SUBSIDIES) == \
+                    spfa_route(start, target, MN_NODES, MN_GRAPH, calculate_driver_cost, self.SUBSIDIES)
+
+    def test_potentials_are_kept_while_they_fit(self, small_network):
+        from solutions.johnson import johnson_reweighting
+        graph = small_network
+        a, b, c, d = graph.nodes
+        deep = {("B", "C"): -0.9 * calculate_company_cost(c, b)}
+        reweighting = johnson_reweighting(graph.nodes, graph, "company", deep)
+        assert min(reweighting.reduced) >= 0
+        shallow = {("B", "C"): -0.5 * calculate_company_cost(c, b)}
+        assert johnson_reweighting(graph.nodes, graph, "company", shallow) is reweighting
+        assert reweighting.potential_passes == 1
+        assert reweighting.route(a, c)[1] == pytest.approx(calculate_company_cost(a, b) + shallow[("B", "C")])
+        johnson_reweighting(graph.nodes, graph, "company", {("D", "C"): -0.9 * calculate_company_cost(c, d)})
+        assert reweighting.potential_passes == 2
+        assert reweighting.route(a, c)[0] == [a, d, c]
+
+    def test_negative_cycle_leaves_cache_usable(self):
+        from solutions.johnson import johnson_reweighting
+        from solutions.spfa import NegativeCycleError
+        graph = Graph(MN_NODES, MN_EDGES)
+        reweighting = johnson_reweighting(graph.nodes, graph, "driver", self.SUBSIDIES)
+        with pytest.raises(NegativeCycleError):
+            johnson_reweighting(graph.nodes, graph, "driver", {("Lonsdale", "Northfield"): -20.0})
+        assert johnson_reweighting(graph.nodes, graph, "driver", self.SUBSIDIES) is reweighting
+
+
+class TestFatigueSearch:
+    """Tests for the packed product-state fatigue search."""
+
+    @pytest.fixture
+    def long_road(self):
+        nodes = [Node(name, name, 12.0 * i, 0.0) for i, name in enumerate("ABCD")]
+        return Graph(nodes, [Edge(u, v) for u, v in zip(nodes, nodes[1:])])
+
+    def test_part_d_rule(self, long_road):
+        from solutions.part_d_solution import dijkstra_with_fatigue_consideration
+        a, b, c, d = long_road.nodes
+        path, cost = dijkstra_with_fatigue_consideration(a, c, long_road.nodes, long_road)
+        assert path == [a, b, c]
+        assert cost == (calculate_company_cost(a, b) + 15.0) + (calculate_company_cost(b, c) + 50.0)
+
+    def test_multi_level_streaks(self, long_road):
+        from solutions.fatigue_search import fatigue_route
+        a, b, c, d = long_road.nodes
+        _, cost = fatigue_route(a, d, long_road.nodes, long_road, (15.0, 50.0, 90.0))
+        base = sum(calculate_company_cost(u, v) for u, v in ((a, b), (b, c), (c, d)))
+        assert cost == pytest.approx(base + 15.0 + 50.0 + 90.0)
+
+    def test_more_levels_never_cheaper(self):
+        from solutions.fatigue_search import fatigue_route
+        for start in MN_NODES:
+            for target in MN_NODES:
+                _, free = fatigue_route(start, target, MN_NODES, MN_GRAPH, (0.0,))
+                _, two = fatigue_route(start, target, MN_NODES, MN_GRAPH)
+                _, three = fatigue_route(start, target, MN_NODES, MN_GRAPH, (15.0, 50.0, 90.0))
+                assert free == dijkstra_company_route(start, target, MN_NODES, MN_GRAPH)[1]
+                assert free <= two <= three
+
+    def test_rejects_negative_penalties(self):
+        from solutions.fatigue_search import fatigue_route
+        with pytest.raises(ValueError):
+            fatigue_route(MN_NODES[0], MN_NODES[1], MN_NODES, MN_GRAPH, (15.0, -5.0))
+
+
+class TestParetoRoutes:
+    """Tests for bi-objective Pareto routing."""
+
+    def test_frontier_ends_are_the_single_perspective_routes(self):
+        from solutions.pareto import pareto_routes
+        for start in MN_NODES:
+            for target in MN_NODES:
+                frontier = pareto_routes(start, target, MN_NODES, MN_GRAPH)
+                assert frontier[0][1][0] == dijkstra_company_route(start, target, MN_NODES, MN_GRAPH)[1]
+                assert frontier[-1][1][1] == dijkstra_driver_route(start, target, MN_NODES, MN_GRAPH)[1]
+                for (_, (company_a, driver_a)), (_, (company_b, driver_b)) in zip(frontier, frontier[1:]):
+                    assert company_a <= company_b and driver_a > driver_b
+
+    def test_matches_brute_force(self):
+        from solutions.pareto import pareto_routes
+        start, target = MN_NODES_DICT["New Prague"], MN_NODES_DICT["Forest Lake"]
+        points = []
+
+        def walk(path, company, driver):
+            if path[-1] == target:
+                points.append((company, driver))
+                return
+            for neighbor in MN_GRAPH.neighbors(path[-1]):
+                if neighbor not in path:
+                    walk(path + [neighbor], company + calculate_company_cost(path[-1], neighbor),
+                         driver + calculate_driver_cost(path[-1], neighbor))
+
+        walk([start], 0.0, 0.0)
+        expected = sorted({p for p in points
+                           if not any(q[0] <= p[0] and q[1] <= p[1] and q != p for q in points)})
+        frontier = pareto_routes(start, target, MN_NODES, MN_GRAPH)
+        assert [costs for _, costs in frontier] == pytest.approx(expected)
+
+    def test_label_cap_keeps_real_routes(self):
+        from solutions.pareto import pareto_routes
+        from solutions.synthetic_network import grid_network
+        graph = grid_network(12, 12, seed=6)
+        start, target = graph.nodes[0], graph.nodes[-1]
+        exact = pareto_routes(start, target, graph.nodes, graph)
+        capped = pareto_routes(start, target, graph.nodes, graph, max_labels=2)
+        assert 1 <= len(capped) <= len(exact)
+        assert capped[0][1] == exact[0][1]
+        for path, (company, driver) in capped:
+            assert company == pytest.approx(sum(calculate_company_cost(u, v) for u, v in zip(path, path[1:])))
+            assert driver == pytest.approx(sum(calculate_driver_cost(u, v) for u, v in zip(path, path[1:])))
+
+
+class TestKShortestPaths:
+    """Tests for Yen's k-shortest loopless paths."""
+
+    def simple_path_costs(self, start, target, cost_function):
+        costs = []
+
+        def walk(path, cost):
+            if path[-1] == target:
+                costs.append(cost)
+                return
+            for neighbor in MN_GRAPH.neighbors(path[-1]):
+                if neighbor not in path:
+                    walk(path + [neighbor], cost + cost_function(path[-1], neighbor))
+
+        walk([start], 0.0)
+        return sorted(costs)
+
+    @pytest.mark.parametrize("start_name,end_name", [("Edina", "Northfield"), ("Monticello", "Hastings"),
+                                                     ("New Prague", "Forest Lake")])
+    def test_matches_brute_force(self, start_name, end_name):
+        from solutions.k_shortest import k_shortest_paths
+        start, target = MN_NODES_DICT[start_name], MN_NODES_DICT[end_name]
+        routes = k_shortest_paths(start, target, MN_NODES, MN_GRAPH, 10, "driver")
+        expected = self.simple_path_costs(start, target, calculate_driver_cost)[:10]
+        assert [cost for _, cost in routes] == pytest.approx(expected)
+        for path, cost in routes:
+            assert path[0] == start and path[-1] == target
+            assert len(set(path)) == len(path)
+            assert cost == sum(calculate_driver_cost(u, v) for u, v in zip(path, path[1:]))
+        assert len({tuple(node.id for node in path) for path, _ in routes}) == len(routes)
+
+    def test_first_route_is_the_cheapest(self, city_pairs):
+        from solutions.k_shortest import k_shortest_paths
+        for start, target in city_pairs:
+            routes = k_shortest_paths(start, target, MN_NODES, MN_GRAPH, 3)
+            assert routes[0][1] == pytest.approx(dijkstra_company_route(start, target, MN_NODES, MN_GRAPH)[1])
+
+    def test_fewer_routes_than_k(self, small_network):
+        from solutions.k_shortest import k_shortest_paths
+        a, b, c, d = small_network.nodes
+        routes = k_shortest_paths(a, c, small_network.nodes, small_network, 5)
+        assert sorted(tuple(node.id for node in path) for path, _ in routes) == [("A", "B", "C"), ("A", "D", "C")]
+
+
+class TestTimeDependent:
+    """Tests for time-dependent routing with hourly traffic profiles."""
+
+    def flat_profiles(self):
+        from solutions.time_dependent import TrafficProfiles
+        return TrafficProfiles(MN_GRAPH.csr(), {"flat": ((0.0, 1.0),)}, {node.id: "flat" for node in MN_NODES})
+
+    def test_flat_profiles_match_static_routes(self, city_pairs):
+        from solutions.time_dependent import time_dependent_route
+        profiles = self.flat_profiles()
+        for start, target in city_pairs:
+            for perspective, route in (("company", dijkstra_company_route), ("driver", dijkstra_driver_route)):
+                path, cost, arrival = time_dependent_route(start, target, MN_NODES, MN_GRAPH, 8.0,
+                                                           perspective, profiles)
+                assert cost == pytest.approx(route(start, target, MN_NODES, MN_GRAPH)[1])
+                assert path[0] == start and path[-1] == target
+                assert arrival > 8.0 or start == target
+
+    def test_never_costlier_than_pricing_the_fastest_route(self, city_pairs):
+        from solutions.time_dependent import fastest_route, time_dependent_route
+        for start, target in city_pairs:
+            for departure in (3.0, 8.0, 17.5):
+                _, _, priced = fastest_route(start, target, MN_NODES, MN_GRAPH, departure)
+                for perspective in ("company", "driver"):
+                    _, cost, _ = time_dependent_route(start, target, MN_NODES, MN_GRAPH, departure, perspective)
+                    assert cost <= priced[perspective] + 1e-9
+
+    def test_fastest_route_prices_its_roads(self):
+        from solutions.time_dependent import fastest_route
+        profiles = self.flat_profiles()
+        start, target = MN_NODES_DICT["Minneapolis"], MN_NODES_DICT["Forest Lake"]
+        path, _, costs = fastest_route(start, target, MN_NODES, MN_GRAPH, 8.0, profiles)
+        legs = list(zip(path, path[1:]))
+        assert costs["company"] == pytest.approx(sum(calculate_company_cost(u, v) for u, v in legs))
+        assert costs["driver"] == pytest.approx(sum(calculate_driver_cost(u, v) for u, v in legs))
+
+    def test_later_departures_never_arrive_earlier(self):
+        from solutions.time_dependent import fastest_route
+        start, target = MN_NODES_DICT["Maple Grove"], MN_NODES_DICT["Woodbury"]
+        arrivals = [fastest_route(start, target, MN_NODES, MN_GRAPH, minute / 12)[1]
+                    for minute in range(0, 24 * 12)]
+        assert all(a <= b + 1e-12 for a, b in zip(arrivals, arrivals[1:]))
+
+    def test_rush_hour_costs_more_than_night(self):
+        from solutions.time_dependent import fastest_route, time_dependent_route
+        start, target = MN_NODES_DICT["Minneapolis"], MN_NODES_DICT["St Paul"]
+        assert fastest_route(start, target, MN_NODES, MN_GRAPH, 17.5)[1] - 17.5 > \
+            fastest_route(start, target, MN_NODES, MN_GRAPH, 3.0)[1] - 3.0
+        assert time_dependent_route(start, target, MN_NODES, MN_GRAPH, 17.5)[1] > \
+            time_dependent_route(start, target, MN_NODES, MN_GRAPH, 3.0)[1]
+
+    def test_unreachable(self, small_network):
+        from solutions.time_dependent import time_dependent_route
+        a = small_network.nodes[0]
+        isolated = Node("Z", "Z", 50.0, 50.0)
+        assert time_dependent_route(a, isolated, small_network.nodes, small_network, 8.0) == \
+            ([], float('inf'), float('inf'))
+        assert time_dependent_route(a, a, small_network.nodes, small_network, 8.0) == ([a], 0.0, 8.0)
+
+    def test_interpolation_wraps_past_midnight(self):
+        from solutions.time_dependent import TrafficProfiles
+        profiles = TrafficProfiles(MN_GRAPH.csr(), {"day": ((6.0, 1.0), (18.0, 2.0))},
+                                   {node.id: "day" for node in MN_NODES})
+        assert profiles.multiplier(0, 12.0) == pytest.approx(1.5)
+        assert profiles.multiplier(0, 0.0) == pytest.approx(1.5)
+        assert profiles.multiplier(0, 3.0) == pytest.approx(1.25)
+        assert profiles.multiplier(0, 27.0) == pytest.approx(1.25)
+
+    def test_rejects_profiles_breaking_fifo(self):
+        from solutions.time_dependent import TrafficProfiles
+        cliff = {"cliff": ((8.0, 40.0), (8.01, 0.5))}
+        with pytest.raises(ValueError, match="falls too fast"):
+            TrafficProfiles(MN_GRAPH.csr(), cliff, {node.id: "cliff" for node in MN_NODES})
+        with pytest.raises(ValueError, match="No known traffic shape"):
+            TrafficProfiles(MN_GRAPH.csr(), cliff, {})
+
+
+class TestProfileSearch:
+    """Tests for departure-window profile queries."""
+
+    @pytest.mark.parametrize("start_name,end_name", [("Edina", "Northfield"), ("Maple Grove", "Woodbury"),
+                                                     ("Monticello", "Hastings")])
+    @pytest.mark.parametrize("perspective", ["company", "driver"])
+    def test_matches_time_dependent_route(self, start_name, end_name, perspective):
+        from solutions.profile_search import departure_profile
+        from solutions.time_dependent import time_dependent_route
+        start, target = MN_NODES_DICT[start_name], MN_NODES_DICT[end_name]
+        profile = departure_profile(start, target, MN_NODES, MN_GRAPH, 6.0, 10.0, perspective)
+        for minute in range(0, 241, 5):
+            departure = 6.0 + minute / 60
+            path, cost, arrival = time_dependent_route(start, target, MN_NODES, MN_GRAPH, departure, perspective)
+            assert profile.cost(departure) == pytest.approx(cost)
+            if profile.route_at(departure) == path:
+                assert profile.arrival(departure) == pytest.approx(arrival)
+
+    def test_fastest_profile_matches_fastest_route(self):
+        from solutions.profile_search import departure_profile
+        from solutions.time_dependent import fastest_route
+        start, target = MN_NODES_DICT["Edina"], MN_NODES_DICT["Northfield"]
+        profile = departure_profile(start, target, MN_NODES, MN_GRAPH, 6.0, 10.0, None)
+        for minute in range(0, 241, 5):
+            departure = 6.0 + minute / 60
+            assert profile.arrival(departure) == pytest.approx(fastest_route(start, target, MN_NODES,
+                                                                             MN_GRAPH, departure)[1])
+
+    def test_flat_profiles_match_static_routes(self, city_pairs):
+        from solutions.profile_search import departure_profile
+        from solutions.time_dependent import TrafficProfiles
+        flat = TrafficProfiles(MN_GRAPH.csr(), {"flat": ((0.0, 1.0),)}, {node.id: "flat" for node in MN_NODES})
+        for start, target in city_pairs:
+            for perspective, route in (("company", dijkstra_company_route), ("driver", dijkstra_driver_route)):
+                profile = departure_profile(start, target, MN_NODES, MN_GRAPH, 0.0, 24.0, perspective, flat)
+                expected = route(start, target, MN_NODES, MN_GRAPH)[1]
+                assert profile.cheapest()[1] == pytest.approx(expected)
+                assert profile.cost(17.0) == pytest.approx(expected)
+                assert len(profile.routes) == 1
+
+    def test_routes_cover_the_window(self):
+        from solutions.profile_search import departure_profile
+        start, target = MN_NODES_DICT["Maple Grove"], MN_NODES_DICT["Woodbury"]
+        profile = departure_profile(start, target, MN_NODES, MN_GRAPH, 0.0, 24.0, "driver")
+        assert profile.routes[0][0] == 0.0 and profile.routes[-1][1] == 24.0
+        for (_, end, _), (begin, _, _) in zip(profile.routes, profile.routes[1:]):
+            assert end == begin
+        when, cost = profile.cheapest()
+        assert 0.0 <= when <= 24.0
+        assert cost <= min(profile.cost(m / 12) for m in range(24 * 12 + 1)) + 1e-9
+
+    def test_piecewise_linear_jumps_and_clamps(self):
+        from solutions.profile_search import PiecewiseLinear
+        function = PiecewiseLinear([0.0, 1.0, 1.0, 2.0], [0.0, 1.0, 5.0, 7.0])
+        assert function(0.5) == 0.5
+        assert function(1.0) == 5.0
+        assert function(1.5) == 6.0
+        assert function(-1.0) == 0.0 and function(3.0) == 7.0
+        assert function.minimum() == (0.0, 0.0)
+
+    def test_edge_cases(self, small_network):
+        from solutions.profile_search import departure_profile
+        from solutions.time_dependent import time_dependent_route
+        a = small_network.nodes[0]
+        same = departure_profile(a, a, small_network.nodes, small_network, 7.0, 9.0)
+        assert same.travel_time(8.0) == 0.0 and same.cost(8.0) == 0.0
+        isolated = Node("Z", "Z", 50.0, 50.0)
+        unreachable = departure_profile(a, isolated, small_network.nodes, small_network, 7.0, 9.0)
+        assert unreachable.cost(8.0) == float('inf') and unreachable.routes == []
+        c = small_network.nodes[2]
+        instant = departure_profile(a, c, small_network.nodes, small_network, 8.0, 8.0)
+        assert instant.cost(8.0) == pytest.approx(
+            time_dependent_route(a, c, small_network.nodes, small_network, 8.0)[1])
+        with pytest.raises(ValueError):
+            departure_profile(a, a, small_network.nodes, small_network, 9.0, 7.0)
+
+
+@pytest.fixture(scope="module")
+def many_to_many():
+    """Fixture importing the bucket search module, skipping when NumPy is missing."""
+    pytest.importorskip("numpy")
+    from solutions import many_to_many
+    return many_to_many
+
+
+class TestManyToMany:
+    """Tests for bucket-based many-to-many cost tables."""
+
+    def test_matches_point_to_point_routes(self, many_to_many):
+        table = many_to_many.cost_table(MN_NODES, MN_NODES, MN_NODES, MN_GRAPH, "driver")
+        assert table.shape == (len(MN_NODES), len(MN_NODES))
+        for i, start in enumerate(MN_NODES):
+            for j, target in enumerate(MN_NODES):
+                assert table[i, j] == pytest.approx(dijkstra_driver_route(start, target, MN_NODES, MN_GRAPH)[1])
+
+    def test_matches_dijkstra_on_grid(self, many_to_many):
+        import random
+        from solutions.dijkstra_engine import dijkstra_search
+        from solutions.synthetic_network import grid_network
+        graph = grid_network(15, 15, seed=8)
+        csr = graph.csr()
+        rng = random.Random(8)
+        riders, drivers = rng.sample(graph.nodes, 12), rng.sample(graph.nodes, 9) + [graph.nodes[0]] * 2
+        table = many_to_many.cost_table(riders, drivers, graph.nodes, graph, "company")
+        weights = csr.edge_weights(calculate_company_cost)
+        for i, rider in enumerate(riders):
+            distances = dijkstra_search(csr, csr.index[rider.id], weights)[0]
+            assert list(table[i]) == pytest.approx([distances[csr.index[d.id]] for d in drivers])
+
+    def test_unreachable_and_unknown_cities(self, many_to_many, small_network):
+        a, b = small_network.nodes[:2]
+        isolated = Node("Z", "Z", 50.0, 50.0)
+        table = many_to_many.cost_table([a, isolated], [b, isolated], small_network.nodes, small_network)
+        assert table[0, 0] < float('inf')
+        assert table[0, 1] == float('inf') and table[1, 0] == float('inf')
+        assert table[1, 1] == 0.0